@@ -2,6 +2,9 @@
 ASGI config for Kanboard project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Board change events (board/<board_id>/events/) are streamed through it without
+holding a worker thread per listening client, and ASYNC_VIEWS_ENABLED serves the hot read views
+(board, board_update_sync, dashboard and burndown) with their async variants.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
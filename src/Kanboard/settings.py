@@ -50,6 +50,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'static.services.ServerTimingMiddleware',
 ]
 
 ROOT_URLCONF = 'Kanboard.urls'
@@ -81,9 +82,48 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Transactions take the write lock when they begin, instead of failing with "database is locked"
+        # when a read turns into a write while another connection is writing.
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+        },
+        # Connections are kept between requests, and checked before being reused.
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+DATABASE_ROUTERS = [
+    'static.services.SessionRouter',
+    'static.services.ShardRouter',
+    'static.services.ReplicaRouter',
+]
+
+
+# Caches
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'kanboard-fragments',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000,
+        },
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'sessions',
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -130,4 +170,146 @@ STATICFILES_DIRS = [
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 MEDIA_URL = '/uploads/'
-MEDIA_ROOT = BASE_DIR / 'media'
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / 'media'
+
+
+# Kanboard
+
+# Maximum number of boards listed in a single dashboard page.
+DASHBOARD_PAGE_SIZE = 50
+
+# Maximum number of (user, board) roles kept in the board access cache of each process.
+BOARD_ACCESS_CACHE_SIZE = 4096
+
+# Number of seconds a role is kept in the board access cache. Changes are also pushed to the other processes
+# through BOARD_EVENTS_BACKEND, so this only bounds how long a missed invalidation can be served.
+BOARD_ACCESS_CACHE_TTL = 10
+
+# Backend used to push board change events to the clients listening to a board.
+# 'static.services.LocalEventBackend' only reaches the clients of the same process. To share events between
+# several worker processes on one host, use 'static.services.SQLiteEventBackend'
+# with the options {'path': BASE_DIR / 'events.sqlite3'}.
+BOARD_EVENTS_BACKEND = 'static.services.LocalEventBackend'
+BOARD_EVENTS_OPTIONS = {}
+
+# Cache alias used to store the rendered columns of the boards, keyed by board revision.
+BOARD_FRAGMENT_CACHE = 'fragments'
+
+# Per-route request metrics, exported in the Prometheus text format on /metrics.
+# ROUTE_METRICS_OPTIONS accepts 'buckets' (the latency histogram bounds, in seconds), 'directory' (a local
+# directory shared by the worker processes, so that a scrape covers all of them) and 'flush_interval'
+# (the number of seconds between two writes of a process to that directory). Each process writes a file named
+# after its ID and start time; the files of exited processes are merged into metrics-archive.json and removed.
+ROUTE_METRICS_ENABLED = True
+ROUTE_METRICS_OPTIONS = {}
+METRICS_ALLOWED_ADDRESSES = ['127.0.0.1', '::1']
+
+# Adds a Server-Timing header (db, tpl and view durations) to the responses of the Kanboard routes.
+SERVER_TIMING_ENABLED = False
+
+# Records the statements slower than 'threshold' seconds, with their parameters, route and call site,
+# in a rotating JSON lines file. Summarize it with: python manage.py slow_queries
+# Only the types of the parameters are recorded: set 'log_params' to True to record their values,
+# which include passwords and emails.
+SLOW_QUERY_LOG_ENABLED = False
+SLOW_QUERY_LOG_OPTIONS = {
+    'path': BASE_DIR / 'logs' / 'slow_queries.jsonl',
+    'threshold': 0.1,
+}
+
+# Runs the requests carrying a profiling token (X-Kanboard-Profile header or profile query parameter) under cProfile
+# and keeps the captures in 'directory'. Tokens stay valid for 'max_age' seconds; generate them with:
+# python manage.py profiles token
+REQUEST_PROFILING_ENABLED = False
+REQUEST_PROFILING_OPTIONS = {
+    'directory': BASE_DIR / 'logs' / 'profiles',
+    'max_age': 3600,
+}
+
+# Traces the allocations of the requests of the listed routes with tracemalloc, one request at a time,
+# and keeps the report of each process in 'directory'. Read it with: python manage.py memory_report
+# tracemalloc also counts the allocations of the other threads of the process, so only enable it on workers
+# running a single thread (e.g. gunicorn --threads 1), or the reports include the concurrent requests.
+ALLOCATION_PROFILING_ENABLED = False
+ALLOCATION_PROFILING_OPTIONS = {
+    'directory': BASE_DIR / 'logs' / 'memory',
+    'routes': ('board', 'burndown', 'update_card_modal'),
+}
+
+# Session store. The sessions only hold the UUID of the user, and are read by every request:
+# - 'django.contrib.sessions.backends.cached_db' reads them from the SESSION_CACHE_ALIAS cache, and only touches
+#   the database on logins, logouts and cache misses. The cache is shared by the worker processes of the host,
+#   so that a logout is seen by all of them.
+# - 'django.contrib.sessions.backends.cache' never touches the database, but the sessions are lost with the cache.
+# - 'django.contrib.sessions.backends.signed_cookies' keeps them in the cookie itself, without any storage,
+#   but a logout cannot revoke a copy of the cookie until it expires.
+# - 'django.contrib.sessions.backends.file' keeps them in SESSION_FILE_PATH.
+# - 'django.contrib.sessions.backends.db' reads and writes them in the database on every request.
+# SESSION_DATABASE moves the sessions table of the database stores to its own database (add it to DATABASES,
+# e.g. a 'sessions' alias on BASE_DIR / 'sessions.sqlite3', and run migrate --database sessions), so that sessions
+# never compete with the boards for the SQLite write lock. Delete the expired sessions with:
+# python manage.py sweep_sessions
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+SESSION_DATABASE = None
+
+# Pragmas applied to every new SQLite connection (see static.services.sqlite.apply_pragmas). WAL lets the readers
+# of the boards run while drag and drop writes, and busy_timeout is how long, in milliseconds, a connection waits
+# for the write lock. Compare the settings with: python -m benchmarks.sqlite
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 134217728,
+    'cache_size': -16000,
+    'temp_store': 'memory',
+    'busy_timeout': 5000,
+}
+
+# Funnels the writes of new_card, update_card, remove_card, move_card and update_board_elements through a single
+# writer thread per process, which commits the pending ones together in one transaction. WRITE_QUEUE_OPTIONS accepts
+# 'max_batch' (the maximum number of writes committed together) and 'max_delay' (the number of seconds the writer
+# waits for more writes before committing). With SHARDING_ENABLED, the pending writes are committed in one
+# transaction per shard, opened on that shard, so a failing write is rolled back on whichever shard it runs.
+WRITE_QUEUE_ENABLED = False
+WRITE_QUEUE_OPTIONS = {}
+
+# Sends the queries of the read-only routes (bound to GET) to the database aliases listed in 'aliases', and keeps
+# a user on the primary for 'stickiness' seconds after each of their writes. 'copy_interval' makes every replica
+# a copy of the primary SQLite file, refreshed every 'copy_interval' seconds, to try the routing without real replicas.
+READ_REPLICAS_ENABLED = False
+READ_REPLICAS_OPTIONS = {
+    'aliases': ('replica',),
+    'stickiness': 5,
+    'copy_interval': 2,
+}
+if READ_REPLICAS_ENABLED:
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    }
+
+# Spreads the boards, with their columns, cards, assignees and guests, over the databases listed in 'aliases'.
+# The directory of the boards (core.BoardShard) stays in the default database, the users are copied to every shard,
+# and the processes cache the shard of a board for 'cache_ttl' seconds. Migrate every shard
+# (python manage.py migrate --database <alias>), register the existing boards and users with:
+# python manage.py shards sync
+# and spread the boards evenly with: python manage.py shards rebalance
+SHARDING_ENABLED = False
+SHARDING_OPTIONS = {
+    'aliases': ('default', 'shard1'),
+    'cache_ttl': 30,
+}
+if SHARDING_ENABLED:
+    for alias in SHARDING_OPTIONS['aliases']:
+        DATABASES.setdefault(alias, {
+            **DATABASES['default'],
+            'NAME': BASE_DIR / f'db.{alias}.sqlite3',
+        })
+
+# Serves the board, board_update_sync, dashboard and burndown routes with their async variants, which run their
+# queries with the async ORM, on the event loop of Kanboard/asgi.py. Keep it disabled under WSGI, where every
+# async view runs in an event loop of its own (see python -m benchmarks.asgi).
+ASYNC_VIEWS_ENABLED = False
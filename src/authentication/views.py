@@ -1,15 +1,19 @@
 from datetime import timezone, datetime
 
+from django.db import IntegrityError
 from django.shortcuts import render, redirect
 from django.urls import reverse
 from django.views.decorators.csrf import requires_csrf_token
 
 from static.services import RequestHandler, ModelsAttributeError, UserValidations
-from static.utils.utils import response_error, get_user_from, response_success, get_user, no_timezone
+from static.utils.utils import response_error, get_user_from, response_success, get_user, no_timezone, \
+    get_user_by_login, ROUTE_METRICS, REQUEST_PROFILER, ALLOCATION_PROFILER, READ_REPLICAS, \
+    SHARDS, bump_user_boards
+from core.models import Board, Column, Guest, Assignee
 from .models import User
 
 # Create your views here.
-HANDLER = RequestHandler()
+HANDLER = RequestHandler(ROUTE_METRICS, REQUEST_PROFILER, ALLOCATION_PROFILER, READ_REPLICAS, SHARDS)
 
 
 @HANDLER.bind("registration_submission", "register/submit/", request="POST", session=False)
@@ -38,7 +42,11 @@ def registration_submission(request):
     except ModelsAttributeError:
         return response_error("Could not register your account.")
 
-    User.objects.create(uuid=uuid, **required_fields).save()
+    try:
+        User.objects.create(uuid=uuid, **required_fields)
+    except IntegrityError:
+        # Another registration took the username or the email after they were validated.
+        return response_error("Could not register your account.")
 
     request.session['uuid'] = uuid
     request.session.set_expiry(0)
@@ -57,27 +65,13 @@ def login_submission(request):
     :return: HttpResponse - The rendered 'dashboard' HTML page.
     """
 
-    field = 'email'
     key = request.POST.get('key', None)
     password = request.POST.get('password', None)
 
-    while True:
-        try:
-            UserValidations(User, **{field: key}).result()
-            break
-        except ModelsAttributeError as e:
-            if not e.is_existence():
-                if field == 'username':
-                    return response_error("Username or Email are incorrect.")
-                field = 'username'
-            else:
-                break
-
-    to_filter = { field: key, "password": password }
-    user = User.objects.filter(**to_filter).first()
+    user = get_user_by_login(User, key, password)
 
     if not user:
-        return response_error(f"{field.title()} or password are incorrect.")
+        return response_error("Username, email or password are incorrect.")
 
     user.last_login = no_timezone(datetime.now())
 
@@ -139,6 +133,10 @@ def user_management(request):
 
     user.save()
 
+    # The cached board fragments show the username and image of the assignees, and only the image can change here.
+    if 'image' in updates:
+        bump_user_boards(Board, Guest, Assignee, Column, user.uuid)
+
     return response_success('Your account details has been updated successfully.')
 
 
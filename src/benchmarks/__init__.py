@@ -0,0 +1,69 @@
+"""
+Micro-benchmarks of the Kanboard hot paths.
+
+Every benchmark is a module of this package, run from the src directory:
+
+    python -m benchmarks.<name>
+"""
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+
+def setup():
+    """
+    Configures Django, so that the benchmarks can use the project's settings and models.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Kanboard.settings')
+    import django
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """
+    Creates a throwaway test database for the duration of a benchmark, so that the real one is never touched.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    name = connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(function: Callable, iterations: int, repeat: int = 5) -> float:
+    """
+    Measures the time spent calling a function, keeping the best of several runs.
+
+    :param function: Callable - The function, called without arguments.
+    :param iterations: int - The number of calls of each run.
+    :param repeat: int - The number of runs.
+    :return: float - The best time per call, in microseconds.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        best = min(best, time.perf_counter() - start)
+    return best / iterations * 1e6
+
+
+def report(title: str, results: dict[str, float], unit: str = "us/op"):
+    """
+    Prints the results of a benchmark.
+
+    :param title: str - The title of the benchmark.
+    :param results: dict[str, float] - The measured values, by case.
+    :param unit: str - The unit of the values.
+    """
+    print(title)
+    width = max(len(case) for case in results)
+    for case, value in results.items():
+        print(f"  {case:<{width}}  {value:10.2f} {unit}")
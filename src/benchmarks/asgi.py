@@ -0,0 +1,156 @@
+"""
+Measures the throughput of the hot read routes (board, board_update_sync, dashboard and burndown) under load,
+served through the whole Django stack by the WSGI application with a thread per client, and by the ASGI application
+with a task per client, once with the sync views and once with their async variants (ASYNC_VIEWS_ENABLED).
+
+The routes are bound when core.views is imported, so every mode runs in a process of its own,
+and is warmed up (templates, URL patterns, connections) before being measured.
+"""
+from benchmarks import setup, test_database
+
+setup()
+
+import asyncio
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+
+from authentication.models import User
+from benchmarks.sqlite import populate
+
+CLIENTS = 32
+DURATION = 3.0
+WARMUP = 1.0
+MODES = ("wsgi", "asgi-sync", "asgi-async")
+
+
+def routes(board_id: int) -> list[tuple[str, str]]:
+    return [(f"/board/{board_id}/", ""), (f"/board/{board_id}/update/sync/", "since=0"),
+            ("/dashboard/", ""), (f"/burndown/{board_id}/", "")]
+
+
+def login() -> str:
+    from importlib import import_module
+
+    session = import_module(settings.SESSION_ENGINE).SessionStore()
+    session['uuid'] = User.objects.get(username="benchmark").uuid.hex
+    session.create()
+    return f"{settings.SESSION_COOKIE_NAME}={session.session_key}"
+
+
+def run_wsgi(paths: list, cookie: str, duration: float) -> tuple[list, list]:
+    from django.core.wsgi import get_wsgi_application
+
+    application = get_wsgi_application()
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+
+    def client(offset: int):
+        sent = offset
+        while time.perf_counter() < deadline:
+            path, query = paths[sent % len(paths)]
+            sent += 1
+            statuses = []
+            environ = {
+                "REQUEST_METHOD": "GET", "PATH_INFO": path, "QUERY_STRING": query, "SCRIPT_NAME": "",
+                "SERVER_NAME": "testserver", "SERVER_PORT": "80", "SERVER_PROTOCOL": "HTTP/1.1",
+                "HTTP_HOST": "testserver", "HTTP_COOKIE": cookie, "REMOTE_ADDR": "127.0.0.1",
+                "wsgi.version": (1, 0), "wsgi.url_scheme": "http", "wsgi.input": BytesIO(), "wsgi.errors": sys.stderr,
+                "wsgi.multithread": True, "wsgi.multiprocess": False, "wsgi.run_once": False,
+            }
+            start = time.perf_counter()
+            response = application(environ, lambda status, headers: statuses.append(status))
+            b"".join(response)
+            response.close()
+            (latencies if statuses[0].startswith("200") else errors).append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(offset,)) for offset in range(CLIENTS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors
+
+
+def run_asgi(paths: list, cookie: str, duration: float) -> tuple[list, list]:
+    from django.core.asgi import get_asgi_application
+
+    application = get_asgi_application()
+    latencies, errors = [], []
+
+    async def request(path: str, query: str) -> int:
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+        statuses = []
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            # The client never disconnects: Django cancels this wait once the response is sent.
+            await asyncio.Event().wait()
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+
+        await application({
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+            "path": path, "raw_path": path.encode(), "query_string": query.encode(), "root_path": "",
+            "headers": [(b"host", b"testserver"), (b"cookie", cookie.encode())],
+            "client": ("127.0.0.1", 0), "server": ("testserver", 80),
+        }, receive, send)
+        return statuses[0]
+
+    async def client(offset: int, deadline: float):
+        sent = offset
+        while time.perf_counter() < deadline:
+            path, query = paths[sent % len(paths)]
+            sent += 1
+            start = time.perf_counter()
+            status = await request(path, query)
+            (latencies if status == 200 else errors).append(time.perf_counter() - start)
+
+    async def main():
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(client(offset, deadline) for offset in range(CLIENTS)))
+
+    asyncio.run(main())
+    return latencies, errors
+
+
+def run(mode: str):
+    settings.ASYNC_VIEWS_ENABLED = mode == "asgi-async"
+    with tempfile.TemporaryDirectory() as directory:
+        connection.settings_dict['TEST'] = dict(connection.settings_dict.get('TEST', {}),
+                                                NAME=str(Path(directory) / "benchmark.sqlite3"))
+        with test_database():
+            board_id, _, _ = populate()
+            cookie = login()
+            connection.close()
+            runner = run_wsgi if mode == "wsgi" else run_asgi
+            runner(routes(board_id), cookie, WARMUP)
+            latencies, errors = runner(routes(board_id), cookie, DURATION)
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0
+    print(f"  {mode:<12} {len(latencies) / DURATION:>10.1f} {p99 * 1000:>9.2f} {len(errors):>7}", flush=True)
+
+
+def main():
+    print(f"{CLIENTS} clients reading board, board_update_sync, dashboard and burndown for {DURATION:.0f}s")
+    print(f"  {'mode':<12} {'req/s':>10} {'p99 ms':>9} {'errors':>7}", flush=True)
+    for mode in MODES:
+        subprocess.run([sys.executable, "-m", "benchmarks.asgi", mode], check=True)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        run(sys.argv[1])
+    else:
+        main()
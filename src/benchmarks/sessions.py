@@ -0,0 +1,71 @@
+"""
+Measures the cost of the sessions for every session store, through the SessionMiddleware.
+
+Two paths are measured:
+    - request: a request of a logged in user, which loads the session to read the UUID of the user,
+    - login: a request which stores the UUID in a new session, as the login and registration views do.
+"""
+from benchmarks import setup, test_database, measure, report
+
+setup()
+
+import tempfile
+from uuid import uuid4
+
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+ITERATIONS = 2000
+
+ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db (file cache)": "django.contrib.sessions.backends.cached_db",
+    "cache (file cache)": "django.contrib.sessions.backends.cache",
+    "file": "django.contrib.sessions.backends.file",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+
+
+def read(request):
+    return HttpResponse(request.session['uuid'])
+
+
+def login(request):
+    request.session['uuid'] = uuid4().hex
+    request.session.set_expiry(0)
+    return HttpResponse()
+
+
+def measure_engine(engine: str, directory: str) -> tuple[float, float]:
+    caches = dict(settings.CACHES, sessions={
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': f"{directory}/cache",
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    })
+    with override_settings(SESSION_ENGINE=engine, SESSION_FILE_PATH=directory, CACHES=caches):
+        factory = RequestFactory()
+        reading, logging_in = SessionMiddleware(read), SessionMiddleware(login)
+        cookie = logging_in(factory.post("/login/submit/")).cookies[settings.SESSION_COOKIE_NAME].value
+
+        request = factory.get("/account/")
+        request.COOKIES[settings.SESSION_COOKIE_NAME] = cookie
+        return (measure(lambda: reading(request), ITERATIONS),
+                measure(lambda: logging_in(factory.post("/login/submit/")), ITERATIONS // 4))
+
+
+def main():
+    requests, logins = {}, {}
+    with test_database():
+        for name, engine in ENGINES.items():
+            with tempfile.TemporaryDirectory() as directory:
+                requests[name], logins[name] = measure_engine(engine, directory)
+
+    report(f"Session read per request ({ITERATIONS} requests)", requests)
+    report("Session read throughput", {name: 1e6 / value for name, value in requests.items()}, "requests/s")
+    report(f"Session write per login ({ITERATIONS // 4} logins)", logins)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Measures the throughput and the latency of concurrent board reads and card moves on a SQLite database file,
+with the default SQLite settings of Django and with the tuned ones of the Kanboard settings.
+
+Readers load the board the way the board and sync_board views do (get_board_snapshot), writers move cards
+the way update_board_elements does (move_card). After every operation the threads end the "request" with
+close_old_connections(), so that the connections are reopened or kept as CONN_MAX_AGE says.
+"""
+from benchmarks import setup, test_database
+
+setup()
+
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+from uuid import uuid4
+
+from django.conf import settings
+from django.db import OperationalError, close_old_connections, connection
+from django.test import override_settings
+from django.utils import timezone
+
+from authentication.models import User
+from core.models import Board, Column, Card, Assignee
+from static.utils.utils import get_board_snapshot, move_card
+
+READERS = 6
+WRITERS = 2
+DURATION = 3.0
+COLUMNS = 8
+CARDS = 25
+
+MODES = {
+    "default": {'OPTIONS': {}, 'CONN_MAX_AGE': 0, 'SQLITE_PRAGMAS': {}},
+    "tuned": {'OPTIONS': settings.DATABASES['default'].get('OPTIONS', {}),
+              'CONN_MAX_AGE': settings.DATABASES['default'].get('CONN_MAX_AGE', 0),
+              'SQLITE_PRAGMAS': getattr(settings, 'SQLITE_PRAGMAS', {})},
+}
+
+
+def populate() -> tuple[int, list[int], list[int]]:
+    user = User.objects.create(uuid=uuid4().hex, username="benchmark", email="benchmark@example.com",
+                               password="password", name="Name", surname="Surname",
+                               last_login=timezone.now(), date_joined=timezone.now())
+    board = Board.objects.create(owner=user, name="Benchmark", creation_date=timezone.now())
+    columns, cards = [], []
+    for column_index in range(COLUMNS):
+        column = Column.objects.create(board_id=board, title=f"Column {column_index}", description="",
+                                       index=column_index * 1024)
+        columns.append(column.id)
+        for card_index in range(CARDS):
+            card = Card.objects.create(board_id=board, column_id=column, title=f"Card {card_index}",
+                                       description="", creation_date=timezone.now(), index=card_index * 1024)
+            Assignee.objects.create(board_id=board, card_id=card, user_id=user)
+            cards.append(card.id)
+    return board.id, columns, cards
+
+
+def worker(operation, deadline: float, latencies: list, errors: list):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            operation()
+        except OperationalError:
+            errors.append(1)
+        else:
+            latencies.append(time.perf_counter() - start)
+        close_old_connections()
+    connection.close()
+
+
+def run() -> dict[str, tuple[float, float, float, int]]:
+    board_id, columns, cards = populate()
+    connection.close()
+
+    def read():
+        get_board_snapshot(Column, Card, Assignee, board_id)
+
+    def write():
+        move_card(Card, board_id, random.choice(cards), random.choice(columns))
+
+    results = {}
+    threads = []
+    deadline = time.perf_counter() + DURATION
+    for name, operation, count in (("read", read, READERS), ("write", write, WRITERS)):
+        latencies, errors = [], []
+        results[name] = (latencies, errors)
+        threads += [threading.Thread(target=worker, args=(operation, deadline, latencies, errors))
+                    for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    summary = {}
+    for name, (latencies, errors) in results.items():
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] if latencies else 0.0
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0
+        summary[name] = (len(latencies) / DURATION, p50 * 1000, p99 * 1000, len(errors))
+    return summary
+
+
+def main():
+    print(f"{READERS} readers and {WRITERS} writers for {DURATION:.0f}s on a board of {COLUMNS * CARDS} cards")
+    print(f"  {'mode':<8} {'operation':<9} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'locked':>7}")
+    for name, mode in MODES.items():
+        with tempfile.TemporaryDirectory() as directory, override_settings(SQLITE_PRAGMAS=mode['SQLITE_PRAGMAS']):
+            connection.settings_dict['TEST'] = dict(connection.settings_dict.get('TEST', {}),
+                                                    NAME=str(Path(directory) / "benchmark.sqlite3"))
+            connection.settings_dict['OPTIONS'] = mode['OPTIONS']
+            connection.settings_dict['CONN_MAX_AGE'] = mode['CONN_MAX_AGE']
+            with test_database():
+                summary = run()
+        for operation, (throughput, p50, p99, errors) in summary.items():
+            print(f"  {name:<8} {operation:<9} {throughput:>10.1f} {p50:>9.2f} {p99:>9.2f} {errors:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Compares the validation engine with the previous *Validations classes, which matched string patterns
+on every call and stopped at the first invalid field.
+
+The previous CardValidations and UserValidations are replicated here, without their database checks.
+The previous CardValidations never checked the story points, which the engine does.
+"""
+from benchmarks import setup, measure, report
+
+setup()
+
+import re
+
+from static.services import CardValidations, UserValidations, ModelsAttributeError
+
+ITERATIONS = 20000
+
+CARD = {"card_title": "Fix the login page", "card_description": "The button is misaligned on mobile.\nSee the ticket.",
+        "color": "#1A2B3C", "story_points": "3"}
+USER = {"name": "Mario", "surname": "Rossi", "username": "mario_rossi", "email": "mario.rossi@example.com",
+        "password": "valid_password"}
+
+
+class LegacyCardValidations:
+    def __init__(self, **kwargs):
+        self.___title = kwargs.get('card_title', None) or kwargs.get('title', None)
+        self.___description = kwargs.get('card_description', None) or kwargs.get('description', None)
+        self.___color = kwargs.get('color', None)
+
+    def result(self):
+        if self.___title is not None and not re.match(r'^[a-zA-Z0-9 ]{1,20}$', self.___title):
+            raise ModelsAttributeError("Title")
+        if self.___description is not None and \
+                re.match(r"""^[a-zA-Z0-9 '".,;:!?\-_()\n]{0,256}$""", self.___description) is None:
+            raise ModelsAttributeError("Description")
+        if self.___color is not None and not re.match(r'^#[0-9A-Fa-f]{6}$', self.___color):
+            raise ModelsAttributeError("Color")
+
+
+class LegacyUserValidations:
+    def __init__(self, **kwargs):
+        self.___values = kwargs
+
+    def result(self):
+        patterns = (("name", r'^[a-zA-Z]{1,32}$'), ("surname", r'^[a-zA-Z ]{1,32}$'),
+                    ("username", r'^[a-zA-Z0-9_]{1,32}$'), ("email", r'^[a-zA-Z0-9_.]+@[a-zA-Z0-9.]+\.[a-zA-Z0-9]+$'),
+                    ("password", r'^[a-zA-Z0-9_%$&@!?]{8,32}$'))
+        for key, pattern in patterns:
+            if self.___values.get(key) is not None and re.match(pattern, self.___values[key]) is None:
+                raise ModelsAttributeError(key)
+        return self
+
+
+def main():
+    report(f"Validation of a valid form ({ITERATIONS} forms)", {
+        "legacy card": measure(lambda: LegacyCardValidations(**CARD).result(), ITERATIONS),
+        "engine card": measure(lambda: CardValidations(**CARD).result(), ITERATIONS),
+        "legacy user": measure(lambda: LegacyUserValidations(**USER).result(), ITERATIONS),
+        "engine user": measure(lambda: UserValidations(**USER).result(), ITERATIONS),
+    })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Measures the memory held by the view models of a large board, built by get_board_snapshot.
+
+The legacy view models, which copied full model instances into classes with a per-instance __dict__,
+are replicated here to compare them with the slotted view models built from raw rows.
+"""
+from benchmarks import setup, test_database, report
+
+setup()
+
+import gc
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from django.utils import timezone
+
+from authentication.models import User
+from core.models import Board, Column, Card, Assignee
+from static.utils.utils import get_board_snapshot, no_timezone
+
+COLUMNS = 10
+CARDS = 5000
+
+
+class LegacyAssignee:
+    def __init__(self, username, image):
+        self.username = username
+        self.image = image
+
+
+class LegacyCard:
+    def __init__(self, _card, assignees: list, now: datetime):
+        self.id = _card.id
+        self.title = _card.title
+        self.description = _card.description
+        self.color = _card.color
+        self.creation_date = _card.creation_date
+        self.expiration_date = _card.expiration_date if _card.expiration_date else None
+        self.completion_date = _card.completion_date
+        self.story_points = _card.story_points
+        if _card.expiration_date:
+            self.is_expired = not _card.completion_date and no_timezone(_card.expiration_date) < now
+        else:
+            self.is_expired = False
+        self.assignees = assignees
+
+
+class LegacyColumn:
+    def __init__(self, _column, cards: list):
+        self.id = _column.id
+        self.title = _column.title
+        self.color = _column.color
+        self.cards = cards
+        self.card_count = len(cards)
+
+
+def legacy_snapshot(board_id: int) -> list:
+    now = no_timezone(datetime.now())
+    assignees_of = defaultdict(list)
+    for card_id, username, image in Assignee.objects.filter(board_id=board_id).order_by('id') \
+            .values_list('card_id', 'user_id__username', 'user_id__image'):
+        assignees_of[card_id].append(LegacyAssignee(username, image))
+
+    cards_of = defaultdict(list)
+    for card in Card.objects.filter(board_id=board_id).order_by('index', 'id'):
+        cards_of[card.column_id_id].append(LegacyCard(card, assignees_of.get(card.id, []), now))
+
+    return [LegacyColumn(column, cards_of.get(column.id, []))
+            for column in Column.objects.filter(board_id=board_id).order_by('index', 'id')]
+
+
+def populate() -> int:
+    now = timezone.now()
+    user = User.objects.create(uuid=uuid4().hex, username="benchmark", email="benchmark@example.com",
+                               password="password", name="Name", surname="Surname", last_login=now, date_joined=now)
+    board = Board.objects.create(owner=user, name="Benchmark", creation_date=now)
+    columns = Column.objects.bulk_create(Column(board_id=board, title=f"Column {i}", description="", index=i)
+                                         for i in range(COLUMNS))
+    cards = Card.objects.bulk_create(
+        Card(board_id=board, column_id=columns[i % COLUMNS], title=f"Card {i}", description="A short description.",
+             creation_date=now, expiration_date=now + timedelta(days=i % 30 - 10), index=i)
+        for i in range(CARDS))
+    Assignee.objects.bulk_create(Assignee(board_id=board, card_id=card, user_id=user) for card in cards[::2])
+    return board.id
+
+
+def footprint(build) -> tuple[float, float]:
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return retained / CARDS, peak / CARDS
+
+
+def main():
+    with test_database():
+        board_id = populate()
+        legacy_snapshot(board_id), get_board_snapshot(Column, Card, Assignee, board_id)  # Warms up the ORM caches.
+
+        legacy_retained, legacy_peak = footprint(lambda: legacy_snapshot(board_id))
+        retained, peak = footprint(lambda: get_board_snapshot(Column, Card, Assignee, board_id))
+
+    report(f"Memory per card of a {CARDS}-card board", {
+        "legacy retained": legacy_retained,
+        "slotted retained": retained,
+        "legacy peak": legacy_peak,
+        "slotted peak": peak,
+    }, unit="B/card")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Measures the throughput of concurrent card moves on a SQLite database file, with every request thread writing
+on its own and with the writes funneled through a WriteQueue, which commits them in groups.
+"""
+from benchmarks import setup, test_database
+
+setup()
+
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.db import OperationalError, close_old_connections, connection
+
+from benchmarks.sqlite import populate
+from core.models import Card
+from static.services import WriteQueue
+from static.utils.utils import move_card
+
+WRITERS = 16
+DURATION = 3.0
+
+
+def run(submit) -> tuple[float, float, int]:
+    board_id, columns, cards = populate()
+    connection.close()
+    latencies, errors = [], []
+    deadline = time.perf_counter() + DURATION
+
+    def worker():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                submit(lambda: move_card(Card, board_id, random.choice(cards), random.choice(columns)))
+            except OperationalError:
+                errors.append(1)
+            else:
+                latencies.append(time.perf_counter() - start)
+            close_old_connections()
+        connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(WRITERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0
+    return len(latencies) / DURATION, p99 * 1000, len(errors)
+
+
+def main():
+    print(f"{WRITERS} writers moving cards for {DURATION:.0f}s")
+    print(f"  {'mode':<12} {'moves/s':>10} {'p99 ms':>9} {'locked':>7}")
+    queue = WriteQueue()
+    modes = {"direct": lambda operation: operation(), "write queue": queue.submit}
+    for name, submit in modes.items():
+        with tempfile.TemporaryDirectory() as directory:
+            connection.settings_dict['TEST'] = dict(connection.settings_dict.get('TEST', {}),
+                                                    NAME=str(Path(directory) / "benchmark.sqlite3"))
+            with test_database():
+                throughput, p99, errors = run(submit)
+                queue.close()
+        print(f"  {name:<12} {throughput:>10.1f} {p99:>9.2f} {errors:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from static.services.allocations import merge_reports
+
+
+class Command(BaseCommand):
+    help = "Reports the memory allocated by the traced routes, with the lines retaining the most memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--directory",
+                            help="Report directory (defaults to ALLOCATION_PROFILING_OPTIONS['directory']).")
+        parser.add_argument("--route", help="Only report this route.")
+        parser.add_argument("--top", type=int, default=10, help="Number of lines to show for each route.")
+
+    def handle(self, *args, **options):
+        directory = options["directory"] or getattr(settings, 'ALLOCATION_PROFILING_OPTIONS', {}).get('directory', None)
+        if directory is None:
+            raise CommandError("No report directory configured, use --directory.")
+
+        report = merge_reports(directory)
+        if options["route"] is not None:
+            report = {route: statistics for route, statistics in report.items() if route == options["route"]}
+        if not report:
+            self.stdout.write("No traced requests.")
+            return
+
+        ranked = sorted(report.items(), key=lambda item: item[1]["peak_max"], reverse=True)
+        for route, statistics in ranked:
+            requests = statistics["requests"]
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{route}: {requests} requests, peak {self.___size(statistics['peak_total'] / requests)} mean / "
+                f"{self.___size(statistics['peak_max'])} max, retained "
+                f"{self.___size(statistics['retained_total'] / requests)} mean / "
+                f"{self.___size(statistics['retained_max'])} max"))
+            lines = sorted(statistics["lines"].items(), key=lambda item: item[1][2], reverse=True)
+            for location, (seen, count, size, largest) in lines[:options["top"]]:
+                self.stdout.write(f"    {self.___size(size / requests):>10} mean {self.___size(largest):>10} max "
+                                  f"{count / requests:>8.1f} blocks  {location}")
+
+    @staticmethod
+    def ___size(size: float) -> str:
+        for unit in ("B", "KiB", "MiB"):
+            if size < 1024:
+                return f"{size:.1f} {unit}"
+            size /= 1024
+        return f"{size:.1f} GiB"
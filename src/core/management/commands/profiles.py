@@ -0,0 +1,60 @@
+import pstats
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from static.services import RequestProfiler
+from static.services.profiling import label
+
+
+class Command(BaseCommand):
+    help = "Generates profiling tokens, and lists or compares the cProfile captures of single requests."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--directory", help="Capture directory (defaults to REQUEST_PROFILING_OPTIONS['directory']).")
+        actions = parser.add_subparsers(dest="action", required=True)
+        actions.add_parser("token", help="Print a token that makes a request be profiled.")
+        listing = actions.add_parser("list", help="List the captures.")
+        listing.add_argument("--route", help="Only list the captures of this route.")
+        diff = actions.add_parser("diff", help="Compare the functions of two captures.")
+        diff.add_argument("before", help="Name of the reference capture.")
+        diff.add_argument("after", help="Name of the compared capture.")
+        diff.add_argument("--top", type=int, default=20, help="Number of functions to show.")
+
+    def handle(self, *args, **options):
+        profiler = RequestProfiler(**dict(getattr(settings, 'REQUEST_PROFILING_OPTIONS', {}),
+                                          **({'directory': options["directory"]} if options["directory"] else {})))
+        getattr(self, f"_{options['action']}")(profiler, options)
+
+    def _token(self, profiler: RequestProfiler, options: dict):
+        self.stdout.write(profiler.token())
+
+    def _list(self, profiler: RequestProfiler, options: dict):
+        captures = [capture for capture in profiler.captures()
+                    if options["route"] is None or capture["route"] == options["route"]]
+        if not captures:
+            self.stdout.write("No captures.")
+            return
+        for capture in captures:
+            self.stdout.write(f"{capture['name']}  {capture['method']} {capture['path']} -> {capture['status']}  "
+                              f"{capture['duration'] * 1000:.1f}ms, {capture['calls']} calls")
+
+    def _diff(self, profiler: RequestProfiler, options: dict):
+        before, after = (self.___load(profiler, options[name]) for name in ("before", "after"))
+        functions = set(before) | set(after)
+        changes = sorted(functions, key=lambda function: abs(after.get(function, (0, 0, 0))[2] -
+                                                             before.get(function, (0, 0, 0))[2]), reverse=True)
+
+        self.stdout.write(f"{'calls':>16} {'own ms':>20} {'cumulative ms':>22}  function")
+        for function in changes[:options["top"]]:
+            old, new = before.get(function, (0, 0, 0)), after.get(function, (0, 0, 0))
+            self.stdout.write(f"{old[0]:>7} -> {new[0]:<7} {old[1] * 1000:>8.2f} -> {new[1] * 1000:<8.2f} "
+                              f"{old[2] * 1000:>9.2f} -> {new[2] * 1000:<9.2f}  {label(function)}")
+
+    @staticmethod
+    def ___load(profiler: RequestProfiler, name: str) -> dict[tuple, tuple[int, float, float]]:
+        path = profiler.directory / f"{name.removesuffix('.pstats')}.pstats"
+        if not path.exists():
+            raise CommandError(f"No capture named {name}.")
+        return {function: (calls, own, cumulative)
+                for function, (_, calls, own, cumulative, _) in pstats.Stats(str(path)).stats.items()}
@@ -0,0 +1,82 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.models import User
+from core.models import Board, BoardShard, Column, Card, Assignee, Guest
+from static.utils.utils import SHARDS, move_board, replicate_users
+
+
+class Command(BaseCommand):
+    help = ("Shows, registers and rebalances the boards of the shards. Move boards while nobody writes to them: "
+            "the other processes keep sending the queries of a moved board to its previous shard for "
+            "SHARDING_OPTIONS['cache_ttl'] seconds.")
+
+    def add_arguments(self, parser):
+        actions = parser.add_subparsers(dest="action", required=True)
+        actions.add_parser("status", help="Count the boards of every shard.")
+        actions.add_parser("sync", help="Register the boards of every shard in the directory, and copy the users "
+                                        "to every shard.")
+        rebalance = actions.add_parser("rebalance", help="Move boards until the shards hold as many boards.")
+        rebalance.add_argument("--dry-run", action="store_true", help="Only print the moves.")
+        move = actions.add_parser("move", help="Move a board to a shard.")
+        move.add_argument("board_id", type=int, help="ID of the board.")
+        move.add_argument("alias", help="Alias of the target shard.")
+
+    def handle(self, *args, **options):
+        if SHARDS is None:
+            raise CommandError("Sharding is disabled, see SHARDING_ENABLED.")
+        getattr(self, f"_{options['action']}")(options)
+
+    def _status(self, options: dict):
+        for alias, boards in SHARDS.counts().items():
+            self.stdout.write(f"{alias}: {boards} boards")
+
+    def _sync(self, options: dict):
+        for alias in SHARDS.aliases:
+            entries = [BoardShard(board_id=board_id, alias=alias)
+                       for board_id in Board.objects.using(alias).values_list('id', flat=True)]
+            BoardShard.objects.bulk_create(entries, batch_size=500, ignore_conflicts=True)
+            self.stdout.write(f"{alias}: {len(entries)} boards registered")
+
+        users = list(User.objects.all())
+        for start in range(0, len(users), 500):
+            replicate_users(User, users[start:start + 500], SHARDS.aliases)
+        self.stdout.write(f"{len(users)} users copied to every shard")
+
+    def _rebalance(self, options: dict):
+        counts = SHARDS.counts()
+        moves = []
+        while True:
+            source = max(counts, key=counts.get)
+            target = min(counts, key=counts.get)
+            if counts[source] - counts[target] <= 1:
+                break
+            counts[source] -= 1
+            counts[target] += 1
+            moves.append((source, target))
+
+        if not moves:
+            self.stdout.write("The shards are balanced.")
+            return
+
+        planned = {}
+        for source, target in moves:
+            planned.setdefault(source, []).append(target)
+        for source, targets in planned.items():
+            board_ids = BoardShard.objects.filter(alias=source).order_by('-board_id') \
+                .values_list('board_id', flat=True)[:len(targets)]
+            for board_id, target in zip(board_ids, targets):
+                self.stdout.write(f"board {board_id}: {source} -> {target}")
+                if not options["dry_run"]:
+                    self.___move(board_id, target)
+
+    def _move(self, options: dict):
+        if options["alias"] not in SHARDS.aliases:
+            raise CommandError(f"Unknown shard: {options['alias']}")
+        if not BoardShard.objects.filter(board_id=options["board_id"]).exists():
+            raise CommandError(f"Board {options['board_id']} is not in the directory, run the sync action first.")
+        source = self.___move(options["board_id"], options["alias"])
+        self.stdout.write(f"board {options['board_id']}: {source} -> {options['alias']}")
+
+    @staticmethod
+    def ___move(board_id: int, alias: str) -> str:
+        return move_board(Board, Column, Card, Assignee, Guest, User, board_id, alias)
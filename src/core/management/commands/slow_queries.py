@@ -0,0 +1,63 @@
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from static.services.slowqueries import read_records
+
+
+class Command(BaseCommand):
+    help = "Summarizes the slow query log by SQL fingerprint, worst offenders first."
+
+    ORDERS = {
+        "total": lambda group: group["total"],
+        "count": lambda group: group["count"],
+        "max": lambda group: group["max"],
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", help="Path of the slow query log (defaults to SLOW_QUERY_LOG_OPTIONS['path']).")
+        parser.add_argument("--top", type=int, default=10, help="Number of fingerprints to show.")
+        parser.add_argument("--route", help="Only consider the statements run by this route.")
+        parser.add_argument("--order", choices=sorted(self.ORDERS), default="total",
+                            help="Rank the fingerprints by total time, number of statements or slowest statement.")
+
+    def handle(self, *args, **options):
+        path = options["path"] or getattr(settings, 'SLOW_QUERY_LOG_OPTIONS', {}).get('path', None)
+        if path is None:
+            raise CommandError("No slow query log configured, use --path.")
+
+        records = read_records(path)
+        if options["route"] is not None:
+            records = [record for record in records if record.get("route") == options["route"]]
+        if not records:
+            self.stdout.write("No slow queries recorded.")
+            return
+
+        groups = {}
+        for record in records:
+            group = groups.setdefault(record["fingerprint"], {
+                "count": 0, "total": 0.0, "max": 0.0, "durations": [], "routes": Counter(), "call_sites": Counter(),
+            })
+            group["count"] += 1
+            group["total"] += record["duration"]
+            group["max"] = max(group["max"], record["duration"])
+            group["durations"].append(record["duration"])
+            group["routes"][record.get("route") or "-"] += 1
+            group["call_sites"][record.get("call_site") or "-"] += 1
+
+        ranked = sorted(groups.items(), key=lambda item: self.ORDERS[options["order"]](item[1]), reverse=True)
+        self.stdout.write(f"{len(records)} slow statements, {len(groups)} fingerprints.\n")
+        for rank, (sql, group) in enumerate(ranked[:options["top"]], start=1):
+            durations = sorted(group["durations"])
+            p95 = durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+            self.stdout.write(self.style.SQL_KEYWORD(f"#{rank} {sql}"))
+            self.stdout.write(f"    count {group['count']}, total {group['total']:.3f}s, "
+                              f"mean {group['total'] / group['count'] * 1000:.1f}ms, p95 {p95 * 1000:.1f}ms, "
+                              f"max {group['max'] * 1000:.1f}ms")
+            self.stdout.write(f"    routes: {self.___top(group['routes'])}")
+            self.stdout.write(f"    call sites: {self.___top(group['call_sites'])}")
+
+    @staticmethod
+    def ___top(counter: Counter, limit: int = 3) -> str:
+        return ", ".join(f"{name} ({count})" for name, count in counter.most_common(limit))
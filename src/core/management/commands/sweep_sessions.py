@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from static.services.sessions import sweep_expired_sessions
+
+
+class Command(BaseCommand):
+    help = "Deletes the expired sessions in batches, so that the write lock of the database is never held for long."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Number of sessions deleted by each statement.")
+        parser.add_argument("--pause", type=float, default=0.05, help="Seconds to wait between two batches.")
+
+    def handle(self, *args, **options):
+        deleted = sweep_expired_sessions(options["batch_size"], options["pause"])
+        if deleted is None:
+            self.stdout.write(f"{settings.SESSION_ENGINE} clears its own expired sessions.")
+        else:
+            self.stdout.write(f"Deleted {deleted} expired sessions.")
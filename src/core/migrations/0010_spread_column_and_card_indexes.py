@@ -0,0 +1,39 @@
+from django.db import migrations
+
+ORDER_GAP = 1024
+
+
+def renumber(apps, gap: int, offset: int):
+    """
+    Renumbers the columns of every board and the cards of every column, keeping their current order.
+    """
+    Column = apps.get_model('core', 'Column')
+    Card = apps.get_model('core', 'Card')
+
+    for model, group in ((Column, 'board_id'), (Card, 'column_id')):
+        changed, last_group, position = [], None, 0
+        for element in model.objects.order_by(group, 'index', 'id').only('id', group, 'index'):
+            position = position + 1 if getattr(element, f"{group}_id") == last_group else 0
+            last_group = getattr(element, f"{group}_id")
+            element.index = gap * position + offset
+            changed.append(element)
+        model.objects.bulk_update(changed, ['index'], batch_size=500)
+
+
+def spread_indexes(apps, schema_editor):
+    renumber(apps, ORDER_GAP, ORDER_GAP)
+
+
+def compact_indexes(apps, schema_editor):
+    renumber(apps, 1, 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_alter_assignee_unique_together'),
+    ]
+
+    operations = [
+        migrations.RunPython(spread_indexes, compact_indexes),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_spread_column_and_card_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='board',
+            name='revision',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='column',
+            name='revision',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
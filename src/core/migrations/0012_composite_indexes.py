@@ -0,0 +1,59 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0005_alter_user_image'),
+        ('core', '0011_board_revision'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='card',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='column',
+            unique_together=set(),
+        ),
+        migrations.AlterField(
+            model_name='assignee',
+            name='card_id',
+            field=models.ForeignKey(db_column='card_id', db_index=False, on_delete=django.db.models.deletion.CASCADE, to='core.card'),
+        ),
+        migrations.AlterField(
+            model_name='card',
+            name='board_id',
+            field=models.ForeignKey(db_column='board_id', db_index=False, on_delete=django.db.models.deletion.CASCADE, to='core.board'),
+        ),
+        migrations.AlterField(
+            model_name='column',
+            name='board_id',
+            field=models.ForeignKey(db_column='board_id', db_index=False, on_delete=django.db.models.deletion.CASCADE, to='core.board'),
+        ),
+        migrations.AlterField(
+            model_name='guest',
+            name='user_id',
+            field=models.ForeignKey(db_column='user_id', db_index=False, on_delete=django.db.models.deletion.CASCADE, to='authentication.user'),
+        ),
+        migrations.AddIndex(
+            model_name='assignee',
+            index=models.Index(fields=['card_id', 'board_id'], name='assignee_card_board'),
+        ),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['board_id', 'column_id', 'index'], name='card_board_column_index'),
+        ),
+        migrations.AddIndex(
+            model_name='card',
+            index=models.Index(fields=['board_id', 'completion_date', 'expiration_date'], name='card_board_due'),
+        ),
+        migrations.AddIndex(
+            model_name='column',
+            index=models.Index(fields=['board_id', 'index'], name='column_board_index'),
+        ),
+    ]
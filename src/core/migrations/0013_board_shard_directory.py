@@ -0,0 +1,20 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardShard',
+            fields=[
+                ('board_id', models.AutoField(primary_key=True, serialize=False)),
+                ('alias', models.CharField(max_length=32)),
+            ],
+        ),
+    ]
@@ -13,6 +13,7 @@ class Board(models.Model):
     description = models.TextField(default="", max_length=256)
     image = models.ImageField(blank=True, null=True)
     creation_date = models.DateTimeField()
+    revision = models.PositiveBigIntegerField(default=0)
 
     def __str__(self):
         return self.name
@@ -20,7 +21,8 @@ class Board(models.Model):
 
 class Guest(models.Model):
     id = models.AutoField(primary_key=True)
-    user_id = models.ForeignKey(User, on_delete=models.CASCADE, db_column="user_id")
+    # Covered by the unique (user_id, board_id) index.
+    user_id = models.ForeignKey(User, on_delete=models.CASCADE, db_column="user_id", db_index=False)
     board_id = models.ForeignKey(Board, on_delete=models.CASCADE, db_column="board_id")
 
     class Meta:
@@ -32,14 +34,18 @@ class Guest(models.Model):
 
 class Column(models.Model):
     id = models.AutoField(primary_key=True)
-    board_id = models.ForeignKey(Board, on_delete=models.CASCADE, db_column="board_id")
+    # Covered by the (board_id, index) index.
+    board_id = models.ForeignKey(Board, on_delete=models.CASCADE, db_column="board_id", db_index=False)
     title = models.CharField(max_length=20)
     description = models.TextField(max_length=256)
     color = models.CharField(default="#808080", max_length=7)
     index = models.IntegerField()
+    revision = models.PositiveBigIntegerField(default=0)
 
     class Meta:
-        unique_together = ('id', 'board_id')
+        indexes = [
+            models.Index(fields=['board_id', 'index'], name='column_board_index'),
+        ]
 
     def __str__(self):
         return self.title
@@ -47,7 +53,8 @@ class Column(models.Model):
 
 class Card(models.Model):
     id = models.AutoField(primary_key=True)
-    board_id = models.ForeignKey(Board, on_delete=models.CASCADE, db_column="board_id")
+    # Covered by the (board_id, column_id, index) index.
+    board_id = models.ForeignKey(Board, on_delete=models.CASCADE, db_column="board_id", db_index=False)
     column_id = models.ForeignKey(Column, on_delete=models.CASCADE, db_column="column_id")
     title = models.CharField(max_length=20)
     description = models.TextField(max_length=256)
@@ -59,7 +66,12 @@ class Card(models.Model):
     index = models.IntegerField()
 
     class Meta:
-        unique_together = ('id', 'board_id')
+        indexes = [
+            # The cards of a board, or of one of its columns, in the order they are shown.
+            models.Index(fields=['board_id', 'column_id', 'index'], name='card_board_column_index'),
+            # The expired cards of a board: not completed, expiring before a point in time.
+            models.Index(fields=['board_id', 'completion_date', 'expiration_date'], name='card_board_due'),
+        ]
 
     def __str__(self):
         return self.title
@@ -69,10 +81,26 @@ class Assignee(models.Model):
     id = models.AutoField(primary_key=True)
     user_id = models.ForeignKey(User, on_delete=models.CASCADE, db_column="user_id")
     board_id = models.ForeignKey(Board, on_delete=models.CASCADE, db_column="board_id")
-    card_id = models.ForeignKey(Card, on_delete=models.CASCADE, db_column="card_id")
+    # Covered by the (card_id, board_id) index.
+    card_id = models.ForeignKey(Card, on_delete=models.CASCADE, db_column="card_id", db_index=False)
 
     class Meta:
         unique_together = ('user_id', 'card_id', 'board_id', 'id')
+        indexes = [
+            models.Index(fields=['card_id', 'board_id'], name='assignee_card_board'),
+        ]
 
     def __str__(self):
         return f"{self.user_id} - {self.card_id}"
+
+
+class BoardShard(models.Model):
+    """
+    The directory of the boards: the database alias of the shard holding each board (see static/services/sharding.py).
+    It only exists in the default database, and hands out the IDs of the new boards.
+    """
+    board_id = models.AutoField(primary_key=True)
+    alias = models.CharField(max_length=32)
+
+    def __str__(self):
+        return f"{self.board_id} - {self.alias}"
@@ -1,9 +1,70 @@
-from django.db.models.signals import post_delete
+from uuid import UUID
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.backends.signals import connection_created
+from django.core.signals import request_started
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from core.models import Guest, Assignee
+from authentication.models import User
+from core.models import Board, Guest, Assignee
+from static.services.sqlite import apply_pragmas
+from static.utils.utils import BOARD_EVENTS, SLOW_QUERIES, SHARDS, replicate_users, invalidate_board_roles, \
+    forget_board_roles
 
 
 @receiver(post_delete, sender=Guest)
-def delete_assignees(sender, instance, **kwargs):
-    Assignee.objects.filter(board_id=instance.board_id, user_id=instance.user_id).delete()
\ No newline at end of file
+def delete_assignees(sender, instance, using, **kwargs):
+    Assignee.objects.using(using).filter(board_id=instance.board_id_id, user_id=instance.user_id_id).delete()
+
+
+@receiver([post_save, post_delete], sender=Guest)
+def invalidate_guest_access(sender, instance, using, **kwargs):
+    invalidate_board_roles(instance.board_id_id, UUID(str(instance.user_id_id)).hex, using)
+
+
+@receiver([post_save, post_delete], sender=Board)
+def invalidate_board_access(sender, instance, using, **kwargs):
+    invalidate_board_roles(instance.id, using=using)
+
+
+@receiver(request_started)
+def listen_board_roles(sender, **kwargs):
+    # Only the processes serving requests cache roles, so only they listen to the invalidations of the other
+    # processes, from their first request on (management commands never start the poller of the event backend).
+    request_started.disconnect(listen_board_roles)
+    BOARD_EVENTS.listen(forget_board_roles)
+
+
+@receiver(connection_created)
+def record_slow_queries(sender, connection, **kwargs):
+    if SLOW_QUERIES is not None:
+        SLOW_QUERIES.install(connection)
+
+
+@receiver(connection_created)
+def tune_sqlite(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite':
+        apply_pragmas(connection.connection, getattr(settings, 'SQLITE_PRAGMAS', {}))
+
+
+@receiver(post_save, sender=User)
+def replicate_user(sender, instance, using, **kwargs):
+    if SHARDS is not None and using == DEFAULT_DB_ALIAS:
+        replicate_users(User, [instance], SHARDS.aliases)
+
+
+@receiver(post_delete, sender=User)
+def delete_user_replicas(sender, instance, using, **kwargs):
+    if SHARDS is not None and using == DEFAULT_DB_ALIAS:
+        for alias in SHARDS.aliases:
+            if alias != DEFAULT_DB_ALIAS:
+                User.objects.using(alias).filter(uuid=instance.uuid).delete()
+
+
+@receiver(post_delete, sender=Board)
+def forget_board_shard(sender, instance, using, **kwargs):
+    # A board deleted from the shard it was moved away from is still in the directory, under its new shard.
+    if SHARDS is not None and SHARDS.alias(instance.id) == using:
+        SHARDS.forget(instance.id)
@@ -3,9 +3,9 @@ from datetime import datetime
 from io import BytesIO
 from uuid import uuid4
 
-from django.db.models import F, Sum, Value
-from django.db.models.functions import Coalesce
-from django.http import HttpResponse
+from django.conf import settings
+from django.db.models import Q
+from django.http import HttpResponse, HttpResponseNotModified, StreamingHttpResponse
 from django.shortcuts import render, redirect
 from django.urls import reverse
 from django.views.decorators.csrf import requires_csrf_token
@@ -13,15 +13,22 @@ from django.views.decorators.csrf import requires_csrf_token
 from authentication.models import User
 from core.models import Board, Column, Card, Guest, Assignee
 from static.services import RequestHandler, ColumnValidations, BoardValidations, ModelsAttributeError, CardValidations
+from static.utils.viewmodels import TemplateBoard, TemplateUser
 from static.utils.utils import get_user_from, response_error, get_board, check_board_invalid, \
     check_user_not_owner_or_guest, no_timezone, get_cards_of_board, get_expired_cards_of_board, get_user, \
-    check_user_not_owner, response_success, get_guest, get_columns, get_boards_owned, check_user_not_guest, \
-    get_board_elements
+    check_user_not_owner, response_success, get_guest, get_columns, check_user_not_guest, get_board_snapshot, \
+    get_board_statistics, list_accessible_boards, apply_board_ordering, get_next_index, move_card, bump_board_revision, \
+    BOARD_EVENTS, render_board_elements, ROUTE_METRICS, REQUEST_PROFILER, ALLOCATION_PROFILER, submit_write, \
+    READ_REPLICAS, SHARDS, insert_board, board_transaction, aget_user_from, aget_user, aget_board, acheck_user_not_owner_or_guest, \
+    alist_accessible_boards, aget_board_statistics, aget_board_snapshot, arender_board_elements, alist, supports_push
 
 
 
 # Create your views here.
-HANDLER = RequestHandler()
+HANDLER = RequestHandler(ROUTE_METRICS, REQUEST_PROFILER, ALLOCATION_PROFILER, READ_REPLICAS, SHARDS,
+                         getattr(settings, 'ASYNC_VIEWS_ENABLED', False))
+DASHBOARD_PAGE_SIZE = getattr(settings, 'DASHBOARD_PAGE_SIZE', 50)
+METRICS_ALLOWED_ADDRESSES = getattr(settings, 'METRICS_ALLOWED_ADDRESSES', ['127.0.0.1', '::1'])
 
 
 @HANDLER.bind('dashboard', 'dashboard/', request='GET', session=True)
@@ -37,22 +44,53 @@ def dashboard(request):
     uuid = get_user_from(request)
     user = get_user(User, uuid)
 
-    boards_owned = [board for board in get_boards_owned(Board, uuid)]
-    boards_guested = [board for board in Board.objects.all() if not check_user_not_guest(Guest, board.id, uuid)]
+    try:
+        after = int(request.GET['after']) if 'after' in request.GET else None
+        limit = max(1, min(int(request.GET.get('limit', DASHBOARD_PAGE_SIZE)), DASHBOARD_PAGE_SIZE))
+    except ValueError:
+        return response_error("Invalid pagination parameters.")
+
+    # One extra board is fetched to know whether there is a next page.
+    boards = [TemplateBoard.from_row(row, uuid)
+              for row in list_accessible_boards(Board, Guest, uuid, TemplateBoard.FIELDS, after, limit + 1)]
+    next_after = boards[limit - 1].id if len(boards) > limit else None
+    boards = boards[:limit]
+
+    return render(request, 'dashboard.html', {
+        'user': user,
+        'boards': boards,
+        'next_after': next_after
+    })
+
+
+@HANDLER.variant('dashboard')
+@requires_csrf_token
+async def dashboard_async(request):
+    """
+    Async variant of the dashboard view, which awaits its queries instead of holding a worker thread.
+    The async ORM runs the queries of a request one after another, on the thread of its connection.
 
-    class TemplateBoard:
-        def __init__(self, board):
-            self.name = board.name
-            self.description = board.description
-            self.image = board.image
-            self.id = board.id
-            self.is_guest = board.owner != uuid
+    :param request: HttpRequest - The HTTP request object.
+    :return: HttpResponse - The rendered HTML page with the user details and boards.
+    """
+    uuid = await aget_user_from(request)
 
-    boards_owned = [TemplateBoard(board) for board in boards_owned + boards_guested]
+    try:
+        after = int(request.GET['after']) if 'after' in request.GET else None
+        limit = max(1, min(int(request.GET.get('limit', DASHBOARD_PAGE_SIZE)), DASHBOARD_PAGE_SIZE))
+    except ValueError:
+        return response_error("Invalid pagination parameters.")
+
+    user = await aget_user(User, uuid)
+    rows = await alist_accessible_boards(Board, Guest, uuid, TemplateBoard.FIELDS, after, limit + 1)
+    boards = [TemplateBoard.from_row(row, uuid) for row in rows]
+    next_after = boards[limit - 1].id if len(boards) > limit else None
+    boards = boards[:limit]
 
     return render(request, 'dashboard.html', {
         'user': user,
-        'boards': boards_owned
+        'boards': boards,
+        'next_after': next_after
     })
 
 
@@ -81,13 +119,49 @@ def board(request, board_id):
         'name': board.name,
         'description': board.description,
         'image': board.image,
-        'creation_date': board.creation_date
+        'creation_date': board.creation_date,
+        'revision': board.revision
     }
 
-    columns = get_board_elements(Column, Card, Assignee, User, board_id)
     return render(request, "boards.html", {
         "board": board_info,
-        "columns": columns
+        "board_elements": render_board_elements(request, board),
+        "board_events": supports_push(request)
+    })
+
+
+@HANDLER.variant("board")
+@requires_csrf_token
+async def board_async(request, board_id):
+    """
+    Async variant of the board view, which awaits its queries instead of holding a worker thread.
+
+    :param request: HttpRequest - The HTTP request object.
+    :param board_id: int - The ID of the board to display.
+    :return: HttpResponse - The rendered HTML page with the board details.
+    """
+    uuid = await aget_user_from(request)
+    board = await aget_board(Board, board_id)
+
+    if check_board_invalid(board):
+        return response_error("Board not found.")
+
+    if await acheck_user_not_owner_or_guest(Board, Guest, board_id, uuid):
+        return response_error("You do not have access to this board.")
+
+    board_info = {
+        'id': board.id,
+        'name': board.name,
+        'description': board.description,
+        'image': board.image,
+        'creation_date': board.creation_date,
+        'revision': board.revision
+    }
+
+    return render(request, "boards.html", {
+        "board": board_info,
+        "board_elements": await arender_board_elements(request, board),
+        "board_events": supports_push(request)
     })
 
 
@@ -111,35 +185,41 @@ def burndown_view(request, board_id):
     if check_user_not_owner_or_guest(Board, Guest, board_id, uuid):
         return response_error("You do not have access to this board.")
 
-    class TemplateColumn:
-        def __init__(self, _column):
-            nonlocal board
-            self.name = _column.title
-            cards = Card.objects.filter(column_id=_column, board_id=board)
-            self.active_cards = cards.filter(expiration_date__gt=no_timezone(datetime.now()), completion_date__isnull=True).count() \
-                                + cards.filter(expiration_date__isnull=True).count()
-            self.expired_cards = cards.filter(expiration_date__lt=no_timezone(datetime.now()), completion_date__isnull=True).count()
-            self.completed_cards = cards.filter(completion_date__isnull=False).count()
-            self.total_cards = cards.count()
-            self.story_points = cards.aggregate(total_story_points=Coalesce(Sum(F('story_points')), Value(0)))['total_story_points']
-
-    # column cards
-    columns = get_columns(Column, board_id)
-    columns = [TemplateColumn(column) for column in columns]
-    total_cards = sum([column.total_cards for column in columns])
-    total_active_cards = sum([column.active_cards for column in columns])
-    total_expired_cards = sum([column.expired_cards for column in columns])
-    total_completed_cards = sum([column.completed_cards for column in columns])
-    total_story_points = sum([column.story_points for column in columns])
+    columns, totals = get_board_statistics(Column, board_id)
+
+    return render(request, 'burndown.html', {
+        'board': board,
+        'columns': columns,
+        **totals
+    })
+
+
+@HANDLER.variant("burndown")
+@requires_csrf_token
+async def burndown_view_async(request, board_id):
+    """
+    Async variant of the burndown_view view, which awaits its queries instead of holding a worker thread.
+    The statistics are only computed once the access of the user has been checked.
+
+    :param request: HttpRequest - The HTTP request object.
+    :param board_id: int - The ID of the board to display.
+    :return: HttpResponse - The rendered HTML page with the burndown chart.
+    """
+    uuid = await aget_user_from(request)
+    board = await aget_board(Board, board_id)
+
+    if check_board_invalid(board):
+        return response_error("Board not found.")
+
+    if await acheck_user_not_owner_or_guest(Board, Guest, board_id, uuid):
+        return response_error("You do not have access to this board.")
+
+    columns, totals = await aget_board_statistics(Column, board_id)
 
     return render(request, 'burndown.html', {
         'board': board,
         'columns': columns,
-        'total_active_cards': total_active_cards,
-        'total_expired_cards': total_expired_cards,
-        'total_completed_cards': total_completed_cards,
-        'total_cards': total_cards,
-        'total_story_points': total_story_points,
+        **totals
     })
 
 
@@ -235,11 +315,11 @@ def new_board(request):
         return response_error(f"Could not create the board: {e}")
 
     try:
-        new_board = Board.objects.create(
+        new_board = insert_board(
+            Board,
             owner=user,
             name=board_title,
             creation_date=no_timezone(datetime.now()))
-        new_board.save()
     except Exception as e:
         return response_error(f"Couldn't create the board: {e}")
 
@@ -279,20 +359,21 @@ def new_column(request, board_id):
     except ModelsAttributeError as e:
         return response_error(f"Could not create the column: {e}")
 
-    column_index = get_columns(Column, board_id).count()
-
-    if column_index != 0:
-        column_index -= 1
-
-    try:
+    # The ordering key is read in the transaction that inserts the column, so that two concurrent inserts
+    # never read the same last key.
+    def create():
         new_column = Column.objects.create(
             board_id=board,
             title=title,
             color=color,
             description=description,
-            index=column_index
+            index=get_next_index(Column, board_id=board)
         )
         new_column.save()
+        bump_board_revision(Board, Column, board_id, [new_column.id])
+
+    try:
+        submit_write(create)
     except Exception as e:
         return response_error(f"Couldn't create the column: {e}")
 
@@ -325,8 +406,6 @@ def new_card(request, board_id):
     date = request.POST.get("expiration_date", None)
     story_points = request.POST.get("story_points", 0)
 
-    index = Card.objects.filter(column_id=column_id, board_id=board.id).count()
-
     if not title or not description:
         return response_error("Title and description are required.")
 
@@ -341,7 +420,6 @@ def new_card(request, board_id):
         "color": color,
         "creation_date": no_timezone(datetime.now()),
         "story_points": story_points,
-        "index": index
     }
     if date:
         values["expiration_date"] = date
@@ -351,9 +429,14 @@ def new_card(request, board_id):
     except ModelsAttributeError as e:
         return response_error(f"Could not create the card: {e}")
 
+    # The ordering key is read in the transaction that inserts the card, so that two concurrent inserts
+    # never read the same last key.
+    def create():
+        new_card = Card.objects.create(**values, index=get_next_index(Card, column_id=column_id, board_id=board.id))
+        bump_board_revision(Board, Column, board_id, [new_card.column_id_id])
+
     try:
-        new_card = Card.objects.create(**values)
-        new_card.save()
+        submit_write(create)
     except Exception as e:
         return response_error(f"Couldn't create the card: {e}")
 
@@ -410,7 +493,9 @@ def update_board(request, board_id):
             board.name = title
         if description := updates.get('board_description', None):
             board.description = description
-        board.save()
+        with board_transaction():
+            board.save()
+            bump_board_revision(Board, Column, board_id)
     except Exception as e:
         return response_error(f"Couldn't update the board: {e}")
 
@@ -468,7 +553,9 @@ def update_column(request, board_id, column_id):
             column.description = description
         if color := updates.get('column_color', None):
             column.color = color
-        column.save()
+        with board_transaction():
+            column.save()
+            bump_board_revision(Board, Column, board_id, [column.id])
     except Exception as e:
         return response_error(f"Couldn't update the column: {e}")
 
@@ -490,24 +577,51 @@ def update_board_elements(request, board_id):
     if check_user_not_owner_or_guest(Board, Guest, board_id, uuid):
         return response_error("You do not have access to this board.")
 
-    board = get_board(Board, board_id)
-    columns = json.loads(request.body)
+    try:
+        payload = json.loads(request.body)
+        changed = submit_write(lambda: apply_board_ordering(Column, Card, board_id, payload))
+    except (ValueError, ModelsAttributeError) as e:
+        return response_error(f"Could not update the board elements: {e}")
 
-    for column in columns:
-        column_id = int(column.get("id"))
-        column_index = int(column.get("index"))
-        col_instance = Column.objects.filter(id=column_id, board_id=board.id).first()
-        col_instance.index = column_index
-        col_instance.save()
-        for card in column.get("cards"):
-            card_id = int(card.get("id"))
-            card_index = int(card.get("index"))
-            card_instance = Card.objects.filter(id=card_id, board_id=board.id).first()
-            card_instance.index = card_index
-            card_instance.column_id = col_instance
-            card_instance.save()
+    return response_success(f"Board elements updated successfully: {changed} element(s) changed.")
 
-    return response_success("Board elements updated successfully.")
+
+@HANDLER.bind("move_card", "board/<int:board_id>/card/<int:card_id>/move/", request="POST", session=True)
+@requires_csrf_token
+def move_card_view(request, board_id, card_id):
+    """
+    Moves a card to a column, before another card of that column or at its end.
+    Requires the method to be POST and the user to be authenticated.
+
+    Only the moved card is written, so a single drag costs a single-row update.
+
+    :param request: HttpRequest - The HTTP request object.
+    :param board_id: int - The ID of the board of the card.
+    :param card_id: int - The ID of the card to move.
+    :return: JsonResponse - The JSON response with the result of the operation.
+    """
+    uuid = get_user_from(request)
+    if check_user_not_owner_or_guest(Board, Guest, board_id, uuid):
+        return response_error("You do not have access to this board.")
+
+    try:
+        column_id = int(request.POST.get("column"))
+        before_id = int(before) if (before := request.POST.get("before", None)) else None
+    except (TypeError, ValueError):
+        return response_error("You must select a valid column to move the card to.")
+
+    if not Card.objects.filter(id=card_id, board_id=board_id).exists():
+        return response_error("Card not found.")
+
+    if not Column.objects.filter(id=column_id, board_id=board_id).exists():
+        return response_error("Column not found.")
+
+    try:
+        submit_write(lambda: move_card(Card, board_id, card_id, column_id, before_id))
+    except ModelsAttributeError as e:
+        return response_error(f"Could not move the card: {e}")
+
+    return response_success("Card moved successfully.")
 
 
 @HANDLER.bind("board_update_sync", "board/<int:board_id>/update/sync/", session=True, request="GET")
@@ -516,6 +630,10 @@ def sync_board(request, board_id):
     Synchronizes the board elements (columns and cards).
     Requires the method to be GET and the user to be authenticated.
 
+    The response carries the board revision as its ETag, so a client that already has the latest revision
+    gets an empty 304 response. Given a 'since' revision, only the columns changed after it are rendered,
+    together with the current order of the columns so that the client can drop the removed ones.
+
     :param request: HttpRequest - The HTTP request object.
     :param board_id: int - The ID of the board to synchronize.
     :return: JsonResponse - The JSON response with the result of the operation.
@@ -525,8 +643,108 @@ def sync_board(request, board_id):
         return response_error("You do not have access to this board.")
 
     board = get_board(Board, board_id)
-    columns = get_board_elements(Column, Card, Assignee, User, board_id)
-    return response_success(render(request, "modals/board_elements.html", {"columns": columns, "board": board}).content.decode("utf-8"))
+    if check_board_invalid(board):
+        return response_error("Board not found.")
+
+    etag = f'"{board.id}-{board.revision}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    try:
+        since = int(request.GET['since']) if 'since' in request.GET else None
+    except ValueError:
+        since = None
+
+    if since is None or since > board.revision:
+        response = response_success(render_board_elements(request, board), revision=board.revision)
+    else:
+        columns = {
+            column.id: render(request, "modals/column_element.html", {"column": column, "board": board}).content.decode("utf-8")
+            for column in get_board_snapshot(Column, Card, Assignee, board_id, since)
+        }
+        order = list(get_columns(Column, board_id).order_by('index', 'id').values_list('id', flat=True))
+        response = response_success("Board elements synchronized.", revision=board.revision, columns=columns, order=order)
+
+    response['ETag'] = etag
+    return response
+
+
+@HANDLER.variant("board_update_sync")
+async def sync_board_async(request, board_id):
+    """
+    Async variant of the sync_board view, which awaits its queries instead of holding a worker thread.
+
+    :param request: HttpRequest - The HTTP request object.
+    :param board_id: int - The ID of the board to synchronize.
+    :return: JsonResponse - The JSON response with the result of the operation.
+    """
+    uuid = await aget_user_from(request)
+    if await acheck_user_not_owner_or_guest(Board, Guest, board_id, uuid):
+        return response_error("You do not have access to this board.")
+
+    board = await aget_board(Board, board_id)
+    if check_board_invalid(board):
+        return response_error("Board not found.")
+
+    etag = f'"{board.id}-{board.revision}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    try:
+        since = int(request.GET['since']) if 'since' in request.GET else None
+    except ValueError:
+        since = None
+
+    if since is None or since > board.revision:
+        response = response_success(await arender_board_elements(request, board), revision=board.revision)
+    else:
+        snapshot = await aget_board_snapshot(Column, Card, Assignee, board_id, since)
+        order = await alist(get_columns(Column, board_id).order_by('index', 'id').values_list('id', flat=True))
+        columns = {
+            column.id: render(request, "modals/column_element.html", {"column": column, "board": board}).content.decode("utf-8")
+            for column in snapshot
+        }
+        response = response_success("Board elements synchronized.", revision=board.revision, columns=columns, order=order)
+
+    response['ETag'] = etag
+    return response
+
+
+@HANDLER.bind("board_events", "board/<int:board_id>/events/", request="GET", session=True)
+def board_events(request, board_id):
+    """
+    Streams the change events of the board as Server-Sent Events.
+    Requires the method to be GET and the user to be authenticated.
+
+    Each event carries the new revision of the board and the columns that changed, so that the client
+    only has to ask sync_board for those. The stream is only served by the ASGI application, where it does not
+    hold a worker thread while waiting for events: under WSGI the response is an empty 204, which also tells
+    the EventSource of the client not to reconnect.
+
+    :param request: HttpRequest - The HTTP request object.
+    :param board_id: int - The ID of the board to listen to.
+    :return: StreamingHttpResponse - The event stream.
+    """
+    if not supports_push(request):
+        return HttpResponse(status=204)
+
+    uuid = get_user_from(request)
+    if check_user_not_owner_or_guest(Board, Guest, board_id, uuid):
+        return response_error("You do not have access to this board.")
+
+    async def stream():
+        yield "retry: 5000\n\n"
+        async for event in BOARD_EVENTS.subscribe(board_id):
+            yield ": keepalive\n\n" if event is None else f"data: {json.dumps(event)}\n\n"
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
 @HANDLER.bind("update_card", "board/<int:board_id>/card/<int:card_id>/update/", request="POST", session=True)
@@ -584,24 +802,38 @@ def update_card(request, board_id, card_id):
         return response_error(f"Could not update this card: {e}")
 
     # Update the card with the new values.
-    try:
+    # The card is read again when the update runs, and only the changed fields are written, so that a move
+    # committed in the meantime (e.g. earlier in the same write queue batch) is not undone.
+    def update():
+        card = Card.objects.filter(id=card_id, board_id=board).first()
+        if not card:
+            raise ModelsAttributeError("Card not found.")
+
+        fields = []
         if title := updates.get('card_title', None):
             card.title = title
+            fields.append('title')
         if description := updates.get('card_description', None):
             card.description = description
+            fields.append('description')
         if color := updates.get('color', None):
             card.color = color
+            fields.append('color')
         if date := updates.get('expiration_date', None):
             card.expiration_date = date
+            fields.append('expiration_date')
         if story_points := updates.get('story_points', None):
             card.story_points = story_points
+            fields.append('story_points')
         if completed := updates.get('completed', None):
             if completed == "true":
                 completed = no_timezone(datetime.now())
                 card.completion_date = completed
             else:
                 card.completion_date = None
-        card.save()
+            fields.append('completion_date')
+        if fields:
+            card.save(update_fields=fields)
 
         # Update the assignees of the card.
         users = {get_user(User, username=assignee): False if value == "false" else True for assignee, value in assignees.items()}
@@ -616,6 +848,11 @@ def update_card(request, board_id, card_id):
                 Assignee.objects.filter(**params).delete()
             else:
                 continue
+
+        bump_board_revision(Board, Column, board_id, [card.column_id_id])
+
+    try:
+        submit_write(update)
     except Exception as e:
         return response_error(f"Couldn't update the card: {e}")
 
@@ -682,11 +919,10 @@ def remove_column(request, board_id, column_id):
     if not column:
         return response_error("Column not found.")
 
-    columns = Column.objects.filter(board_id=board, index__gt=column.index).all()
-    columns.update(index=F('index') - 1)
-
     try:
-        column.delete()
+        with board_transaction():
+            column.delete()
+            bump_board_revision(Board, Column, board_id)
     except Exception as e:
         return response_error(f"Couldn't delete the column: {e}")
 
@@ -721,11 +957,12 @@ def remove_card(request, board_id, card_id):
     if not card:
         return response_error("Card not found.")
 
-    cards = Card.objects.filter(column_id=card.column_id, index__gt=card.index).all()
-    cards.update(index=F('index') - 1)
+    def remove():
+        card.delete()
+        bump_board_revision(Board, Column, board_id, [card.column_id_id])
 
     try:
-        card.delete()
+        submit_write(remove)
     except Exception as e:
         return response_error(f"Couldn't delete the card: {e}")
 
@@ -753,7 +990,10 @@ def remove_user_view(request, board_id):
     try:
         uuid = str(get_user(User, username=username_to_remove).uuid)
         if guest := get_guest(Guest, board_id, uuid):
-            guest.delete()
+            columns = list(Card.objects.filter(board_id=board_id, assignee__user_id=uuid).values_list('column_id', flat=True))
+            with board_transaction():
+                guest.delete()
+                bump_board_revision(Board, Column, board_id, columns)
     except Exception as e:
         return response_error(f"Error: {e}")
 
@@ -868,16 +1108,10 @@ def update_card_modal(request, board_id, card_id):
     if not card:
         return response_error("Card not found.")
 
-    class TemplateUser:
-        def __init__(self, user):
-            nonlocal card
-            self.username = user.username
-            self.is_assigned = Assignee.objects.filter(card_id=card, user_id=user).exists()
-
-    guests = [guest.user_id.uuid for guest in Guest.objects.filter(board_id=board)] + [board.owner.uuid]
-    users = User.objects.filter(uuid__in=guests)
-
-    users = [TemplateUser(user) for user in users]
+    members = Q(uuid=board.owner_id) | Q(uuid__in=Guest.objects.filter(board_id=board).values('user_id'))
+    assigned = set(Assignee.objects.filter(card_id=card).values_list('user_id', flat=True))
+    users = [TemplateUser(username, user_uuid in assigned)
+             for user_uuid, username in User.objects.filter(members).values_list('uuid', 'username')]
 
     modal = render(request, "modals/update_card.html", {
         'board_id': board_id,
@@ -1003,11 +1237,17 @@ def invite_user(request, board_id):
 
     guests = [get_user(User, username=username) for username in guests]
 
-    Guest.objects.filter(board_id=board).exclude(user_id__in=guests).delete()
+    with board_transaction():
+        removed = Guest.objects.filter(board_id=board).exclude(user_id__in=guests)
+        columns = list(Card.objects.filter(board_id=board, assignee__user_id__in=removed.values('user_id'))
+                       .values_list('column_id', flat=True))
+        removed.delete()
+
+        for guest in guests:
+            if not Guest.objects.filter(board_id=board, user_id=guest).exists():
+                Guest.objects.create(board_id=board, user_id=guest)
 
-    for guest in guests:
-        if not Guest.objects.filter(board_id=board, user_id=guest).exists():
-            Guest.objects.create(board_id=board, user_id=guest)
+        bump_board_revision(Board, Column, board_id, columns)
 
     return response_success("Changes committed successfully.")
 
@@ -1059,3 +1299,17 @@ def acceptance_deletion(request):
 
     return redirect(reverse('no_auth:login'))
 
+
+@HANDLER.bind("metrics", "metrics/", request="GET", session=False)
+def metrics(request):
+    """
+    Exports the per-route request metrics in the Prometheus text format.
+    Requires the method to be GET and the client address to be one of METRICS_ALLOWED_ADDRESSES.
+
+    :param request: HttpRequest - The HTTP request object.
+    :return: HttpResponse - The metrics.
+    """
+    if ROUTE_METRICS is None or request.META.get('REMOTE_ADDR') not in METRICS_ALLOWED_ADDRESSES:
+        return HttpResponse("404 Not Found", status=404)
+
+    return HttpResponse(ROUTE_METRICS.export(), content_type=ROUTE_METRICS.CONTENT_TYPE)
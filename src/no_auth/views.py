@@ -2,10 +2,11 @@ from django.shortcuts import render, redirect
 from django.urls import reverse
 
 from static.services import RequestHandler
-from static.utils.utils import get_user_from
+from static.utils.utils import get_user_from, ROUTE_METRICS, REQUEST_PROFILER, ALLOCATION_PROFILER, READ_REPLICAS, \
+    SHARDS
 
 # Create your views here.
-HANDLER = RequestHandler()
+HANDLER = RequestHandler(ROUTE_METRICS, REQUEST_PROFILER, ALLOCATION_PROFILER, READ_REPLICAS, SHARDS)
 
 
 @HANDLER.bind('index', '', request="GET")
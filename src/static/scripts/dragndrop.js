@@ -25,24 +25,71 @@ function buildDnDPayload() {
 
 
 function getSyncronizedColumns(path) {
+    const container = document.querySelector('#column-container');
+    const headers = {'X-CSRFToken': getCSRFToken(), 'Content-Type': 'application/json'};
+    const revision = container.dataset.revision;
+
+    if (container.dataset.etag) headers['If-None-Match'] = container.dataset.etag;
+    if (revision !== undefined) path = `${path}?since=${revision}`;
+
     fetch(path, {
         method: 'GET',
-        headers: {'X-CSRFToken': getCSRFToken(), 'Content-Type': 'application/json'}
+        headers: headers
     })
         .then(response => {
+            if (response.status === 304) {
+                return null;
+            }
             if (response.ok) {
+                const etag = response.headers.get('ETag');
+                if (etag) container.dataset.etag = etag;
                 return response.json();
             }
             throw new Error(`Request failed with status ${response.status}`);
         })
         .then(data => {
-            $('#column-container').html(data.message);
+            if (data === null) return;
+            if (data.columns === undefined) $('#column-container').html(data.message);
+            else applyColumnsDelta(container, data.columns, data.order);
+            container.dataset.revision = data.revision;
         })
         .catch(error => {
             console.error(error);
         });
 }
 
+function listenBoardEvents(path_events, path_sync) {
+    if (!window.EventSource) return;
+    const container = document.querySelector('#column-container');
+    const source = new EventSource(path_events);
+
+    source.onmessage = (message) => {
+        const event = JSON.parse(message.data);
+        if (Number(event.revision) > Number(container.dataset.revision)) getSyncronizedColumns(path_sync);
+    };
+}
+
+function applyColumnsDelta(container, changed, order) {
+    const existing = {};
+    container.querySelectorAll('.column-silhouette').forEach((column) => {
+        existing[column.querySelector('data').value] = column;
+    });
+
+    for (let [id, column] of Object.entries(existing)) {
+        if (changed[id] !== undefined || !order.includes(Number(id))) column.remove();
+    }
+
+    for (let id of order) {
+        let column = existing[id];
+        if (changed[id] !== undefined) {
+            const template = document.createElement('template');
+            template.innerHTML = changed[id].trim();
+            column = template.content.firstElementChild;
+        }
+        if (column) container.appendChild(column);
+    }
+}
+
 function sendDnDPayload(path_update, path_sync) {
     const payload = buildDnDPayload();
 
@@ -62,6 +109,30 @@ function sendDnDPayload(path_update, path_sync) {
     });
 }
 
+function sendCardMove(card, path_sync) {
+    const column = card.closest('.column-silhouette');
+    const next = card.nextElementSibling;
+    const body = new FormData();
+
+    body.append('column', column.querySelector('data').value);
+    if (next && next.classList.contains('card-silhouette')) body.append('before', next.querySelector('data').value);
+
+    fetch(card.querySelector('.card-move-href').href, {
+        method: 'POST',
+        headers: {'X-CSRFToken': getCSRFToken()},
+        body: body
+    })
+    .then(response => {
+        if (response.ok) {
+            getSyncronizedColumns(path_sync);
+        }
+        else throw new Error(`Request failed with status ${response.status}`);
+    })
+    .catch(error => {
+        console.error(error);
+    });
+}
+
 /*
 * */
 
@@ -161,7 +232,7 @@ class DragAndDrop {
         oldContainer.removeChild(element);
         container.insertBefore(element, placeholder);
         element.removeAttribute('id');
-        document.dispatchEvent(new CustomEvent('elementMoved'));
+        document.dispatchEvent(new CustomEvent('elementMoved', {detail: {element: element}}));
     }
 
     constructor(correspondences) {
@@ -1,12 +1,40 @@
-from .requests import RequestHandler, JsonResponses
+from .requests import RequestHandler, JsonResponses, Route
+from .metrics import RouteMetrics
+from .timing import ServerTimingMiddleware
+from .slowqueries import SlowQueryRecorder
+from .profiling import RequestProfiler
+from .allocations import AllocationProfiler
+from .sessions import SessionRouter
+from .replicas import ReadReplicas, ReplicaRouter
+from .sharding import ShardDirectory, ShardRouter
+from .writes import WriteQueue
+from .events import BoardEventBroadcaster, LocalEventBackend, SQLiteEventBackend
+from .permissions import BoardAccessCache, BoardRole
 from .validations import ModelsAttributeError, UserValidations, BoardValidations, CardValidations, ColumnValidations
 
 __all__ = [
     "RequestHandler",
+    "Route",
     "ModelsAttributeError",
     "UserValidations",
     "BoardValidations",
     "CardValidations",
     "ColumnValidations",
-    "JsonResponses"
+    "JsonResponses",
+    "BoardAccessCache",
+    "BoardRole",
+    "BoardEventBroadcaster",
+    "LocalEventBackend",
+    "SQLiteEventBackend",
+    "RouteMetrics",
+    "ServerTimingMiddleware",
+    "SlowQueryRecorder",
+    "RequestProfiler",
+    "AllocationProfiler",
+    "SessionRouter",
+    "WriteQueue",
+    "ReadReplicas",
+    "ReplicaRouter",
+    "ShardDirectory",
+    "ShardRouter"
 ]
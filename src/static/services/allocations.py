@@ -0,0 +1,155 @@
+import json
+import os
+import tracemalloc
+from pathlib import Path
+from threading import Lock
+from typing import Callable
+
+from django.http import HttpResponse
+
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+)
+
+
+class AllocationProfiler:
+    """
+    This class traces the memory allocated by the requests of selected routes with tracemalloc.
+
+    For every traced request it records:
+        - the peak: the largest amount of memory the request had allocated at any time,
+        - the retained memory: what the request had allocated and was still alive when the view returned
+          (the response itself, but also anything kept in caches or module globals),
+    and the retained memory is broken down by the file and line that allocated it.
+
+    Tracing slows every allocation of the process down, so tracemalloc only runs while a traced request is served,
+    and a single request is traced at a time. The aggregated report of the process is written to its own file
+    in the report directory after each traced request, so that the memory_report command can merge the reports
+    of every worker process.
+
+    tracemalloc is global to the process: it also counts what the other threads allocate while a request
+    is traced, so the figures are only meaningful when the process serves one request at a time
+    (a single worker thread).
+
+    Methods:
+        - traced: Checks whether the requests of a route are traced.
+        - profile: Serves a request while tracing its allocations.
+        - report: Gets the aggregated report of this process.
+    """
+
+    def __init__(self, directory: str, routes: tuple = (), frames: int = 1, top: int = 50):
+        """
+        Initializes the AllocationProfiler instance.
+
+        :param directory: str - The report directory.
+        :param routes: tuple[str] - The names of the traced routes.
+        :param frames: int - The number of frames stored for each allocation.
+        :param top: int - The number of lines kept for each traced request.
+        """
+        self.directory = Path(directory)
+        self.___routes = frozenset(routes)
+        self.___frames = frames
+        self.___top = top
+        self.___report: dict[str, dict] = {}
+        self.___lock = Lock()
+
+    def traced(self, route: str) -> bool:
+        """
+        Checks whether the requests of a route are traced.
+
+        :param route: str - The name of the route.
+        :return: bool - True if the requests of the route are traced, False otherwise.
+        """
+        return route in self.___routes
+
+    def profile(self, route: str, view: Callable[[], HttpResponse]) -> HttpResponse:
+        """
+        Serves a request while tracing its allocations, unless another request is being traced
+        or tracemalloc has been started by someone else.
+
+        :param route: str - The name of the route.
+        :param view: Callable - The view, called without arguments.
+        :return: HttpResponse - The response of the view.
+        """
+        if tracemalloc.is_tracing() or not self.___lock.acquire(blocking=False):
+            return view()
+        try:
+            tracemalloc.start(self.___frames)
+            try:
+                response = view()
+                peak = tracemalloc.get_traced_memory()[1]
+                snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+            finally:
+                tracemalloc.stop()
+            self.___record(route, peak, snapshot)
+        finally:
+            self.___lock.release()
+
+        self.___write()
+        return response
+
+    def report(self) -> dict[str, dict]:
+        """
+        Gets the aggregated report of this process.
+
+        :return: dict - The report, by route name, in a JSON serializable form.
+        """
+        with self.___lock:
+            return json.loads(json.dumps(self.___report))
+
+    def ___record(self, route: str, peak: int, snapshot: tracemalloc.Snapshot):
+        statistics = snapshot.statistics("lineno")
+        report = self.___report.setdefault(route, {"requests": 0, "peak_max": 0, "peak_total": 0,
+                                                   "retained_max": 0, "retained_total": 0, "lines": {}})
+        retained = sum(statistic.size for statistic in statistics)
+        report["requests"] += 1
+        report["peak_max"] = max(report["peak_max"], peak)
+        report["peak_total"] += peak
+        report["retained_max"] = max(report["retained_max"], retained)
+        report["retained_total"] += retained
+        for statistic in statistics[:self.___top]:
+            frame = statistic.traceback[0]
+            line = report["lines"].setdefault(f"{frame.filename}:{frame.lineno}", [0, 0, 0, 0])
+            line[0] += 1
+            line[1] += statistic.count
+            line[2] += statistic.size
+            line[3] = max(line[3], statistic.size)
+
+    def ___write(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        target = self.directory / f"memory-{os.getpid()}.json"
+        temporary = target.with_name(f"{target.name}.tmp")
+        temporary.write_text(json.dumps(self.report()))
+        os.replace(temporary, target)
+
+
+def merge_reports(directory: str) -> dict[str, dict]:
+    """
+    Merges the reports written by every process in a report directory.
+
+    :param directory: str - The report directory.
+    :return: dict - The merged report, by route name.
+    """
+    merged = {}
+    for file in Path(directory).glob("memory-*.json"):
+        try:
+            report = json.loads(file.read_text())
+        except (OSError, ValueError):
+            continue
+        for route, statistics in report.items():
+            target = merged.setdefault(route, {"requests": 0, "peak_max": 0, "peak_total": 0,
+                                               "retained_max": 0, "retained_total": 0, "lines": {}})
+            for key in ("requests", "peak_total", "retained_total"):
+                target[key] += statistics[key]
+            for key in ("peak_max", "retained_max"):
+                target[key] = max(target[key], statistics[key])
+            for location, (requests, count, size, largest) in statistics["lines"].items():
+                line = target["lines"].setdefault(location, [0, 0, 0, 0])
+                line[0] += requests
+                line[1] += count
+                line[2] += size
+                line[3] = max(line[3], largest)
+    return merged
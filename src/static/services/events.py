@@ -0,0 +1,270 @@
+import asyncio
+import json
+import sqlite3
+from contextlib import contextmanager
+from threading import Lock, Thread, Event
+from typing import Callable, AsyncIterator
+
+
+class LocalEventBackend:
+    """
+    This class is the default event backend: events are only delivered to the subscribers
+    of the process that published them.
+
+    Methods:
+        - attach: Sets the callback used to deliver events to the local subscribers.
+        - publish: Publishes an event.
+        - listen: Starts receiving events from other processes (nothing to do for this backend).
+        - close: Stops receiving events.
+    """
+
+    def __init__(self):
+        """
+        Initializes the LocalEventBackend instance.
+        """
+        self.dispatch: Callable[[int, dict], None] = lambda board_id, event: None
+
+    def attach(self, dispatch: Callable[[int, dict], None]):
+        """
+        Sets the callback used to deliver events to the local subscribers.
+
+        :param dispatch: Callable - The callback, taking the board ID and the event.
+        """
+        self.dispatch = dispatch
+
+    def publish(self, board_id: int, event: dict):
+        """
+        Publishes an event.
+
+        :param board_id: int - The ID of the board the event belongs to.
+        :param event: dict - The event.
+        """
+        self.dispatch(board_id, event)
+
+    def listen(self):
+        """
+        Starts receiving events from other processes.
+        """
+        pass
+
+    def close(self):
+        """
+        Stops receiving events.
+        """
+        pass
+
+
+class SQLiteEventBackend(LocalEventBackend):
+    """
+    This class is an event backend that lets several worker processes on the same host share events
+    through a small SQLite file: every published event is appended to a table, and a poller thread
+    delivers the events written by any process to the local subscribers.
+
+    Only the most recent events are kept in the file, since subscribers only need to see
+    the events published while they are connected.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 0.5, retention: int = 1000):
+        """
+        Initializes the SQLiteEventBackend instance.
+
+        :param path: str - The path of the shared SQLite file.
+        :param poll_interval: float - The number of seconds between two polls of the file.
+        :param retention: int - The number of events kept in the file.
+        """
+        super().__init__()
+        self.___path = str(path)
+        self.___poll_interval = poll_interval
+        self.___retention = retention
+        self.___lock = Lock()
+        self.___stop = Event()
+        self.___thread: Thread or None = None
+        self.___created = False
+
+    def publish(self, board_id: int, event: dict):
+        """
+        Publishes an event, appending it to the shared file.
+
+        :param board_id: int - The ID of the board the event belongs to.
+        :param event: dict - The event.
+        """
+        with self.___connect() as connection:
+            cursor = connection.execute("INSERT INTO board_events (board_id, event) VALUES (?, ?)",
+                                        (board_id, json.dumps(event)))
+            if cursor.lastrowid % self.___retention == 0:
+                connection.execute("DELETE FROM board_events WHERE id <= ?", (cursor.lastrowid - self.___retention,))
+
+    def listen(self):
+        """
+        Starts the poller thread, if it is not running yet.
+        The events published once this method returns are all delivered.
+        """
+        with self.___lock:
+            if self.___thread is not None:
+                return
+            with self.___connect() as connection:
+                last = connection.execute("SELECT COALESCE(MAX(id), 0) FROM board_events").fetchone()[0]
+            self.___stop.clear()
+            self.___thread = Thread(target=self.___poll, args=(last,), name="board-events-poller", daemon=True)
+            self.___thread.start()
+
+    def close(self):
+        """
+        Stops the poller thread.
+        """
+        with self.___lock:
+            thread, self.___thread = self.___thread, None
+        if thread is not None:
+            self.___stop.set()
+            thread.join()
+
+    def ___poll(self, last: int):
+        while not self.___stop.wait(self.___poll_interval):
+            with self.___connect() as connection:
+                rows = connection.execute("SELECT id, board_id, event FROM board_events WHERE id > ? ORDER BY id",
+                                          (last,)).fetchall()
+            for row_id, board_id, event in rows:
+                self.dispatch(board_id, json.loads(event))
+                last = row_id
+
+    @contextmanager
+    def ___connect(self):
+        # The file is only created when the first event is published or polled, not when the backend is configured.
+        connection = sqlite3.connect(self.___path, timeout=5)
+        try:
+            with connection:
+                connection.execute("PRAGMA journal_mode=WAL")
+                if not self.___created:
+                    connection.execute("CREATE TABLE IF NOT EXISTS board_events (id INTEGER PRIMARY KEY "
+                                       "AUTOINCREMENT, board_id INTEGER NOT NULL, event TEXT NOT NULL)")
+                    self.___created = True
+                yield connection
+        finally:
+            connection.close()
+
+
+class BoardEventBroadcaster:
+    """
+    This class delivers the change events of the boards to the clients listening to them.
+
+    Events are published through a pluggable backend (see LocalEventBackend and SQLiteEventBackend),
+    which hands them back to the broadcaster of every process so that it can push them
+    to its own subscribers.
+
+    The backend also carries internal messages (see notify), which are handed to the listeners of every process
+    instead of being pushed to the clients.
+
+    Methods:
+        - publish: Publishes an event of a board.
+        - notify: Publishes an internal message about a board.
+        - listen: Registers a listener of the internal messages.
+        - subscribe: Iterates over the events of a board.
+    """
+
+    def __init__(self, backend: LocalEventBackend = None, queue_size: int = 64):
+        """
+        Initializes the BoardEventBroadcaster instance.
+
+        :param backend: LocalEventBackend - The backend used to share events between processes.
+        :param queue_size: int - The number of pending events kept for each subscriber.
+        """
+        self.___backend = backend or LocalEventBackend()
+        self.___backend.attach(self.___dispatch)
+        self.___queue_size = queue_size
+        self.___subscribers: dict[int, set[tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self.___listeners: list[Callable[[int, dict], None]] = []
+        self.___lock = Lock()
+
+    def publish(self, board_id: int, event: dict):
+        """
+        Publishes an event of a board.
+        This method can be called from any thread.
+
+        :param board_id: int - The ID of the board.
+        :param event: dict - The event, which must be JSON serializable.
+        """
+        self.___backend.publish(board_id, event)
+
+    def notify(self, board_id: int, message: dict):
+        """
+        Publishes an internal message about a board, delivered to the listeners of every process.
+        This method can be called from any thread.
+
+        :param board_id: int - The ID of the board.
+        :param message: dict - The message, which must be JSON serializable.
+        """
+        self.___backend.publish(board_id, {"internal": message})
+
+    def listen(self, listener: Callable[[int, dict], None]):
+        """
+        Registers a listener of the internal messages, unless it is already registered,
+        and starts receiving them from the other processes.
+        The listener is called in the thread that delivers the message, so it must be quick and thread safe.
+
+        :param listener: Callable - The listener, taking the board ID and the message.
+        """
+        with self.___lock:
+            if listener not in self.___listeners:
+                self.___listeners.append(listener)
+        self.___backend.listen()
+
+    async def subscribe(self, board_id: int, keepalive: float = 15) -> AsyncIterator[dict or None]:
+        """
+        Iterates over the events of a board, as they are published.
+        None is yielded as soon as the subscriber is registered, and again whenever no event has been published
+        for a while, so that the caller can keep the connection alive.
+        When a subscriber falls behind, its oldest pending events are dropped.
+
+        :param board_id: int - The ID of the board.
+        :param keepalive: float - The number of seconds after which None is yielded.
+        :return: AsyncIterator[dict or None] - The events.
+        """
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(self.___queue_size))
+        with self.___lock:
+            self.___subscribers.setdefault(board_id, set()).add(subscriber)
+        self.___backend.listen()
+
+        try:
+            yield None
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscriber[1].get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self.___lock:
+                subscribers = self.___subscribers.get(board_id, set())
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    self.___subscribers.pop(board_id, None)
+
+    def subscribers(self, board_id: int) -> int:
+        """
+        Counts the subscribers of a board in this process.
+
+        :param board_id: int - The ID of the board.
+        :return: int - The number of subscribers.
+        """
+        with self.___lock:
+            return len(self.___subscribers.get(board_id, ()))
+
+    def ___dispatch(self, board_id: int, event: dict):
+        if "internal" in event:
+            with self.___lock:
+                listeners = list(self.___listeners)
+            for listener in listeners:
+                listener(board_id, event["internal"])
+            return
+        with self.___lock:
+            subscribers = list(self.___subscribers.get(board_id, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self.___enqueue, queue, event)
+            except RuntimeError:
+                pass  # The loop of the subscriber has been closed.
+
+    @staticmethod
+    def ___enqueue(queue: asyncio.Queue, event: dict):
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(event)
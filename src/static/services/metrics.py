@@ -0,0 +1,385 @@
+import atexit
+import json
+import os
+import re
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock, local, current_thread
+from weakref import ref
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ARCHIVE = "metrics-archive.json"
+_PROCESS_FILE = re.compile(r"metrics-(\d+)(?:-\d+)?\.json")
+
+
+class QueryCounter:
+    """
+    This class is a database execute wrapper (see django.db.connection.execute_wrapper)
+    that counts the queries run while it is installed and the time spent running them.
+    """
+
+    __slots__ = ("count", "duration")
+
+    def __init__(self):
+        """
+        Initializes the QueryCounter instance.
+        """
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+class RouteStatistics:
+    """
+    RouteStatistics class
+    This class holds the measurements of a route, as seen by a single thread.
+    """
+
+    __slots__ = ("count", "duration", "queries", "query_duration", "size", "buckets", "statuses")
+
+    def __init__(self, buckets: int):
+        """
+        Initializes the RouteStatistics instance.
+
+        :param buckets: int - The number of buckets of the latency histogram, including the +Inf bucket.
+        """
+        self.count = 0
+        self.duration = 0.0
+        self.queries = 0
+        self.query_duration = 0.0
+        self.size = 0
+        self.buckets = [0] * buckets
+        self.statuses: dict[int, int] = {}
+
+
+class RouteMetrics:
+    """
+    This class records the latency, the database queries, the response size and the status
+    of the requests served by each route, and exports them in the Prometheus text format.
+
+    Every thread records its requests in its own shard, so recording a request never takes a lock;
+    the shards are only summed when the metrics are collected. The shards of the threads that have exited
+    are handed over to new threads, so that thread-per-request servers do not grow the number of shards.
+
+    When a directory is given, every process periodically writes its measurements to its own file
+    in that directory, and the metrics collected by any process are the sum of every file,
+    so that a single scrape covers all the worker processes of the host.
+    The files are named after the process ID and the time the process started measuring, so that a process
+    reusing the ID of an exited one does not overwrite its counters. The files of the exited processes are merged
+    into a single archive file, when they exit and when a new process starts, so that the counters
+    never go backwards and the directory does not grow with every worker ever started.
+
+    Methods:
+        - observe: Records a request served by a route.
+        - snapshot: Gets the measurements of this process.
+        - flush: Writes the measurements of this process to the shared directory.
+        - collect: Gets the measurements of every process.
+        - export: Renders the collected measurements in the Prometheus text format.
+        - reset: Drops the measurements of this process.
+    """
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS, directory: str = None, flush_interval: float = 5):
+        """
+        Initializes the RouteMetrics instance.
+
+        :param buckets: tuple[float] - The upper bounds of the latency histogram buckets, in seconds.
+        :param directory: str - The directory shared by the worker processes, None to only export this process.
+        :param flush_interval: float - The minimum number of seconds between two writes to the shared directory.
+        """
+        self.___buckets = tuple(sorted(float(bucket) for bucket in buckets))
+        self.___directory = Path(directory) if directory is not None else None
+        self.___flush_interval = flush_interval
+        self.___flushed = time.monotonic()
+        self.___pid: int or None = None
+        self.___name: str or None = None
+        self.___local = local()
+        self.___shards: list[tuple[ref, dict[str, RouteStatistics]]] = []
+        self.___lock = Lock()
+
+        if self.___directory is not None:
+            self.___directory.mkdir(parents=True, exist_ok=True)
+            atexit.register(self.___flush_at_exit)
+
+    def observe(self, route: str, status: int, duration: float, queries: int = 0, query_duration: float = 0.0,
+                size: int = 0):
+        """
+        Records a request served by a route.
+
+        :param route: str - The name of the route.
+        :param status: int - The status code of the response.
+        :param duration: float - The number of seconds spent serving the request.
+        :param queries: int - The number of database queries run by the request.
+        :param query_duration: float - The number of seconds spent running the queries.
+        :param size: int - The size of the response body, in bytes.
+        """
+        shard = getattr(self.___local, "shard", None)
+        if shard is None:
+            shard = self.___attach()
+
+        statistics = shard.get(route, None)
+        if statistics is None:
+            statistics = shard[route] = RouteStatistics(len(self.___buckets) + 1)
+        statistics.count += 1
+        statistics.duration += duration
+        statistics.queries += queries
+        statistics.query_duration += query_duration
+        statistics.size += size
+        statistics.buckets[bisect_left(self.___buckets, duration)] += 1
+        statistics.statuses[status] = statistics.statuses.get(status, 0) + 1
+
+        if self.___directory is not None and time.monotonic() - self.___flushed >= self.___flush_interval:
+            self.flush()
+
+    def snapshot(self) -> dict:
+        """
+        Gets the measurements of this process, summing the shards of every thread.
+
+        :return: dict - The measurements, by route name, in a JSON serializable form.
+        """
+        with self.___lock:
+            shards = [shard for _, shard in self.___shards]
+
+        routes = {}
+        for shard in shards:
+            for route, statistics in shard.copy().items():
+                merged = routes.setdefault(route, self.___empty())
+                merged["count"] += statistics.count
+                merged["duration"] += statistics.duration
+                merged["queries"] += statistics.queries
+                merged["query_duration"] += statistics.query_duration
+                merged["size"] += statistics.size
+                merged["buckets"] = [a + b for a, b in zip(merged["buckets"], statistics.buckets)]
+                for status, count in statistics.statuses.copy().items():
+                    merged["statuses"][str(status)] = merged["statuses"].get(str(status), 0) + count
+        return {"buckets": list(self.___buckets), "routes": routes}
+
+    def flush(self):
+        """
+        Writes the measurements of this process to the shared directory.
+        """
+        if self.___directory is None:
+            return
+        self.___flushed = time.monotonic()
+        target = self.___file()
+        temporary = target.with_name(f"{target.name}.{current_thread().ident}.tmp")
+        temporary.write_text(json.dumps(self.snapshot()))
+        os.replace(temporary, target)
+
+    def collect(self) -> dict:
+        """
+        Gets the measurements of every process sharing the directory, or of this process only
+        when there is no shared directory.
+
+        :return: dict - The measurements, by route name.
+        """
+        if self.___directory is None:
+            return self.snapshot()
+
+        self.flush()
+        collected = {"buckets": list(self.___buckets), "routes": {}}
+        snapshots = {}
+        for file in self.___directory.glob("metrics-*.json"):
+            try:
+                snapshots[file.name] = json.loads(file.read_text())
+            except (OSError, ValueError):
+                continue  # The file has been removed or is being replaced.
+
+        # The files already merged into the archive, but not removed yet, are only counted once.
+        retired = set(snapshots.get(ARCHIVE, {}).get("retired", ()))
+        for name, snapshot in snapshots.items():
+            if name not in retired and snapshot.get("buckets") == collected["buckets"]:
+                self.___merge(collected["routes"], snapshot["routes"])
+        return collected
+
+    def export(self) -> str:
+        """
+        Renders the collected measurements in the Prometheus text format.
+
+        :return: str - The metrics.
+        """
+        routes = sorted(self.collect()["routes"].items())
+        bounds = [f"{bucket:g}" for bucket in self.___buckets] + ["+Inf"]
+        lines = []
+
+        def family(name: str, kind: str, description: str):
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        family("kanboard_request_duration_seconds", "histogram", "Time spent serving the requests of a route.")
+        for route, statistics in routes:
+            label = _escape(route)
+            cumulative = 0
+            for bound, count in zip(bounds, statistics["buckets"]):
+                cumulative += count
+                lines.append(f'kanboard_request_duration_seconds_bucket{{route="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'kanboard_request_duration_seconds_sum{{route="{label}"}} {statistics["duration"]!r}')
+            lines.append(f'kanboard_request_duration_seconds_count{{route="{label}"}} {statistics["count"]}')
+
+        family("kanboard_requests_total", "counter", "Requests served by a route, by response status.")
+        for route, statistics in routes:
+            for status, count in sorted(statistics["statuses"].items()):
+                lines.append(f'kanboard_requests_total{{route="{_escape(route)}",status="{status}"}} {count}')
+
+        counters = (
+            ("kanboard_db_queries_total", "queries", "Database queries run by the requests of a route."),
+            ("kanboard_db_query_duration_seconds_total", "query_duration",
+             "Time spent running the database queries of the requests of a route."),
+            ("kanboard_response_size_bytes_total", "size", "Bytes sent in the response bodies of a route."),
+        )
+        for name, key, description in counters:
+            family(name, "counter", description)
+            for route, statistics in routes:
+                lines.append(f'{name}{{route="{_escape(route)}"}} {statistics[key]!r}')
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """
+        Drops the measurements of this process.
+        """
+        with self.___lock:
+            for _, shard in self.___shards:
+                shard.clear()
+
+    def ___attach(self) -> dict[str, RouteStatistics]:
+        thread = current_thread()
+        with self.___lock:
+            for position, (owner, shard) in enumerate(self.___shards):
+                if owner() is None or not owner().is_alive():
+                    self.___shards[position] = (ref(thread), shard)
+                    break
+            else:
+                shard = {}
+                self.___shards.append((ref(thread), shard))
+        self.___local.shard = shard
+        return shard
+
+    def ___file(self) -> Path:
+        # A forked worker gets a file of its own, and retires the files of the processes that have exited.
+        if self.___pid != os.getpid():
+            self.___pid = os.getpid()
+            self.___name = f"metrics-{self.___pid}-{time.time_ns()}.json"
+            self.___retire([file for file in self.___directory.glob("metrics-*.json")
+                            if (match := _PROCESS_FILE.fullmatch(file.name)) and not _alive(int(match[1]))])
+        return self.___directory / self.___name
+
+    def ___retire(self, files: list[Path]):
+        """
+        Merges the files of exited processes into the archive file, then removes them.
+        The archive lists the files it holds until they are removed, so that collect never counts them twice.
+        Nothing is merged while another process holds the lock of the archive: the files are retired later.
+
+        :param files: list[Path] - The files of the exited processes.
+        """
+        if not files:
+            return
+        with self.___archive_lock() as locked:
+            if not locked:
+                return
+            archive_file = self.___directory / ARCHIVE
+            try:
+                archive = json.loads(archive_file.read_text())
+            except (OSError, ValueError):
+                archive = {"buckets": list(self.___buckets), "routes": {}, "retired": []}
+            if archive["buckets"] != list(self.___buckets):
+                return  # The archive has been written with other buckets.
+
+            archive["retired"] = [name for name in archive["retired"] if (self.___directory / name).exists()]
+            merged = []
+            for file in files:
+                if file.name in archive["retired"]:
+                    merged.append(file)  # Merged by a process that stopped before removing it.
+                    continue
+                try:
+                    snapshot = json.loads(file.read_text())
+                except (OSError, ValueError):
+                    continue
+                if snapshot.get("buckets") != archive["buckets"]:
+                    continue
+                self.___merge(archive["routes"], snapshot["routes"])
+                archive["retired"].append(file.name)
+                merged.append(file)
+
+            temporary = archive_file.with_name(f"{ARCHIVE}.{os.getpid()}.tmp")
+            temporary.write_text(json.dumps(archive))
+            os.replace(temporary, archive_file)
+            for file in merged:
+                file.unlink(missing_ok=True)
+
+    @contextmanager
+    def ___archive_lock(self, stale: float = 60):
+        lock = self.___directory / "metrics-archive.lock"
+        try:
+            if time.time() - lock.stat().st_mtime > stale:
+                lock.unlink(missing_ok=True)  # Left behind by a process killed while merging.
+        except OSError:
+            pass
+        try:
+            descriptor = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            os.close(descriptor)
+            lock.unlink(missing_ok=True)
+
+    def ___flush_at_exit(self):
+        try:
+            self.flush()
+            self.___retire([self.___file()])
+        except OSError:
+            pass  # The shared directory is gone, there is nobody left to collect the measurements.
+
+    def ___merge(self, routes: dict, other: dict):
+        for route, statistics in other.items():
+            merged = routes.setdefault(route, self.___empty())
+            for key in ("count", "duration", "queries", "query_duration", "size"):
+                merged[key] += statistics[key]
+            merged["buckets"] = [a + b for a, b in zip(merged["buckets"], statistics["buckets"])]
+            for status, count in statistics["statuses"].items():
+                merged["statuses"][status] = merged["statuses"].get(status, 0) + count
+
+    def ___empty(self) -> dict:
+        return {"count": 0, "duration": 0.0, "queries": 0, "query_duration": 0.0, "size": 0,
+                "buckets": [0] * (len(self.___buckets) + 1), "statuses": {}}
+
+
+def _alive(pid: int) -> bool:
+    """
+    Checks whether a process is running. Only POSIX systems can tell, so processes are assumed alive elsewhere.
+
+    :param pid: int - The process ID.
+    :return: bool - False if the process has exited, True otherwise.
+    """
+    if pid <= 0 or os.name != "posix":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # The process runs as another user.
+    return True
+
+
+def _escape(value: str) -> str:
+    """
+    Escapes a Prometheus label value.
+
+    :param value: str - The value.
+    :return: str - The escaped value.
+    """
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
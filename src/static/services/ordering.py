@@ -0,0 +1,106 @@
+from bisect import bisect_left
+
+ORDER_GAP = 1024
+
+
+def key_after(key: int or None) -> int:
+    """
+    Generates the ordering key of an element placed after the element with the given key.
+
+    :param key: int - The key of the preceding element, None if there is no preceding element.
+    :return: int - The key of the new element.
+    """
+    return ORDER_GAP if key is None else key + ORDER_GAP
+
+
+def key_between(lower: int or None, upper: int or None) -> int or None:
+    """
+    Generates the ordering key of an element placed between two elements.
+
+    :param lower: int - The key of the preceding element, None if there is no preceding element.
+    :param upper: int - The key of the following element, None if there is no following element.
+    :return: int - The key of the new element, None if there is no room left between the two keys.
+    """
+    if upper is None:
+        return key_after(lower)
+    if lower is None:
+        lower = upper - 2 * ORDER_GAP
+    if upper - lower < 2:
+        return None
+    return (lower + upper) // 2
+
+
+def spread(count: int) -> list[int]:
+    """
+    Generates evenly spaced ordering keys, used when a list of siblings is rebalanced.
+
+    :param count: int - The number of keys to generate.
+    :return: list[int] - The keys.
+    """
+    return [ORDER_GAP * (i + 1) for i in range(count)]
+
+
+def plan_ordering(keys: list) -> list[int]:
+    """
+    Computes the ordering keys of a list of elements given in their desired order.
+    The longest increasing run of the current keys is kept as it is, and the other elements are given new keys
+    between their kept neighbours, so that only the elements that actually moved change their key.
+    When there is no room left between two kept neighbours, every element is given a new, evenly spaced key.
+
+    :param keys: list[int or None] - The current keys, in the desired order. None for elements that have no key
+                                     in this list yet (for example cards coming from another column).
+    :return: list[int] - The new keys, in the same order.
+    """
+    kept = _longest_increasing(keys)
+    planned = [None] * len(keys)
+    for position in kept:
+        planned[position] = keys[position]
+
+    bounds = [-1] + kept + [len(keys)]
+    for start, end in zip(bounds, bounds[1:]):
+        count = end - start - 1
+        if count == 0:
+            continue
+        lower = planned[start] if start >= 0 else None
+        upper = planned[end] if end < len(keys) else None
+        if lower is None and upper is None:
+            lower, upper = 0, ORDER_GAP * (count + 1)
+        elif lower is None:
+            lower = upper - ORDER_GAP * (count + 1)
+        elif upper is None:
+            upper = lower + ORDER_GAP * (count + 1)
+        if upper - lower <= count:
+            return spread(len(keys))
+        for offset in range(1, count + 1):
+            planned[start + offset] = lower + (upper - lower) * offset // (count + 1)
+
+    return planned
+
+
+def _longest_increasing(keys: list) -> list[int]:
+    """
+    Finds the positions of the longest strictly increasing subsequence of the keys, ignoring None keys.
+
+    :param keys: list[int or None] - The keys.
+    :return: list[int] - The positions of the subsequence, in ascending order.
+    """
+    tails, tail_positions, previous = [], [], [-1] * len(keys)
+    for position, key in enumerate(keys):
+        if key is None:
+            continue
+        slot = bisect_left(tails, key)
+        if slot > 0:
+            previous[position] = tail_positions[slot - 1]
+        if slot == len(tails):
+            tails.append(key)
+            tail_positions.append(position)
+        else:
+            tails[slot] = key
+            tail_positions[slot] = position
+
+    positions = []
+    position = tail_positions[-1] if tail_positions else -1
+    while position != -1:
+        positions.append(position)
+        position = previous[position]
+    return positions[::-1]
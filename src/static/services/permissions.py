@@ -0,0 +1,144 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+
+
+class BoardRole:
+    """
+    BoardRole class
+    This class contains the roles a user can have on a board.
+    """
+
+    OWNER = "owner"
+    GUEST = "guest"
+    NONE = "none"
+
+
+class BoardAccessCache:
+    """
+    This class is a bounded, thread-safe LRU cache that maps a (user uuid, board id) pair
+    to the role the user has on that board.
+
+    The cache is shared by every request served by the process, so it must be invalidated
+    whenever a board or one of its guests changes (see core/signals.py). Roles also expire after ttl seconds,
+    which bounds how long a process can serve a role changed by another process.
+
+    Every invalidation bumps the generation of the cache. A role read from the database is only cached when
+    no invalidation happened since the caller took the generation, so that a role read before a change and put
+    after its invalidation is not cached.
+
+    Methods:
+        - get: Gets the cached role of a user on a board.
+        - generation: Gets the generation of the cache, to be passed to put.
+        - put: Caches the role of a user on a board.
+        - invalidate: Drops the cached role of a user on a board.
+        - invalidate_board: Drops every cached role on a board.
+        - clear: Drops every cached role.
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 10):
+        """
+        Initializes the BoardAccessCache instance.
+
+        :param maxsize: int - The maximum number of roles kept in the cache.
+        :param ttl: float - The number of seconds a role is kept in the cache.
+        """
+        if maxsize < 1:
+            raise ValueError("Cache size must be positive.")
+        self.___maxsize = maxsize
+        self.___ttl = ttl
+        self.___entries: OrderedDict[tuple[str, int], tuple[str, float]] = OrderedDict()
+        self.___boards: dict[int, set[str]] = {}
+        self.___generation = 0
+        self.___lock = Lock()
+
+    def get(self, uuid: str, board_id: int) -> str or None:
+        """
+        Gets the cached role of a user on a board.
+
+        :param uuid: str - The user's UUID.
+        :param board_id: int - The board's ID.
+        :return: str - The cached role, None if it is not cached.
+        """
+        key = (uuid, board_id)
+        with self.___lock:
+            entry = self.___entries.get(key, None)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self.___entries[key]
+                self.___forget(uuid, board_id)
+                return None
+            self.___entries.move_to_end(key)
+            return entry[0]
+
+    def generation(self) -> int:
+        """
+        Gets the generation of the cache, which changes with every invalidation.
+        Take it before reading a role from the database, and pass it to put.
+
+        :return: int - The generation.
+        """
+        return self.___generation
+
+    def put(self, uuid: str, board_id: int, role: str, generation: int = None):
+        """
+        Caches the role of a user on a board, evicting the least recently used role when the cache is full.
+
+        :param uuid: str - The user's UUID.
+        :param board_id: int - The board's ID.
+        :param role: str - The role of the user on the board.
+        :param generation: int - The generation taken before reading the role, None to cache it anyway.
+        """
+        key = (uuid, board_id)
+        with self.___lock:
+            if generation is not None and generation != self.___generation:
+                return
+            self.___entries[key] = (role, time.monotonic() + self.___ttl)
+            self.___entries.move_to_end(key)
+            self.___boards.setdefault(board_id, set()).add(uuid)
+            while len(self.___entries) > self.___maxsize:
+                self.___forget(*self.___entries.popitem(last=False)[0])
+
+    def invalidate(self, uuid: str, board_id: int):
+        """
+        Drops the cached role of a user on a board.
+
+        :param uuid: str - The user's UUID.
+        :param board_id: int - The board's ID.
+        """
+        with self.___lock:
+            self.___generation += 1
+            self.___entries.pop((uuid, board_id), None)
+            self.___forget(uuid, board_id)
+
+    def invalidate_board(self, board_id: int):
+        """
+        Drops every cached role on a board.
+
+        :param board_id: int - The board's ID.
+        """
+        with self.___lock:
+            self.___generation += 1
+            for uuid in self.___boards.pop(board_id, ()):
+                self.___entries.pop((uuid, board_id), None)
+
+    def clear(self):
+        """
+        Drops every cached role.
+        """
+        with self.___lock:
+            self.___generation += 1
+            self.___entries.clear()
+            self.___boards.clear()
+
+    def __len__(self):
+        return len(self.___entries)
+
+    def ___forget(self, uuid: str, board_id: int):
+        users = self.___boards.get(board_id, None)
+        if users is None:
+            return
+        users.discard(uuid)
+        if not users:
+            del self.___boards[board_id]
@@ -0,0 +1,181 @@
+import cProfile
+import json
+import pstats
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from threading import Lock
+from typing import Callable
+from uuid import uuid4
+
+from django.core import signing
+from django.http import HttpRequest, HttpResponse
+
+
+class RequestProfiler:
+    """
+    This class runs single requests under cProfile, on demand, and keeps the results in a capture directory.
+
+    A request is profiled when it carries a profiling token, either in the X-Kanboard-Profile header
+    or in the profile query parameter. Tokens are signed with the SECRET_KEY and expire, so only the people
+    who can run the management commands of the server (see the profiles command) can hand them out.
+    Requests made by a staff user of the admin site only need the header or the parameter to be present.
+
+    Every capture is made of three files sharing the same name:
+        - .pstats: the raw cProfile statistics, to be opened with pstats or snakeviz,
+        - .collapsed: the collapsed stacks, to be rendered with flamegraph.pl or speedscope,
+        - .json: the request the capture belongs to.
+
+    Methods:
+        - requested: Checks whether a request asks to be profiled.
+        - token: Generates a profiling token.
+        - profile: Runs a view under cProfile and writes the capture.
+        - captures: Lists the captures.
+    """
+
+    HEADER = "HTTP_X_KANBOARD_PROFILE"
+    PARAMETER = "profile"
+    SALT = "kanboard.profiling"
+
+    def __init__(self, directory: str, max_age: int = 3600):
+        """
+        Initializes the RequestProfiler instance.
+
+        :param directory: str - The capture directory.
+        :param max_age: int - The number of seconds a profiling token stays valid.
+        """
+        self.directory = Path(directory)
+        self.___max_age = max_age
+        self.___lock = Lock()
+
+    def requested(self, request: HttpRequest) -> bool:
+        """
+        Checks whether a request asks to be profiled and is allowed to.
+
+        :param request: HttpRequest - The request object.
+        :return: bool - True if the request must be profiled, False otherwise.
+        """
+        value = request.META.get(self.HEADER, None) or request.GET.get(self.PARAMETER, None)
+        if not value:
+            return False
+        user = getattr(request, 'user', None)
+        if user is not None and getattr(user, 'is_staff', False):
+            return True
+        try:
+            signing.TimestampSigner(salt=self.SALT).unsign(value, max_age=self.___max_age)
+        except signing.BadSignature:
+            return False
+        return True
+
+    def token(self) -> str:
+        """
+        Generates a profiling token, valid for max_age seconds.
+
+        :return: str - The token.
+        """
+        return signing.TimestampSigner(salt=self.SALT).sign(uuid4().hex)
+
+    def profile(self, request: HttpRequest, route: str, view: Callable[[], HttpResponse]) -> HttpResponse:
+        """
+        Runs a view under cProfile and writes the capture.
+        cProfile cannot profile two requests at the same time, so a request that arrives while another one is
+        being profiled is served without being profiled.
+
+        :param request: HttpRequest - The request object.
+        :param route: str - The name of the route.
+        :param view: Callable - The view, called without arguments.
+        :return: HttpResponse - The response of the view, with the name of the capture in the X-Kanboard-Profile header.
+        """
+        if not self.___lock.acquire(blocking=False):
+            return view()
+        try:
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            response = profiler.runcall(view)
+            duration = time.perf_counter() - start
+        finally:
+            self.___lock.release()
+
+        now = datetime.now(timezone.utc)
+        name = f"{now:%Y%m%d-%H%M%S}-{route}-{uuid4().hex[:8]}"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(self.directory / f"{name}.pstats")
+        stats = pstats.Stats(profiler)
+        (self.directory / f"{name}.collapsed").write_text(
+            "".join(f"{stack} {weight}\n" for stack, weight in collapse(stats).items()))
+        (self.directory / f"{name}.json").write_text(json.dumps({
+            "name": name,
+            "time": now.isoformat(),
+            "route": route,
+            "method": request.method,
+            "path": request.get_full_path(),
+            "status": response.status_code,
+            "duration": round(duration, 6),
+            "calls": stats.total_calls,
+        }))
+
+        response['X-Kanboard-Profile'] = name
+        return response
+
+    def captures(self) -> list[dict]:
+        """
+        Lists the captures, oldest first.
+
+        :return: list[dict] - The description of the captures.
+        """
+        captures = []
+        for file in sorted(self.directory.glob("*.json")):
+            try:
+                captures.append(json.loads(file.read_text()))
+            except (OSError, ValueError):
+                continue
+        return captures
+
+
+def label(function: tuple) -> str:
+    """
+    Formats a function of the pstats statistics.
+
+    :param function: tuple - The (file, line, name) tuple of the function.
+    :return: str - The label, as file:line(name).
+    """
+    filename, line, name = function
+    if filename == "~":
+        return name
+    parts = Path(filename).parts
+    return f"{'/'.join(parts[-2:])}:{line}({name})"
+
+
+def collapse(stats: pstats.Stats) -> dict[str, int]:
+    """
+    Rebuilds collapsed stacks from the call graph kept by cProfile.
+    cProfile only records who called whom, not full stacks, so the time of a function is split among its callers
+    in proportion to the time each of them spent calling it.
+
+    :param stats: pstats.Stats - The statistics.
+    :return: dict[str, int] - The time spent in each stack, in microseconds.
+    """
+    callees: dict[tuple, dict[tuple, float]] = {}
+    for function, (_, _, _, _, callers) in stats.stats.items():
+        for caller, (_, _, _, cumulative) in callers.items():
+            callees.setdefault(caller, {})[function] = cumulative
+
+    stacks: dict[str, int] = {}
+
+    def walk(function: tuple, budget: float, path: tuple):
+        _, _, own, cumulative, _ = stats.stats[function]
+        if cumulative <= 0 or budget <= 0:
+            return
+        ratio = min(1.0, budget / cumulative)
+        stack = ";".join(label(frame) for frame in path + (function,))
+        weight = int(own * ratio * 1e6)
+        if weight > 0:
+            stacks[stack] = stacks.get(stack, 0) + weight
+        for callee, spent in callees.get(function, {}).items():
+            if spent * ratio >= 1e-6 and callee not in path and callee != function:
+                walk(callee, spent * ratio, path + (function,))
+
+    for function, (_, _, _, cumulative, callers) in stats.stats.items():
+        if not callers:
+            walk(function, cumulative, ())
+    return stacks
@@ -0,0 +1,198 @@
+import random
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from typing import Awaitable, Callable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpRequest, HttpResponse
+
+_REPLICA: ContextVar = ContextVar("replica", default=None)
+
+REPLICATED_APPS = frozenset({"core", "authentication"})
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class ReadReplicas:
+    """
+    This class sends the queries of the read-only routes (the routes bound to GET) to read replicas of the database.
+
+    The replica is chosen when the request is forwarded to its view, and the ReplicaRouter reads it back
+    for every query the view runs. Replicas lag behind the primary, so a user who just wrote something would not
+    always see it: every request that may write (any method but GET, HEAD and OPTIONS) pins the user to the primary
+    for stickiness seconds, with a signed cookie, so that the reads following a write always see it.
+
+    Without real replicas, copy_interval turns every replica into a copy of the primary SQLite file,
+    refreshed every copy_interval seconds by a background thread, which is enough to try the routing locally.
+
+    Methods:
+        - serve: Serves a request, on a replica when the route is read-only and the user is not pinned.
+        - aserve: Serves a request of an async view, the way serve does.
+        - pinned: Checks whether the user of a request is pinned to the primary.
+        - current: Gets the replica chosen for the request being served.
+        - refresh: Copies the primary SQLite file to the replicas.
+    """
+
+    COOKIE = "kanboard_primary"
+    SALT = "kanboard.replicas"
+
+    def __init__(self, aliases: tuple = (), stickiness: int = 5, copy_interval: float = None):
+        """
+        Initializes the ReadReplicas instance.
+
+        :param aliases: tuple[str] - The database aliases of the replicas.
+        :param stickiness: int - The number of seconds a user reads from the primary after a write.
+        :param copy_interval: float - The number of seconds between two copies of the primary SQLite file
+            to the replicas, None if the replicas are real ones.
+        """
+        self.___aliases = tuple(aliases)
+        self.___stickiness = stickiness
+        self.___copy_interval = copy_interval
+        self.___copies: threading.Thread or None = None
+        self.___lock = threading.Lock()
+
+    def serve(self, request: HttpRequest, route, view: Callable[[], HttpResponse]) -> HttpResponse:
+        """
+        Serves a request on a replica when its route is read-only and its user is not pinned to the primary,
+        on the primary otherwise, pinning the user to the primary when the request may write.
+
+        :param request: HttpRequest - The request object.
+        :param route: Route - The route of the request.
+        :param view: Callable - The view, called without arguments.
+        :return: HttpResponse - The response of the view.
+        """
+        if not self.___aliases:
+            return view()
+        self.___start_copies()
+
+        if route.request == "GET" and not self.pinned(request):
+            token = _REPLICA.set(random.choice(self.___aliases))
+            try:
+                return view()
+            finally:
+                _REPLICA.reset(token)
+
+        response = view()
+        if request.method not in SAFE_METHODS:
+            self.___pin(response)
+        return response
+
+    async def aserve(self, request: HttpRequest, route, view: Callable[[], Awaitable[HttpResponse]]) -> HttpResponse:
+        """
+        Serves a request of an async view the way serve does.
+
+        :param request: HttpRequest - The request object.
+        :param route: Route - The route of the request.
+        :param view: Callable - The async view, called without arguments.
+        :return: HttpResponse - The response of the view.
+        """
+        if not self.___aliases:
+            return await view()
+        if self.___copy_interval is not None and self.___copies is None:
+            await sync_to_async(self.___start_copies)()
+
+        if route.request == "GET" and not self.pinned(request):
+            token = _REPLICA.set(random.choice(self.___aliases))
+            try:
+                return await view()
+            finally:
+                _REPLICA.reset(token)
+
+        response = await view()
+        if request.method not in SAFE_METHODS:
+            self.___pin(response)
+        return response
+
+    def pinned(self, request: HttpRequest) -> bool:
+        """
+        Checks whether the user of a request wrote less than stickiness seconds ago.
+
+        :param request: HttpRequest - The request object.
+        :return: bool - True if the request must read from the primary, False otherwise.
+        """
+        return request.get_signed_cookie(self.COOKIE, None, salt=self.SALT, max_age=self.___stickiness) is not None
+
+    @staticmethod
+    def current() -> str or None:
+        """
+        Gets the replica chosen for the request being served in the current thread or task.
+
+        :return: str - The alias of the replica, None to read from the primary.
+        """
+        return _REPLICA.get()
+
+    def refresh(self):
+        """
+        Copies the primary SQLite file to the replicas, with the online backup API of SQLite,
+        so that the connections already open on a replica see the new copy as soon as it is complete.
+        """
+        source = sqlite3.connect(settings.DATABASES["default"]["NAME"])
+        try:
+            for alias in self.___aliases:
+                target = sqlite3.connect(settings.DATABASES[alias]["NAME"])
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+        finally:
+            source.close()
+
+    def ___pin(self, response: HttpResponse):
+        response.set_signed_cookie(self.COOKIE, "1", salt=self.SALT, max_age=self.___stickiness,
+                                   httponly=True, samesite="Lax")
+
+    def ___start_copies(self):
+        if self.___copy_interval is None or self.___copies is not None:
+            return
+        with self.___lock:
+            if self.___copies is None:
+                self.refresh()
+                self.___copies = threading.Thread(target=self.___copy, name="kanboard-replicas", daemon=True)
+                self.___copies.start()
+
+    def ___copy(self):
+        while True:
+            time.sleep(self.___copy_interval)
+            try:
+                self.refresh()
+            except sqlite3.Error:
+                continue
+
+
+class ReplicaRouter:
+    """
+    This database router sends the reads of the Kanboard models to the replica chosen by ReadReplicas
+    for the request being served, and everything else to the primary. The replicas are copies of the primary,
+    so nothing is ever migrated on them.
+    """
+
+    @staticmethod
+    def ___replicas() -> tuple:
+        if not getattr(settings, 'READ_REPLICAS_ENABLED', False):
+            return ()
+        return tuple(getattr(settings, 'READ_REPLICAS_OPTIONS', {}).get('aliases', ()))
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in REPLICATED_APPS:
+            return None
+        return _REPLICA.get()
+
+    def db_for_write(self, model, **hints):
+        # The rows read from a replica are written back to the primary.
+        instance = hints.get('instance', None)
+        if instance is not None and instance._state.db in self.___replicas():
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # A row read from a replica may be related to a row written to the primary, as they hold the same data.
+        databases = {DEFAULT_DB_ALIAS, *self.___replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return False if db in self.___replicas() else None
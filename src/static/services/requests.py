@@ -1,7 +1,35 @@
-from typing import Callable
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import partial
+from typing import Callable, NamedTuple
 
-from django.http import HttpResponse, HttpRequest, JsonResponse
-from django.urls import path, resolve
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.db import connections
+from django.http import HttpResponse, HttpRequest, JsonResponse, HttpResponseNotAllowed
+from django.urls import path
+
+from .metrics import RouteMetrics, QueryCounter
+from .profiling import RequestProfiler
+from .allocations import AllocationProfiler
+from .replicas import ReadReplicas
+from .sharding import ShardDirectory
+
+
+class Route(NamedTuple):
+    """
+    Route class
+    This class holds a view bound to a path, together with the options checked before calling it.
+    """
+
+    name: str
+    path: str
+    view: Callable
+    session: bool
+    request: str or None
+
+
+_ROUTE: ContextVar = ContextVar("route", default=None)
 
 
 class RequestHandler:
@@ -16,77 +44,247 @@ class RequestHandler:
 
     How to use:
         - use the bind decorator to bind a view to a specific path
-        - use the forward method inside the urls.py file to
-          dynamically forward requests to the appropriate view
+        - use the variant decorator to give a bound view an async variant,
+          which serves its path when the handler serves async views
+        - use the urls method inside the urls.py file to register a dispatcher
+          for every bound path, which forwards requests to the appropriate view
+
+    Async views (coroutine functions) are forwarded by an async dispatcher, so that Django awaits them
+    on the event loop when the project is served by Kanboard/asgi.py, instead of running them in a thread.
 
     Methods:
         - bind: Binds a view to a specific path.
-        - forward: Forwards a request to the appropriate view.
-        - match_path: Matches the request path to the bound view.
+        - variant: Binds the async variant of a bound view.
+        - forward: Forwards a request to the view of a route.
+        - aforward: Forwards a request to the async view of a route.
+        - urls: Gets the URL patterns of the bound views.
+        - current_route: Gets the route of the request being forwarded.
     """
 
-    def __init__(self):
+    def __init__(self, metrics: RouteMetrics = None, profiler: RequestProfiler = None,
+                 allocations: AllocationProfiler = None, replicas: ReadReplicas = None, shards: ShardDirectory = None,
+                 asynchronous: bool = False):
         """
         Initializes the RequestHandler instance.
+
+        :param metrics: RouteMetrics - The metrics recording the requests of the bound routes, None to record nothing.
+        :param profiler: RequestProfiler - The profiler of the requests asking to be profiled, None to profile nothing.
+        :param allocations: AllocationProfiler - The tracer of the allocations of selected routes, None to trace nothing.
+        :param replicas: ReadReplicas - The read replicas serving the read-only routes, None to only use the primary.
+        :param shards: ShardDirectory - The shards of the boards, None to keep every board in the default database.
+        :param asynchronous: bool - Whether the async variants of the views serve their paths instead of the views.
         """
-        self.___views: dict[str: tuple[Callable, dict]] = {}
+        self.___asynchronous = asynchronous
+        self.___metrics = metrics
+        self.___profiler = profiler
+        self.___allocations = allocations
+        self.___replicas = replicas
+        self.___shards = shards
+        self.___routes: dict[str, Route] = {}
         self.___urls = []
 
     def bind(self, _name: str, _path: str, session: bool = False, request: str = None):
         """
         Binds a view to a specific path.
+        The URL pattern of the path is registered with a dispatcher that already knows the route,
+        so that requests are forwarded without resolving their path again.
 
         :param _name: str - The name of the view.
         :param _path: str - The path to bind the view to.
+        :param session: bool - Whether the view requires an authenticated user.
+        :param request: str - The HTTP method accepted by the view, None to accept any method.
         :return: Callable - The decorator function.
         """
         def decorator(view: Callable):
-            self.___views[_path] = (view, {"session": session, "request": request})
-            self.___urls.append(path(_path, self.forward, name=f"{_name}"))
+            route = Route(_name, _path, view, session, request)
+            self.___routes[_path] = route
+            self.___urls.append(path(_path, self.___dispatcher(route), name=f"{_name}"))
             def wrapper(*args, **kwargs):
                 return view(*args, **kwargs)
             return wrapper
         return decorator
 
-    def forward(self, request: HttpRequest, **kwargs):
+    def variant(self, _name: str):
+        """
+        Binds the async variant of a bound view, which takes the same arguments and returns the same responses.
+        When the handler serves async views, the variant replaces the view in the route and in its URL pattern,
+        otherwise it is left unbound.
+
+        :param _name: str - The name of the bound view.
+        :return: Callable - The decorator function.
+        :raises KeyError: If no view is bound with that name.
+        :raises TypeError: If the variant is not an async view.
+        """
+        def decorator(view: Callable):
+            if not iscoroutinefunction(view):
+                raise TypeError(f"The variant of {_name} is not an async view.")
+            if self.___asynchronous:
+                self.___rebind(_name, view)
+            return view
+        return decorator
+
+    def forward(self, request: HttpRequest, route: Route, **kwargs):
+        """
+        Forwards a request to the view of a route.
+        When the handler has metrics, the latency, the database queries, the response size and the status
+        of the request are recorded under the name of the route.
+        When the handler has a profiler and the request carries a profiling token, the view runs under cProfile.
+        When the handler traces the allocations of the route, the view runs under tracemalloc.
+        When the handler has read replicas, the queries of a read-only route are sent to one of them.
+        When the handler has shards, the queries of a route scoped by a board_id are sent to the shard of the board.
+
+        :param request: HttpRequest - The request object.
+        :param route: Route - The route the request was dispatched to.
+        :param kwargs: tuple - Additional arguments to pass to the view.
+        :return: HttpResponse - The response from the view or an error message.
+        """
+        token = _ROUTE.set(route)
+        try:
+            serve = partial(self.___trace, request, route, **kwargs)
+            if self.___replicas is not None:
+                serve = partial(self.___replicas.serve, request, route, serve)
+            if self.___shards is not None:
+                serve = partial(self.___shards.serve, kwargs, serve)
+            return serve()
+        finally:
+            _ROUTE.reset(token)
+
+    async def aforward(self, request: HttpRequest, route: Route, **kwargs):
         """
-        Forwards a request to the appropriate view.
+        Forwards a request to the async view of a route, the way forward does for the other views.
+        The requests of async routes are never profiled: cProfile only sees the thread of the event loop,
+        and both cProfile and tracemalloc would mix in the requests running on the event loop at the same time.
 
         :param request: HttpRequest - The request object.
+        :param route: Route - The route the request was dispatched to.
         :param kwargs: tuple - Additional arguments to pass to the view.
         :return: HttpResponse - The response from the view or an error message.
         """
+        token = _ROUTE.set(route)
+        try:
+            serve = partial(self.___aserve, request, route, **kwargs)
+            if self.___replicas is not None:
+                serve = partial(self.___replicas.aserve, request, route, serve)
+            if self.___shards is not None:
+                serve = partial(self.___shards.aserve, kwargs, serve)
+            return await serve()
+        finally:
+            _ROUTE.reset(token)
+
+    def routes(self) -> list[Route]:
+        """
+        Gets the bound routes.
+
+        :return: list[Route] - The routes.
+        """
+        return list(self.___routes.values())
+
+    def urls(self):
+        return self.___urls
+
+    @staticmethod
+    def current_route() -> Route or None:
+        """
+        Gets the route of the request being forwarded in the current thread or task.
+
+        :return: Route - The route, None outside of a forwarded request.
+        """
+        return _ROUTE.get()
 
-        view, options = None, None
+    def ___trace(self, request: HttpRequest, route: Route, **kwargs) -> HttpResponse:
+        if self.___profiler is not None and self.___profiler.requested(request):
+            return self.___profiler.profile(request, route.name, lambda: self.___serve(request, route, **kwargs))
+        if self.___allocations is not None and self.___allocations.traced(route.name):
+            return self.___allocations.profile(route.name, lambda: self.___serve(request, route, **kwargs))
+        return self.___serve(request, route, **kwargs)
+
+    def ___serve(self, request: HttpRequest, route: Route, **kwargs) -> HttpResponse:
+        if self.___metrics is None:
+            return self.___call(request, route, **kwargs)
+        queries = QueryCounter()
+        start = time.perf_counter()
+        try:
+            # Replicas and shards are separate connections, so every one of them is counted.
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(queries))
+                response = self.___call(request, route, **kwargs)
+        except Exception:
+            self.___metrics.observe(route.name, 500, time.perf_counter() - start, queries.count, queries.duration)
+            raise
+        duration = time.perf_counter() - start
+
+        size = 0 if response.streaming else len(response.content)
+        self.___metrics.observe(route.name, response.status_code, duration, queries.count, queries.duration, size)
+        return response
+
+    async def ___aserve(self, request: HttpRequest, route: Route, **kwargs) -> HttpResponse:
+        if self.___metrics is None:
+            return await self.___acall(request, route, **kwargs)
+        queries = QueryCounter()
+        start = time.perf_counter()
+        # The async ORM runs the queries of the request in its own thread, on the connections of that thread.
+        wrappers = await sync_to_async(lambda: [connection.execute_wrappers for connection in connections.all()])()
+        for execute_wrappers in wrappers:
+            execute_wrappers.append(queries)
         try:
-            view, options = self.___match_path(request.path)
+            response = await self.___acall(request, route, **kwargs)
         except Exception:
-            return HttpResponse("404 Not Found")
+            self.___metrics.observe(route.name, 500, time.perf_counter() - start, queries.count, queries.duration)
+            raise
+        finally:
+            for execute_wrappers in wrappers:
+                execute_wrappers.remove(queries)
+        duration = time.perf_counter() - start
+
+        size = 0 if response.streaming else len(response.content)
+        self.___metrics.observe(route.name, response.status_code, duration, queries.count, queries.duration, size)
+        return response
 
-        uuid = request.session.get('uuid', None)
+    @staticmethod
+    async def ___acall(request: HttpRequest, route: Route, **kwargs) -> HttpResponse:
+        if route.session and await request.session.aget('uuid', None) is None:
+            return HttpResponse("401 Unauthorized", status=401)
+        if route.request is not None and request.method != route.request:
+            return HttpResponseNotAllowed([route.request], "405 Method Not Allowed")
+
+        return await route.view(request, **kwargs)
 
-        if options['session'] and uuid is None:
-            return HttpResponse("401 Unauthorized")
-        if options['request'] is not None and request.method != options['request']:
-            return HttpResponse("405 Method Not Allowed")
+    @staticmethod
+    def ___call(request: HttpRequest, route: Route, **kwargs) -> HttpResponse:
+        if route.session and request.session.get('uuid', None) is None:
+            return HttpResponse("401 Unauthorized", status=401)
+        if route.request is not None and request.method != route.request:
+            return HttpResponseNotAllowed([route.request], "405 Method Not Allowed")
 
-        return view(request, **kwargs)
+        return route.view(request, **kwargs)
 
-    def ___match_path(self, path: str) -> tuple[Callable, dict]:
+    def ___dispatcher(self, route: Route) -> Callable:
         """
-        Matches the path specified in the bind decorator with the current path provided by the request object.
-        Matching is more complicated than just checking if the path is in the dictionary, because the path can contain
-        relative elements (for example: <int:board_id>/path/...).
+        Builds the callable registered in the URL pattern of a route.
 
-        :param path: str - The path to match.
-        :return: tuple[Callable, dict[str: Any]] - The matched view and its associated options.
+        :param route: Route - The route.
+        :return: Callable - The dispatcher, forwarding the requests to the view of the route.
         """
-        resolution = resolve(path)
-        real = resolution.route
-        return self.___views.get(real, None)
+        if iscoroutinefunction(route.view):
+            async def dispatch(request: HttpRequest, **kwargs):
+                return await self.aforward(request, route, **kwargs)
+            dispatch.route = route
+            return dispatch
 
-    def urls(self):
-        return self.___urls
+        def dispatch(request: HttpRequest, **kwargs):
+            return self.forward(request, route, **kwargs)
+        dispatch.route = route
+        return dispatch
+
+    def ___rebind(self, _name: str, view: Callable):
+        route = next((route for route in self.___routes.values() if route.name == _name), None)
+        if route is None:
+            raise KeyError(f"No view is bound with the name {_name}.")
+        route = route._replace(view=view)
+        self.___routes[route.path] = route
+        self.___urls = [path(route.path, self.___dispatcher(route), name=_name) if pattern.name == _name else pattern
+                        for pattern in self.___urls]
 
 
 
@@ -104,12 +302,13 @@ class JsonResponses:
     ERROR = 500
 
     @staticmethod
-    def response(status: int, message: str) -> JsonResponse:
+    def response(status: int, message: str, **extra) -> JsonResponse:
         """
         Generates a JSON response.
 
         :param status: int - The status code of the response.
         :param message: str - The message to include in the response.
+        :param extra: dict - Additional fields to include in the response.
         :return: JsonResponse - The JSON response.
         """
         if status not in { JsonResponses.SUCCESS, JsonResponses.ERROR, JsonResponses.WARNING }:
@@ -118,5 +317,5 @@ class JsonResponses:
         if not message:
             raise ValueError("Message cannot be empty.")
 
-        return JsonResponse({'status': status, 'message': message})
+        return JsonResponse({**extra, 'status': status, 'message': message})
 
@@ -0,0 +1,67 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore as DatabaseSessionStore
+from django.db import router
+from django.utils import timezone
+
+
+class SessionRouter:
+    """
+    This database router keeps the sessions in the database named by the SESSION_DATABASE setting.
+
+    SQLite lets a single connection write to a database file at a time, so moving the sessions table to its own file
+    means that logins and logouts never wait for the write lock of the boards (and the other way around).
+    The router has no opinion on any other model, nor on the sessions while SESSION_DATABASE is not set.
+    """
+
+    @staticmethod
+    def ___database(model) -> str or None:
+        database = getattr(settings, 'SESSION_DATABASE', None)
+        if database is None or model._meta.app_label != 'sessions':
+            return None
+        return database
+
+    def db_for_read(self, model, **hints):
+        return self.___database(model)
+
+    def db_for_write(self, model, **hints):
+        return self.___database(model)
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        database = getattr(settings, 'SESSION_DATABASE', None)
+        if database is None:
+            return None
+        return (app_label == 'sessions') == (db == database)
+
+
+def sweep_expired_sessions(batch_size: int = 500, pause: float = 0.0) -> int or None:
+    """
+    Deletes the sessions which expired, from the store configured by the SESSION_ENGINE setting.
+
+    The database stores are swept in batches of batch_size sessions, each one deleted by its own short statement,
+    so that the write lock is released between two batches instead of being held for the whole sweep.
+    The other stores are left to their own clear_expired(): the file store removes its expired files,
+    while the cache and signed cookie stores have nothing to sweep.
+
+    :param batch_size: int - The number of sessions deleted by each statement.
+    :param pause: float - The number of seconds to wait between two batches.
+    :return: int or None - The number of deleted sessions, or None if the store is not a database one.
+    """
+    store = import_module(settings.SESSION_ENGINE).SessionStore
+    if not issubclass(store, DatabaseSessionStore):
+        store.clear_expired()
+        return None
+
+    model = store.get_model_class()
+    database = router.db_for_write(model)
+    expired = model.objects.using(database).filter(expire_date__lt=timezone.now())
+    deleted = 0
+    while True:
+        keys = list(expired.values_list('session_key', flat=True)[:batch_size])
+        if not keys:
+            return deleted
+        deleted += model.objects.using(database).filter(session_key__in=keys).delete()[0]
+        if pause > 0:
+            time.sleep(pause)
@@ -0,0 +1,265 @@
+import asyncio
+import heapq
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import islice
+from threading import Lock
+from typing import Awaitable, Callable, Iterable
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, models
+from django.db.models import Count
+from django.http import HttpResponse
+
+_SHARD: ContextVar = ContextVar("shard", default=None)
+
+SHARDED_APPS = frozenset({"core"})
+REPLICATED_APPS = frozenset({"authentication"})
+DIRECTORY_MODEL = "boardshard"
+
+
+class ShardDirectory:
+    """
+    This class places every board, with its columns, cards, assignees and guests, on one of several databases.
+
+    The directory of the boards is a table of the default database (the model given to the constructor),
+    which also hands out the IDs of the new boards, so that they are unique across the shards.
+    Lookups are cached in the process for cache_ttl seconds, which is also how long the processes that did not
+    move a board keep sending its queries to its previous shard (see the shards command).
+
+    The requests of the routes scoped by a board_id are served on the shard of their board, and the ShardRouter
+    sends the queries of the board models to that shard. The users are copied to every shard (see core/signals.py),
+    so that the queries joining boards and users keep running on a single database.
+
+    Methods:
+        - serve: Serves a request on the shard of its board.
+        - aserve: Serves a request of an async view on the shard of its board.
+        - scope: Sends the queries run inside the block to a shard.
+        - alias: Gets the shard of a board.
+        - aalias: Gets the shard of a board, with the async ORM.
+        - allocate: Reserves the ID and the shard of a new board.
+        - move: Changes the shard of a board in the directory.
+        - forget: Removes a board from the directory.
+        - counts: Counts the boards of every shard.
+        - fan_out: Runs a query on every shard and merges the rows.
+        - afan_out: Runs an async query on every shard at the same time and merges the rows.
+    """
+
+    def __init__(self, model: type[models.Model], aliases: tuple = (DEFAULT_DB_ALIAS,), cache_ttl: float = 30,
+                 cache_size: int = 4096):
+        """
+        Initializes the ShardDirectory instance.
+
+        :param model: Model - The directory model, with a board_id primary key and an alias field.
+        :param aliases: tuple[str] - The database aliases of the shards.
+        :param cache_ttl: float - The number of seconds a lookup is cached.
+        :param cache_size: int - The maximum number of lookups cached.
+        """
+        if not aliases:
+            raise ValueError("At least one shard is required.")
+        self.aliases = tuple(aliases)
+        self.___model = model
+        self.___cache_ttl = cache_ttl
+        self.___cache_size = cache_size
+        self.___cache: dict[int, tuple[str, float]] = {}
+        self.___lock = Lock()
+
+    def serve(self, route_kwargs: dict, view: Callable[[], HttpResponse]) -> HttpResponse:
+        """
+        Serves a request on the shard of its board, when its route is scoped by a board_id.
+
+        :param route_kwargs: dict - The arguments of the route.
+        :param view: Callable - The view, called without arguments.
+        :return: HttpResponse - The response of the view.
+        """
+        board_id = route_kwargs.get("board_id", None)
+        if board_id is None:
+            return view()
+        with self.scope(self.alias(board_id)):
+            return view()
+
+    async def aserve(self, route_kwargs: dict, view: Callable[[], Awaitable[HttpResponse]]) -> HttpResponse:
+        """
+        Serves a request of an async view on the shard of its board, when its route is scoped by a board_id.
+
+        :param route_kwargs: dict - The arguments of the route.
+        :param view: Callable - The async view, called without arguments.
+        :return: HttpResponse - The response of the view.
+        """
+        board_id = route_kwargs.get("board_id", None)
+        if board_id is None:
+            return await view()
+        with self.scope(await self.aalias(board_id)):
+            return await view()
+
+    @staticmethod
+    @contextmanager
+    def scope(alias: str):
+        """
+        Sends the queries of the board models run inside the block to a shard.
+
+        :param alias: str - The alias of the shard.
+        """
+        token = _SHARD.set(alias)
+        try:
+            yield alias
+        finally:
+            _SHARD.reset(token)
+
+    @staticmethod
+    def current() -> str or None:
+        """
+        Gets the shard of the request being served in the current thread or task.
+
+        :return: str - The alias of the shard, None outside of a board.
+        """
+        return _SHARD.get()
+
+    def alias(self, board_id: int) -> str:
+        """
+        Gets the shard of a board. The boards missing from the directory are looked for on the first shard.
+
+        :param board_id: int - The board's ID.
+        :return: str - The alias of the shard.
+        """
+        if (alias := self.___cached(board_id)) is not None:
+            return alias
+        return self.___remember(board_id, self.___lookup(board_id).first())
+
+    async def aalias(self, board_id: int) -> str:
+        """
+        Gets the shard of a board the way alias does, with the async ORM.
+
+        :param board_id: int - The board's ID.
+        :return: str - The alias of the shard.
+        """
+        if (alias := self.___cached(board_id)) is not None:
+            return alias
+        return self.___remember(board_id, await self.___lookup(board_id).afirst())
+
+    def allocate(self) -> tuple[int, str]:
+        """
+        Reserves the ID of a new board on the shard holding the fewest boards.
+
+        :return: tuple[int, str] - The ID of the board and the alias of its shard.
+        """
+        counts = self.counts()
+        alias = min(self.aliases, key=lambda name: counts.get(name, 0))
+        entry = self.___model.objects.using(DEFAULT_DB_ALIAS).create(alias=alias)
+        return entry.board_id, alias
+
+    def move(self, board_id: int, alias: str):
+        """
+        Changes the shard of a board in the directory. The rows of the board must already be on that shard.
+
+        :param board_id: int - The board's ID.
+        :param alias: str - The alias of the new shard.
+        """
+        if alias not in self.aliases:
+            raise ValueError(f"Unknown shard: {alias}")
+        self.___model.objects.using(DEFAULT_DB_ALIAS).update_or_create(board_id=board_id, defaults={"alias": alias})
+        with self.___lock:
+            self.___cache.pop(board_id, None)
+
+    def forget(self, board_id: int):
+        """
+        Removes a board from the directory.
+
+        :param board_id: int - The board's ID.
+        """
+        self.___model.objects.using(DEFAULT_DB_ALIAS).filter(board_id=board_id).delete()
+        with self.___lock:
+            self.___cache.pop(board_id, None)
+
+    def counts(self) -> dict[str, int]:
+        """
+        Counts the boards of every shard.
+
+        :return: dict[str, int] - The number of boards, by alias.
+        """
+        rows = self.___model.objects.using(DEFAULT_DB_ALIAS).values("alias").annotate(boards=Count("board_id"))
+        counts = dict.fromkeys(self.aliases, 0)
+        counts.update({row["alias"]: row["boards"] for row in rows})
+        return counts
+
+    def fan_out(self, query: Callable[[str], Iterable[tuple]], limit: int = None) -> list[tuple]:
+        """
+        Runs a query on every shard and merges the rows, which every shard must return sorted.
+
+        :param query: Callable - Gets the rows of a shard, given its alias.
+        :param limit: int - The maximum number of rows to return, None to return them all.
+        :return: list[tuple] - The sorted rows of every shard.
+        """
+        return list(islice(heapq.merge(*(query(alias) for alias in self.aliases)), limit))
+
+    async def afan_out(self, query: Callable[[str], Awaitable[list[tuple]]], limit: int = None) -> list[tuple]:
+        """
+        Runs an async query on every shard at the same time and merges the rows, which every shard must return sorted.
+
+        :param query: Callable - Gets the rows of a shard, given its alias.
+        :param limit: int - The maximum number of rows to return, None to return them all.
+        :return: list[tuple] - The sorted rows of every shard.
+        """
+        rows = await asyncio.gather(*(query(alias) for alias in self.aliases))
+        return list(islice(heapq.merge(*rows), limit))
+
+    def ___cached(self, board_id: int) -> str or None:
+        cached = self.___cache.get(board_id, None)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+        return None
+
+    def ___lookup(self, board_id: int):
+        return self.___model.objects.using(DEFAULT_DB_ALIAS).filter(board_id=board_id).values_list("alias", flat=True)
+
+    def ___remember(self, board_id: int, alias: str or None) -> str:
+        alias = alias or self.aliases[0]
+        with self.___lock:
+            if len(self.___cache) >= self.___cache_size:
+                self.___cache.clear()
+            self.___cache[board_id] = (alias, time.monotonic() + self.___cache_ttl)
+        return alias
+
+
+class ShardRouter:
+    """
+    This database router sends the queries of the board models to the shard of the board they belong to:
+    the shard the instance was loaded from when there is one, the shard of the request being served otherwise.
+    The users are read from the shard of the request, where they are copied, and written to the default database.
+    The directory of the boards only exists in the default database.
+    """
+
+    @staticmethod
+    def ___enabled() -> bool:
+        return getattr(settings, 'SHARDING_ENABLED', False)
+
+    @staticmethod
+    def ___shard(model, hints: dict) -> str or None:
+        if model._meta.app_label not in SHARDED_APPS or model._meta.model_name == DIRECTORY_MODEL:
+            return None
+        instance = hints.get('instance', None)
+        if instance is not None and instance._state.db is not None:
+            return instance._state.db
+        return _SHARD.get()
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in REPLICATED_APPS:
+            return _SHARD.get()
+        return self.___shard(model, hints)
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label in REPLICATED_APPS:
+            return DEFAULT_DB_ALIAS if self.___enabled() else None
+        return self.___shard(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The users are copied to every shard, so a board of any shard may refer to a user of any database.
+        if self.___enabled() and REPLICATED_APPS & {obj1._meta.app_label, obj2._meta.app_label}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if model_name == DIRECTORY_MODEL:
+            return db == DEFAULT_DB_ALIAS
+        return None
@@ -0,0 +1,200 @@
+import atexit
+import json
+import logging
+import re
+import sys
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from queue import SimpleQueue
+from threading import Lock
+
+from .requests import RequestHandler
+
+DEFAULT_CALL_SITES = ("core/views.py", "static/utils/utils.py")
+
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"(?<![\w\"])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDERS = re.compile(r"%s|\?")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def fingerprint(sql: str) -> str:
+    """
+    Normalizes a SQL statement, so that the statements which only differ by their values
+    (including the length of their IN lists) share the same fingerprint.
+
+    :param sql: str - The SQL statement.
+    :return: str - The fingerprint.
+    """
+    sql = _STRINGS.sub("?", sql)
+    sql = _NUMBERS.sub("?", sql)
+    sql = _PLACEHOLDERS.sub("?", sql)
+    sql = _LISTS.sub("(...)", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+class SlowQueryRecorder:
+    """
+    This class is a database execute wrapper that records every statement slower than a threshold,
+    together with its parameters, the route of the request that ran it and the call site that ran it.
+
+    Parameters hold user data (passwords, emails, card contents), so only their types are recorded
+    unless log_params is set.
+
+    Records are handed to a background thread, which appends them as JSON lines to a rotating file,
+    so that the request that ran the slow statement does not also pay for writing it down.
+
+    How to use:
+        - install the recorder on every database connection, for example when the connection is created
+          (see core/signals.py)
+
+    Methods:
+        - install: Installs the recorder on a database connection.
+        - record: Records a slow statement.
+        - close: Writes the pending records and stops the background thread.
+    """
+
+    def __init__(self, path: str, threshold: float = 0.1, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5,
+                 call_sites: tuple = DEFAULT_CALL_SITES, max_params: int = 50, log_params: bool = False):
+        """
+        Initializes the SlowQueryRecorder instance.
+
+        :param path: str - The path of the JSON lines file.
+        :param threshold: float - The number of seconds above which a statement is recorded.
+        :param max_bytes: int - The size above which the file is rotated.
+        :param backup_count: int - The number of rotated files kept.
+        :param call_sites: tuple[str] - The ending of the paths of the files whose frames are reported as call sites.
+        :param max_params: int - The maximum number of parameters recorded for each statement.
+        :param log_params: bool - Whether the values of the parameters are recorded, instead of their types.
+        """
+        self.threshold = threshold
+        self.___path = Path(path)
+        self.___max_bytes = max_bytes
+        self.___backup_count = backup_count
+        self.___call_sites = tuple(site.replace("\\", "/") for site in call_sites)
+        self.___max_params = max_params
+        self.___log_params = log_params
+        self.___logger = logging.Logger("kanboard.slow_queries")
+        self.___listener: QueueListener or None = None
+        self.___lock = Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            if duration >= self.threshold:
+                self.record(sql, params, many, duration, context["connection"].alias)
+
+    def install(self, connection):
+        """
+        Installs the recorder on a database connection, unless it is already installed.
+
+        :param connection: BaseDatabaseWrapper - The connection.
+        """
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    def record(self, sql: str, params, many: bool, duration: float, alias: str = "default"):
+        """
+        Records a slow statement.
+
+        :param sql: str - The SQL statement.
+        :param params: list or dict - The parameters of the statement.
+        :param many: bool - Whether the statement was run once for each set of parameters.
+        :param duration: float - The number of seconds spent running the statement.
+        :param alias: str - The alias of the database that ran the statement.
+        """
+        route = RequestHandler.current_route()
+        entry = {
+            "time": datetime.now(timezone.utc).isoformat(),
+            "duration": round(duration, 6),
+            "database": alias,
+            "sql": sql,
+            "params": self.___truncate(params if self.___log_params else self.___redact(params)),
+            "many": many,
+            "fingerprint": fingerprint(sql),
+            "route": route.name if route is not None else None,
+            "call_site": self.___call_site(),
+        }
+        self.___start()
+        self.___logger.info(json.dumps(entry, default=str))
+
+    def close(self):
+        """
+        Writes the pending records and stops the background thread.
+        """
+        with self.___lock:
+            listener, self.___listener = self.___listener, None
+        if listener is not None:
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
+            self.___logger.handlers.clear()
+
+    def ___start(self):
+        if self.___listener is not None:
+            return
+        with self.___lock:
+            if self.___listener is not None:
+                return
+            self.___path.parent.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(self.___path, maxBytes=self.___max_bytes, backupCount=self.___backup_count,
+                                          encoding="utf-8", delay=True)
+            queue = SimpleQueue()
+            self.___logger.handlers = [QueueHandler(queue)]
+            self.___listener = QueueListener(queue, handler)
+            self.___listener.start()
+            atexit.register(self.close)
+
+    @staticmethod
+    def ___redact(params):
+        if params is None:
+            return None
+        if isinstance(params, dict):
+            return {name: type(value).__name__ for name, value in params.items()}
+        return [type(value).__name__ for value in params]
+
+    def ___truncate(self, params):
+        if params is None or isinstance(params, dict):
+            return params
+        params = list(params)
+        if len(params) > self.___max_params:
+            return params[:self.___max_params] + [f"... {len(params) - self.___max_params} more"]
+        return params
+
+    def ___call_site(self) -> str or None:
+        frame = sys._getframe(2)
+        while frame is not None:
+            filename = frame.f_code.co_filename.replace("\\", "/")
+            for site in self.___call_sites:
+                if filename.endswith(site):
+                    return f"{site}:{frame.f_lineno} in {frame.f_code.co_name}"
+            frame = frame.f_back
+        return None
+
+
+def read_records(path: str) -> list[dict]:
+    """
+    Reads the records of a slow query log, including its rotated files, oldest first.
+
+    :param path: str - The path of the JSON lines file.
+    :return: list[dict] - The records.
+    """
+    path = Path(path)
+    rotated = [file for file in path.parent.glob(f"{path.name}.*") if file.suffix[1:].isdigit()]
+    records = []
+    for file in sorted(rotated, key=lambda file: -int(file.suffix[1:])) + [path]:
+        if not file.exists():
+            continue
+        with file.open(encoding="utf-8") as lines:
+            for line in lines:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue  # The line was being written when the process stopped.
+    return records
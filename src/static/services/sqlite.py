@@ -0,0 +1,34 @@
+import re
+import sqlite3
+
+from django.core.exceptions import ImproperlyConfigured
+
+_NAME = re.compile(r"[a-z_]+")
+_VALUE = re.compile(r"-?\d+|[A-Za-z]+")
+
+
+def apply_pragmas(connection: sqlite3.Connection, pragmas: dict) -> dict:
+    """
+    Applies pragmas to a new SQLite connection, and reads back the value each of them ended up with
+    (SQLite ignores the values it does not support, e.g. the WAL journal mode of an in-memory database).
+
+    The pragmas that matter for Kanboard, where readers of the boards run next to the writes of drag and drop:
+        - journal_mode=wal: readers no longer block the writer, nor the writer the readers,
+        - synchronous=normal: in WAL mode, commits no longer wait for the disk, only checkpoints do,
+        - mmap_size, cache_size: how much of the database is memory mapped and kept in the page cache,
+        - temp_store=memory: the temporary tables and indexes of sorts and groupings stay in memory,
+        - busy_timeout: the number of milliseconds a connection waits for a lock before "database is locked".
+
+    :param connection: sqlite3.Connection - The connection.
+    :param pragmas: dict - The values of the pragmas, by name, applied in order.
+    :return: dict - The value of every pragma after it was applied.
+    :raises ImproperlyConfigured: If a name or a value is not a plain identifier or integer.
+    """
+    applied = {}
+    for name, value in pragmas.items():
+        if not _NAME.fullmatch(name) or not _VALUE.fullmatch(str(value)):
+            raise ImproperlyConfigured(f"Invalid SQLite pragma: {name} = {value!r}")
+        connection.execute(f"PRAGMA {name} = {value}").fetchall()
+        row = connection.execute(f"PRAGMA {name}").fetchone()
+        applied[name] = row[0] if row else None
+    return applied
@@ -1,8 +1,28 @@
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import threading
 import unittest
+from pathlib import Path
+from unittest.mock import patch
 
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.contrib.sessions.models import Session
+from django.core.exceptions import ImproperlyConfigured
 from django.core.files.uploadedfile import SimpleUploadedFile
-
-from static.services import ModelsAttributeError, JsonResponses
+from django.test import RequestFactory, override_settings
+
+from authentication.models import User
+from core.models import Card, BoardShard
+from static.services import ModelsAttributeError, JsonResponses, BoardAccessCache, BoardRole, BoardEventBroadcaster, \
+    SQLiteEventBackend, RequestHandler, RouteMetrics, SlowQueryRecorder, RequestProfiler
+from static.services.slowqueries import fingerprint, read_records
+from static.services.sqlite import apply_pragmas
+from static.services.replicas import ReadReplicas, ReplicaRouter
+from static.services.sharding import ShardDirectory, ShardRouter
+from static.services.ordering import ORDER_GAP, key_after, key_between, plan_ordering, spread
 from static.services.validations import BoardValidations, CardValidations, UserValidations, ColumnValidations, EXISTENCE
 
 
@@ -219,6 +239,10 @@ class TestColumnValidations(unittest.TestCase):
         validator = ColumnValidations(color="#12345")
         self.assertRaises(ModelsAttributeError, validator.result)
 
+    def test_validate_column_color_key(self):
+        validator = ColumnValidations(column_color="#12345")
+        self.assertRaises(ModelsAttributeError, validator.result)
+
 
 class TestCardValidations(unittest.TestCase):
 
@@ -263,6 +287,30 @@ class TestCardValidations(unittest.TestCase):
         validator = CardValidations(color="123456")
         self.assertRaises(ModelsAttributeError, validator.result)
 
+    def test_validate_card_story_points_ok(self):
+        for story_points in (0, "16", " 3", "03"):
+            CardValidations(story_points=story_points).result()
+
+    def test_validate_card_empty_key_falls_back_to_the_other_key(self):
+        # As with `card_title or title`, an empty field is skipped when the other key holds a value,
+        # and is only validated when it is the last value given.
+        CardValidations(card_title="", title="Valid title").result()
+        CardValidations(card_title="").result()
+        self.assertRaises(ModelsAttributeError, CardValidations(card_title="", title="").result)
+        self.assertRaises(ModelsAttributeError, CardValidations(color="").result)
+
+    def test_validate_card_story_points_out_of_range(self):
+        for story_points in (-1, "17", "many"):
+            self.assertRaises(ModelsAttributeError, CardValidations(story_points=story_points).result)
+
+    def test_validate_card_collects_every_error(self):
+        with self.assertRaises(ModelsAttributeError) as context:
+            CardValidations(card_title="Invalid#Title!", card_description="Valid description", color="123456",
+                            story_points=99).result()
+        self.assertEqual(set(context.exception.errors), {"title", "color", "story_points"})
+        self.assertTrue(context.exception.is_pattern())
+        self.assertEqual(len(str(context.exception).splitlines()), 3)
+
 
 class TestJsonResponses(unittest.TestCase):
 
@@ -281,5 +329,568 @@ class TestJsonResponses(unittest.TestCase):
         self.assertRaises(ValueError, lambda: JsonResponses.response(**kwargs))
 
 
+class TestRequestHandler(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = RequestHandler()
+        self.handler.bind("example", "example/<int:item_id>/", session=True, request="POST")(
+            lambda request, item_id: JsonResponses.response(JsonResponses.SUCCESS, "OK", item_id=item_id))
+        self.dispatch = self.handler.urls()[0].callback
+
+    def request(self, method: str, uuid: str = None):
+        request = RequestFactory().generic(method, "/example/1/")
+        request.session = {} if uuid is None else {"uuid": uuid}
+        return request
+
+    def test_forward(self):
+        response = self.dispatch(self.request("POST", "some-uuid"), item_id=1)
+        self.assertEqual(response.status_code, 200)
+
+    def test_forward_without_session(self):
+        response = self.dispatch(self.request("POST"), item_id=1)
+        self.assertEqual(response.status_code, 401)
+
+    def test_forward_wrong_method(self):
+        response = self.dispatch(self.request("GET", "some-uuid"), item_id=1)
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(response["Allow"], "POST")
+
+    def test_routes(self):
+        self.assertEqual([route.name for route in self.handler.routes()], ["example"])
+
+    def test_forward_async_view(self):
+        handler = RequestHandler(metrics=RouteMetrics())
+
+        async def view(request, item_id):
+            return JsonResponses.response(JsonResponses.SUCCESS, "OK", item_id=item_id)
+
+        handler.bind("example", "example/<int:item_id>/", session=True, request="POST")(view)
+        dispatch = handler.urls()[0].callback
+        self.assertTrue(asyncio.iscoroutinefunction(dispatch))
+
+        request = self.request("POST")
+        request.session = SessionStore()
+        self.assertEqual(asyncio.run(dispatch(request, item_id=1)).status_code, 401)
+        request.session["uuid"] = "some-uuid"
+        self.assertEqual(json.loads(asyncio.run(dispatch(request, item_id=1)).content)["item_id"], 1)
+
+    def test_variant(self):
+        async def variant(request, item_id):
+            return JsonResponses.response(JsonResponses.SUCCESS, "Async", item_id=item_id)
+
+        self.assertIs(self.handler.variant("example")(variant), variant)
+        self.assertFalse(asyncio.iscoroutinefunction(self.handler.urls()[0].callback))
+
+        handler = RequestHandler(asynchronous=True)
+        handler.bind("example", "example/<int:item_id>/", request="POST")(
+            lambda request, item_id: JsonResponses.response(JsonResponses.SUCCESS, "OK"))
+        handler.variant("example")(variant)
+        pattern = handler.urls()[0]
+        self.assertEqual(pattern.name, "example")
+        self.assertIs(handler.routes()[0].view, variant)
+        response = asyncio.run(pattern.callback(self.request("POST"), item_id=1))
+        self.assertEqual(json.loads(response.content)["message"], "Async")
+
+        with self.assertRaises(KeyError):
+            handler.variant("missing")(variant)
+        with self.assertRaises(TypeError):
+            handler.variant("example")(lambda request, item_id: None)
+
+
+class TestReadReplicas(unittest.TestCase):
+
+    def setUp(self):
+        self.replicas = ReadReplicas(aliases=("replica",), stickiness=5)
+        self.handler = RequestHandler(replicas=self.replicas)
+        self.databases = []
+
+        def view(request):
+            self.databases.append((ReplicaRouter().db_for_read(Card), ReplicaRouter().db_for_read(Session)))
+            return JsonResponses.response(JsonResponses.SUCCESS, "OK")
+
+        self.handler.bind("read", "read/", request="GET")(view)
+        self.handler.bind("write", "write/", request="POST")(view)
+        self.read, self.write = (pattern.callback for pattern in self.handler.urls())
+
+    def request(self, method: str, cookies: dict = None):
+        request = RequestFactory().generic(method, "/")
+        request.session = {}
+        request.COOKIES.update(cookies or {})
+        return request
+
+    def test_read_only_routes_use_replicas(self):
+        self.read(self.request("GET"))
+        self.write(self.request("POST"))
+        self.assertEqual(self.databases, [("replica", None), (None, None)])
+        self.assertIsNone(ReadReplicas.current())
+
+    def test_stickiness(self):
+        response = self.write(self.request("POST"))
+        cookie = response.cookies[ReadReplicas.COOKIE]
+        self.assertEqual(cookie["max-age"], 5)
+
+        self.read(self.request("GET", {ReadReplicas.COOKIE: cookie.value}))
+        self.read(self.request("GET", {ReadReplicas.COOKIE: "forged"}))
+        self.assertEqual(self.databases[1:], [(None, None), ("replica", None)])
+
+    def test_async_routes(self):
+        handler = RequestHandler(replicas=self.replicas)
+
+        async def view(request):
+            self.databases.append((ReplicaRouter().db_for_read(Card), ReplicaRouter().db_for_read(Session)))
+            return JsonResponses.response(JsonResponses.SUCCESS, "OK")
+
+        handler.bind("read", "read/", request="GET")(view)
+        handler.bind("write", "write/", request="POST")(view)
+        read, write = (pattern.callback for pattern in handler.urls())
+
+        response = asyncio.run(write(self.request("POST")))
+        self.assertIn(ReadReplicas.COOKIE, response.cookies)
+        asyncio.run(read(self.request("GET")))
+        self.assertEqual(self.databases, [(None, None), ("replica", None)])
+        self.assertIsNone(ReadReplicas.current())
+
+    def test_writes_go_to_the_primary(self):
+        card = Card(id=1)
+        card._state.db = "replica"
+        with override_settings(READ_REPLICAS_ENABLED=True, READ_REPLICAS_OPTIONS={"aliases": ("replica",)}):
+            self.assertEqual(ReplicaRouter().db_for_write(Card, instance=card), "default")
+            self.assertFalse(ReplicaRouter().allow_migrate("replica", "core"))
+            self.assertIsNone(ReplicaRouter().allow_migrate("default", "core"))
+
+    def test_refresh(self):
+        with tempfile.TemporaryDirectory() as directory:
+            primary, replica = Path(directory) / "primary.sqlite3", Path(directory) / "replica.sqlite3"
+            connection = sqlite3.connect(primary)
+            connection.execute("CREATE TABLE board (id INTEGER PRIMARY KEY)")
+            connection.execute("INSERT INTO board VALUES (1)")
+            connection.commit()
+            connection.close()
+
+            databases = {"default": {"NAME": primary}, "replica": {"NAME": replica}}
+            with patch.dict("django.conf.settings.DATABASES", databases):
+                self.replicas.refresh()
+            connection = sqlite3.connect(replica)
+            self.assertEqual(connection.execute("SELECT id FROM board").fetchall(), [(1,)])
+            connection.close()
+
+
+class TestShardRouter(unittest.TestCase):
+
+    def test_queries_follow_the_shard_of_the_request(self):
+        router = ShardRouter()
+        self.assertIsNone(router.db_for_read(Card))
+        with ShardDirectory.scope("shard1"):
+            self.assertEqual(router.db_for_read(Card), "shard1")
+            self.assertEqual(router.db_for_write(Card), "shard1")
+            self.assertEqual(router.db_for_read(User), "shard1")
+            self.assertIsNone(router.db_for_read(BoardShard))
+            self.assertIsNone(router.db_for_read(Session))
+
+            card = Card(id=1)
+            card._state.db = "shard2"
+            self.assertEqual(router.db_for_write(Card, instance=card), "shard2")
+        self.assertIsNone(ShardDirectory.current())
+
+    def test_users_and_directory_stay_in_the_default_database(self):
+        router = ShardRouter()
+        with override_settings(SHARDING_ENABLED=True), ShardDirectory.scope("shard1"):
+            self.assertEqual(router.db_for_write(User), "default")
+        self.assertTrue(router.allow_migrate("default", "core", "boardshard"))
+        self.assertFalse(router.allow_migrate("shard1", "core", "boardshard"))
+        self.assertIsNone(router.allow_migrate("shard1", "core", "card"))
+
+    def test_fan_out(self):
+        shards = {"default": [(1,), (4,), (6,)], "shard1": [(2,), (3,), (7,)]}
+        directory = ShardDirectory(BoardShard, aliases=tuple(shards))
+        self.assertEqual(directory.fan_out(shards.get, 4), [(1,), (2,), (3,), (4,)])
+        self.assertEqual(len(directory.fan_out(shards.get)), 6)
+
+    def test_afan_out(self):
+        shards = {"default": [(1,), (4,), (6,)], "shard1": [(2,), (3,), (7,)]}
+        directory = ShardDirectory(BoardShard, aliases=tuple(shards))
+
+        async def query(alias):
+            return shards[alias]
+
+        self.assertEqual(asyncio.run(directory.afan_out(query, 4)), [(1,), (2,), (3,), (4,)])
+
+
+class TestRouteMetrics(unittest.TestCase):
+
+    def test_observe(self):
+        metrics = RouteMetrics(buckets=(0.1, 1))
+        metrics.observe("board", 200, 0.05, queries=3, query_duration=0.01, size=100)
+        metrics.observe("board", 200, 0.5, queries=2, query_duration=0.02, size=50)
+        metrics.observe("board", 404, 5)
+        board = metrics.snapshot()["routes"]["board"]
+        self.assertEqual(board["count"], 3)
+        self.assertEqual(board["queries"], 5)
+        self.assertEqual(board["size"], 150)
+        self.assertEqual(board["buckets"], [1, 1, 1])
+        self.assertEqual(board["statuses"], {"200": 2, "404": 1})
+
+    def test_observe_from_threads(self):
+        metrics = RouteMetrics()
+        threads = [threading.Thread(target=lambda: [metrics.observe("board", 200, 0.01) for _ in range(100)])
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(metrics.snapshot()["routes"]["board"]["count"], 400)
+
+    def test_export(self):
+        metrics = RouteMetrics(buckets=(0.1, 1))
+        metrics.observe("sync_board", 304, 0.05, queries=1, size=0)
+        metrics.observe("sync_board", 200, 0.5, queries=3, size=10)
+        exported = metrics.export()
+        self.assertIn('kanboard_request_duration_seconds_bucket{route="sync_board",le="0.1"} 1', exported)
+        self.assertIn('kanboard_request_duration_seconds_bucket{route="sync_board",le="1"} 2', exported)
+        self.assertIn('kanboard_request_duration_seconds_bucket{route="sync_board",le="+Inf"} 2', exported)
+        self.assertIn('kanboard_request_duration_seconds_count{route="sync_board"} 2', exported)
+        self.assertIn('kanboard_requests_total{route="sync_board",status="304"} 1', exported)
+        self.assertIn('kanboard_db_queries_total{route="sync_board"} 4', exported)
+
+    def test_collect_from_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            metrics = RouteMetrics(directory=directory)
+            metrics.observe("board", 200, 0.01)
+            other = dict(metrics.snapshot(), routes={"board": dict(metrics.snapshot()["routes"]["board"], count=4)})
+            (Path(directory) / "metrics-0.json").write_text(json.dumps(other))
+            self.assertEqual(metrics.collect()["routes"]["board"]["count"], 5)
+
+    def snapshot_file(self, metrics: RouteMetrics, path: Path, count: int):
+        snapshot = metrics.snapshot()
+        routes = {"board": dict(snapshot["routes"]["board"], count=count)}
+        path.write_text(json.dumps(dict(snapshot, routes=routes)))
+
+    def test_exited_processes_are_archived(self):
+        with tempfile.TemporaryDirectory() as directory:
+            template = RouteMetrics()
+            template.observe("board", 200, 0.01)
+            # Process IDs above the largest possible one, which belong to no running process.
+            self.snapshot_file(template, Path(directory) / "metrics-999999999-1.json", 4)
+            self.snapshot_file(template, Path(directory) / "metrics-999999998.json", 2)
+
+            metrics = RouteMetrics(directory=directory)
+            metrics.observe("board", 200, 0.01)
+            self.assertEqual(metrics.collect()["routes"]["board"]["count"], 7)
+            self.assertFalse((Path(directory) / "metrics-999999999-1.json").exists())
+            self.assertFalse((Path(directory) / "metrics-999999998.json").exists())
+            self.assertTrue((Path(directory) / "metrics-archive.json").exists())
+
+    def test_reused_process_id_does_not_overwrite(self):
+        with tempfile.TemporaryDirectory() as directory:
+            metrics = RouteMetrics(directory=directory)
+            metrics.observe("board", 200, 0.01)
+            self.snapshot_file(metrics, Path(directory) / f"metrics-{os.getpid()}-1.json", 4)
+            self.assertEqual(metrics.collect()["routes"]["board"]["count"], 5)
+            self.assertTrue((Path(directory) / f"metrics-{os.getpid()}-1.json").exists())
+
+    def test_exiting_process_is_archived_once(self):
+        with tempfile.TemporaryDirectory() as directory:
+            exiting = RouteMetrics(directory=directory)
+            exiting.observe("board", 200, 0.01)
+            exiting._RouteMetrics___flush_at_exit()
+            self.assertEqual([file.name for file in Path(directory).glob("metrics-*")], ["metrics-archive.json"])
+
+            metrics = RouteMetrics(directory=directory)
+            metrics.observe("board", 200, 0.01)
+            self.assertEqual(metrics.collect()["routes"]["board"]["count"], 2)
+
+            # A file merged into the archive but not removed yet is only counted once.
+            archive = json.loads((Path(directory) / "metrics-archive.json").read_text())
+            self.snapshot_file(metrics, Path(directory) / archive["retired"][0], 1)
+            self.assertEqual(metrics.collect()["routes"]["board"]["count"], 2)
+
+    def test_reset(self):
+        metrics = RouteMetrics()
+        metrics.observe("board", 200, 0.01)
+        metrics.reset()
+        self.assertEqual(metrics.snapshot()["routes"], {})
+
+
+class TestSlowQueryRecorder(unittest.TestCase):
+
+    def test_fingerprint(self):
+        self.assertEqual(fingerprint('SELECT * FROM "core_card" WHERE "id" IN (%s, %s, %s) AND "title" = \'a\''),
+                         'SELECT * FROM "core_card" WHERE "id" IN (...) AND "title" = ?')
+        self.assertEqual(fingerprint("SELECT 1 FROM t2  LIMIT 21"), fingerprint("SELECT 5 FROM t2 LIMIT 3"))
+
+    def test_record(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "slow.jsonl"
+            recorder = SlowQueryRecorder(path, max_params=2, log_params=True)
+            recorder.record('SELECT * FROM "core_card" WHERE "id" IN (%s, %s, %s)', (1, 2, 3), False, 0.25)
+            recorder.close()
+            records = read_records(path)
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["params"], [1, 2, "... 1 more"])
+        self.assertEqual(records[0]["fingerprint"], 'SELECT * FROM "core_card" WHERE "id" IN (...)')
+        self.assertIsNone(records[0]["route"])
+
+    def test_params_are_redacted(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "slow.jsonl"
+            recorder = SlowQueryRecorder(path)
+            recorder.record('UPDATE "authentication_user" SET "password" = %s WHERE "id" = %s', ("secret", 1),
+                            False, 0.25)
+            recorder.record('SELECT 1 WHERE %(email)s', {"email": "user@example.com"}, False, 0.25)
+            recorder.close()
+            records = read_records(path)
+        self.assertEqual([record["params"] for record in records], [["str", "int"], {"email": "str"}])
+
+    def test_read_rotated(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "slow.jsonl"
+            for name, duration in (("slow.jsonl.2", 1), ("slow.jsonl.1", 2), ("slow.jsonl", 3)):
+                (Path(directory) / name).write_text(json.dumps({"duration": duration}) + "\n{broken")
+            self.assertEqual([record["duration"] for record in read_records(path)], [1, 2, 3])
+
+
+class TestApplyPragmas(unittest.TestCase):
+
+    def test_apply(self):
+        with tempfile.TemporaryDirectory() as directory:
+            connection = sqlite3.connect(Path(directory) / "db.sqlite3")
+            try:
+                applied = apply_pragmas(connection, {"journal_mode": "wal", "synchronous": "normal",
+                                                     "cache_size": -16000, "temp_store": "memory",
+                                                     "busy_timeout": 5000})
+            finally:
+                connection.close()
+        self.assertEqual(applied, {"journal_mode": "wal", "synchronous": 1, "cache_size": -16000, "temp_store": 2,
+                                   "busy_timeout": 5000})
+
+    def test_in_memory(self):
+        connection = sqlite3.connect(":memory:")
+        self.assertEqual(apply_pragmas(connection, {"journal_mode": "wal"}), {"journal_mode": "memory"})
+        connection.close()
+
+    def test_invalid(self):
+        connection = sqlite3.connect(":memory:")
+        for pragmas in ({"journal_mode; DROP TABLE core_card": "wal"}, {"journal_mode": "wal; DROP TABLE core_card"}):
+            with self.assertRaises(ImproperlyConfigured):
+                apply_pragmas(connection, pragmas)
+        connection.close()
+
+
+class TestRequestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.profiler = RequestProfiler(self.directory.name)
+        self.handler = RequestHandler(profiler=self.profiler)
+        self.handler.bind("example", "example/", request="GET")(
+            lambda request: JsonResponses.response(JsonResponses.SUCCESS, str(sorted(range(1000)))[:10]))
+        self.dispatch = self.handler.urls()[0].callback
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def request(self, **extra):
+        request = RequestFactory().get("/example/", **extra)
+        request.session = {}
+        return request
+
+    def test_profile_with_token(self):
+        response = self.dispatch(self.request(HTTP_X_KANBOARD_PROFILE=self.profiler.token()))
+        name = response["X-Kanboard-Profile"]
+        files = {file.name for file in Path(self.directory.name).iterdir()}
+        self.assertEqual(files, {f"{name}.pstats", f"{name}.collapsed", f"{name}.json"})
+        self.assertEqual(self.profiler.captures()[0]["route"], "example")
+        stacks = (Path(self.directory.name) / f"{name}.collapsed").read_text().splitlines()
+        self.assertTrue(stacks)
+        self.assertTrue(all(line.rsplit(" ", 1)[1].isdigit() for line in stacks))
+
+    def test_ignore_forged_token(self):
+        response = self.dispatch(self.request(HTTP_X_KANBOARD_PROFILE="forged:token"))
+        self.assertFalse(response.has_header("X-Kanboard-Profile"))
+        self.assertEqual(list(Path(self.directory.name).iterdir()), [])
+
+
+class TestBoardAccessCache(unittest.TestCase):
+
+    def test_get_missing(self):
+        cache = BoardAccessCache()
+        self.assertIsNone(cache.get("user", 1))
+
+    def test_put_and_get(self):
+        cache = BoardAccessCache()
+        cache.put("user", 1, BoardRole.OWNER)
+        self.assertEqual(cache.get("user", 1), BoardRole.OWNER)
+
+    def test_eviction_is_least_recently_used(self):
+        cache = BoardAccessCache(maxsize=2)
+        cache.put("first", 1, BoardRole.OWNER)
+        cache.put("second", 1, BoardRole.GUEST)
+        cache.get("first", 1)
+        cache.put("third", 1, BoardRole.NONE)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("second", 1))
+        self.assertEqual(cache.get("first", 1), BoardRole.OWNER)
+
+    def test_invalidate(self):
+        cache = BoardAccessCache()
+        cache.put("user", 1, BoardRole.GUEST)
+        cache.put("user", 2, BoardRole.GUEST)
+        cache.invalidate("user", 1)
+        self.assertIsNone(cache.get("user", 1))
+        self.assertEqual(cache.get("user", 2), BoardRole.GUEST)
+
+    def test_invalidate_board(self):
+        cache = BoardAccessCache()
+        cache.put("owner", 1, BoardRole.OWNER)
+        cache.put("guest", 1, BoardRole.GUEST)
+        cache.put("guest", 2, BoardRole.GUEST)
+        cache.invalidate_board(1)
+        self.assertIsNone(cache.get("owner", 1))
+        self.assertIsNone(cache.get("guest", 1))
+        self.assertEqual(cache.get("guest", 2), BoardRole.GUEST)
+
+    def test_entries_expire(self):
+        cache = BoardAccessCache(ttl=0)
+        cache.put("user", 1, BoardRole.GUEST)
+        self.assertIsNone(cache.get("user", 1))
+        self.assertEqual(len(cache), 0)
+
+    def test_put_after_invalidation_is_dropped(self):
+        cache = BoardAccessCache()
+        generation = cache.generation()
+        cache.invalidate("user", 1)
+        cache.put("user", 1, BoardRole.GUEST, generation)
+        self.assertIsNone(cache.get("user", 1))
+        cache.put("user", 1, BoardRole.NONE, cache.generation())
+        self.assertEqual(cache.get("user", 1), BoardRole.NONE)
+
+    def test_invalid_size(self):
+        self.assertRaises(ValueError, BoardAccessCache, 0)
+
+
+class TestOrdering(unittest.TestCase):
+
+    def test_key_after(self):
+        self.assertEqual(key_after(None), ORDER_GAP)
+        self.assertEqual(key_after(10), 10 + ORDER_GAP)
+
+    def test_key_between(self):
+        self.assertEqual(key_between(0, 10), 5)
+        self.assertEqual(key_between(None, 10), 10 - ORDER_GAP)
+        self.assertEqual(key_between(10, None), 10 + ORDER_GAP)
+        self.assertIsNone(key_between(10, 11))
+
+    def test_spread(self):
+        self.assertEqual(spread(3), [ORDER_GAP, 2 * ORDER_GAP, 3 * ORDER_GAP])
+
+    def test_plan_ordering_keeps_unmoved_keys(self):
+        self.assertEqual(plan_ordering([10, 20, 30]), [10, 20, 30])
+
+    def test_plan_ordering_moves_one_key(self):
+        planned = plan_ordering([30, 10, 20])
+        self.assertEqual(planned[1:], [10, 20])
+        self.assertLess(planned[0], 10)
+
+    def test_plan_ordering_inserts_new_keys(self):
+        planned = plan_ordering([10, None, None, 40])
+        self.assertEqual(planned[0], 10)
+        self.assertEqual(planned[3], 40)
+        self.assertTrue(10 < planned[1] < planned[2] < 40)
+
+    def test_plan_ordering_rebalances(self):
+        self.assertEqual(plan_ordering([1, None, 2]), spread(3))
+
+    def test_plan_ordering_only_new_keys(self):
+        self.assertEqual(plan_ordering([None, None]), spread(2))
+
+
+class TestBoardEventBroadcaster(unittest.TestCase):
+
+    async def collect(self, broadcaster: BoardEventBroadcaster, board_id: int, count: int, publish) -> list:
+        events = []
+        subscription = broadcaster.subscribe(board_id, keepalive=0.05)
+        events.append(await anext(subscription))  # Registers the subscriber.
+        publish()
+        while len(events) < count + 1:
+            event = await asyncio.wait_for(anext(subscription), 5)
+            if event is not None:
+                events.append(event)
+        await subscription.aclose()
+        return events[1:]
+
+    def test_local_backend(self):
+        broadcaster = BoardEventBroadcaster()
+
+        def publish():
+            broadcaster.publish(2, {'revision': 1})
+            broadcaster.publish(1, {'revision': 2})
+
+        events = asyncio.run(self.collect(broadcaster, 1, 1, publish))
+        self.assertEqual(events, [{'revision': 2}])
+        self.assertEqual(broadcaster.subscribers(1), 0)
+
+    def test_slow_subscriber_drops_oldest(self):
+        broadcaster = BoardEventBroadcaster(queue_size=2)
+
+        def publish():
+            for revision in range(5):
+                broadcaster.publish(1, {'revision': revision})
+
+        events = asyncio.run(self.collect(broadcaster, 1, 2, publish))
+        self.assertEqual(events, [{'revision': 3}, {'revision': 4}])
+
+    def test_sqlite_backend_shares_events(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "events.sqlite3"
+            listener = SQLiteEventBackend(path, poll_interval=0.01)
+            publisher = SQLiteEventBackend(path)
+            broadcaster = BoardEventBroadcaster(listener)
+            try:
+                events = asyncio.run(self.collect(broadcaster, 1, 1, lambda: publisher.publish(1, {'revision': 7})))
+            finally:
+                listener.close()
+            self.assertEqual(events, [{'revision': 7}])
+
+    def test_sqlite_backend_creates_its_file_when_used(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "events.sqlite3"
+            backend = SQLiteEventBackend(path)
+            self.assertFalse(path.exists())
+            backend.publish(1, {'revision': 1})
+            self.assertTrue(path.exists())
+
+    def test_internal_messages_reach_listeners_only(self):
+        broadcaster = BoardEventBroadcaster()
+        messages = []
+        broadcaster.listen(lambda board_id, message: messages.append((board_id, message)))
+
+        def publish():
+            broadcaster.notify(1, {'access': None})
+            broadcaster.publish(1, {'revision': 1})
+
+        events = asyncio.run(self.collect(broadcaster, 1, 1, publish))
+        self.assertEqual(events, [{'revision': 1}])
+        self.assertEqual(messages, [(1, {'access': None})])
+
+    def test_sqlite_backend_shares_internal_messages(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "events.sqlite3"
+            listener = SQLiteEventBackend(path, poll_interval=0.01)
+            received = threading.Event()
+            messages = []
+
+            def listen(board_id, message):
+                messages.append((board_id, message))
+                received.set()
+
+            BoardEventBroadcaster(listener).listen(listen)
+            try:
+                BoardEventBroadcaster(SQLiteEventBackend(path)).notify(1, {'access': "user"})
+                self.assertTrue(received.wait(5))
+            finally:
+                listener.close()
+            self.assertEqual(messages, [(1, {'access': "user"})])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,108 @@
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+from django.template.backends.django import Template
+
+from .metrics import QueryCounter
+
+_TIMINGS: ContextVar = ContextVar("server_timings", default=None)
+
+
+class RequestTimings:
+    """
+    RequestTimings class
+    This class holds the time spent in the templates of a request.
+    """
+
+    __slots__ = ("template", "depth")
+
+    def __init__(self):
+        """
+        Initializes the RequestTimings instance.
+        """
+        self.template = 0.0
+        self.depth = 0
+
+
+class ServerTimingMiddleware:
+    """
+    This middleware adds a Server-Timing header to the responses of the routes bound through RequestHandler,
+    so that the browser developer tools show how the time of a request was split between:
+        - db: the database queries,
+        - tpl: the rendering of the templates,
+        - view: the whole view, including the two above.
+
+    It is enabled by the SERVER_TIMING_ENABLED setting. When the setting is off, Django drops the middleware
+    while loading it, so it costs nothing. It should be the last middleware, so that the view time
+    does not include the other middlewares.
+    """
+
+    def __init__(self, get_response):
+        """
+        Initializes the ServerTimingMiddleware instance.
+
+        :param get_response: Callable - The next middleware or the view.
+        """
+        if not getattr(settings, 'SERVER_TIMING_ENABLED', False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        _install_template_timer()
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        queries = QueryCounter()
+        timings = RequestTimings()
+        token = _TIMINGS.set(timings)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(queries))
+                response = self.get_response(request)
+        finally:
+            _TIMINGS.reset(token)
+
+        start = getattr(request, '_server_timing_start', None)
+        if start is not None:
+            view = time.perf_counter() - start
+            response['Server-Timing'] = ", ".join((
+                f'db;dur={queries.duration * 1000:.2f};desc="{queries.count} queries"',
+                f'tpl;dur={timings.template * 1000:.2f}',
+                f'view;dur={view * 1000:.2f}',
+            ))
+        return response
+
+    def process_view(self, request: HttpRequest, view_func, view_args, view_kwargs):
+        if getattr(view_func, 'route', None) is not None:
+            request._server_timing_start = time.perf_counter()
+        return None
+
+
+def _install_template_timer():
+    """
+    Wraps the rendering of the Django templates, so that the time spent in them is added
+    to the timings of the current request. Only the outermost template of a render is timed,
+    since the included templates are rendered within it.
+    """
+    if getattr(Template.render, 'timed', False):
+        return
+    render = Template.render
+
+    def timed_render(self, context=None, request=None):
+        timings = _TIMINGS.get()
+        if timings is None:
+            return render(self, context, request)
+        timings.depth += 1
+        start = time.perf_counter()
+        try:
+            return render(self, context, request)
+        finally:
+            timings.depth -= 1
+            if timings.depth == 0:
+                timings.template += time.perf_counter() - start
+
+    timed_render.timed = True
+    Template.render = timed_render
@@ -1,5 +1,7 @@
 import re
 
+from django.db.models import Q
+
 
 class ModelsAttributeError(Exception):
     """
@@ -8,6 +10,7 @@ class ModelsAttributeError(Exception):
 
     The exception is raised with a message and a reason.
     The reason is a shadow-type integer that represents the type of error.
+    When several fields are invalid, errors maps each of them to its own message.
     """
     class Reason(int):
         pass
@@ -15,10 +18,11 @@ class ModelsAttributeError(Exception):
     PATTERN = Reason(1)
     EXISTENCE = Reason(2)
 
-    def __init__(self, msg: str = "", reason: Reason = PATTERN):
+    def __init__(self, msg: str = "", reason: Reason = PATTERN, errors: dict = None):
         if not isinstance(reason, self.Reason):
             raise ValueError("Invalid reason type")
         self.___reason: 'Reason' = reason
+        self.errors: dict[str, str] = errors or {}
         super().__init__(msg)
 
     def is_pattern(self) -> bool:
@@ -35,15 +39,230 @@ PATTERN = ModelsAttributeError.PATTERN
 EXISTENCE = ModelsAttributeError.EXISTENCE
 
 
-class UserValidations:
-    def __init__(self, klass = None, **kwargs):
+class Pattern:
+    """
+    Checks that a text value matches a regular expression as a whole.
+    The expression is compiled once, when the rule is declared.
+    """
+
+    __slots__ = ("test", "message")
+
+    def __init__(self, pattern: str, message: str):
+        self.test = re.compile(pattern).fullmatch
+        self.message = message
+
+
+class Range:
+    """
+    Checks that a value is an integer (or the text of an integer) within a range, bounds included.
+    The integers of small ranges and their texts are kept in a set, so that the usual values are not converted.
+    """
+
+    __slots__ = ("minimum", "maximum", "message", "accepted")
+
+    def __init__(self, minimum: int, maximum: int, message: str):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.message = message
+        integers = range(minimum, maximum + 1) if maximum - minimum <= 1024 else ()
+        self.accepted = frozenset(integers) | frozenset(str(integer) for integer in integers)
+
+    def test(self, value) -> bool:
+        if value in self.accepted:
+            return True
+        try:
+            return self.minimum <= int(value) <= self.maximum
+        except ValueError:
+            return False
+
+
+class ContentType:
+    """
+    Checks the content type of an uploaded file.
+    """
+
+    __slots__ = ("content_types", "message")
+
+    def __init__(self, content_types: tuple, message: str):
+        self.content_types = frozenset(content_types)
+        self.message = message
+
+    def test(self, value) -> bool:
+        return getattr(value, 'content_type', None) in self.content_types
+
+
+class MaxSize:
+    """
+    Checks the size of an uploaded file.
+    """
+
+    __slots__ = ("size", "message")
+
+    def __init__(self, size: int, message: str):
+        self.size = size
+        self.message = message
+
+    def test(self, value) -> bool:
+        return getattr(value, 'size', 0) <= self.size
+
+
+class Field:
+    """
+    Field class
+    This class declares the checks of a field, the keys the field can be given with, and whether its value
+    must not be used by another row of the model yet.
+    Every check has a test, returning whether a value is valid, and the message used when it is not.
+    """
+
+    __slots__ = ("name", "keys", "checks", "unique")
+
+    def __init__(self, name: str, *checks, keys: tuple = (), unique: str = None):
+        """
+        Initializes the Field instance.
+
+        :param name: str - The name of the field in the model.
+        :param checks: Pattern or Range or ContentType or MaxSize - The checks of the value, run in order.
+        :param keys: tuple[str] - The keys the value is looked up with, in order, defaults to the name of the field.
+        :param unique: str - The error message used when the value already exists, None if it does not need to be unique.
+        """
+        self.name = name
+        self.keys = keys or (name,)
+        self.checks = checks
+        self.unique = unique
+
+
+IMAGE = (
+    ContentType(("image/jpeg", "image/png", "image/jpg"), "Image must be in the format: jpeg, png or jpg."),
+    MaxSize(3 * 1024 * 1024, "Image size must be less than 3MB."),
+)
+DESCRIPTION = Pattern(r"""[a-zA-Z0-9 '".,;:!?\-_()\n]{0,256}""",
+                      "Description contains invalid characters or exceeds 256 characters. Accepted characters are "
+                      "letters, numbers, spaces, newlines, and the following special characters: '.', ',', ';', ':', "
+                      "'!', '?', '-', '_', '(', ')'.")
+TITLE = Pattern(r"[a-zA-Z0-9 ]{1,20}",
+                "Title must be 20 characters or less and must contain only letters, numbers and spaces.")
+COLOR = Pattern(r"#[0-9A-Fa-f]{6}", "Color must be in the format #RRGGBB (hexadecimal).")
+
+
+class Validations:
+    """
+    This class is the validation engine shared by the *Validations classes.
+
+    Every subclass declares its fields once, in FIELDS, and the declaration is compiled into flat tuples
+    of tests and messages when the subclass is created. A validation runs every field in a single pass
+    and collects all the errors, so the user is told about every invalid field at once.
+    The uniqueness of the fields that require it is only checked when their value is otherwise valid,
+    in one query for all of them.
+
+    Methods:
+        - errors: Gets the errors of every field.
+        - result: Raises a ModelsAttributeError holding every error, if any.
+    """
+
+    FIELDS: tuple[Field] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.___compiled = tuple((field.name, field.keys[0], field.keys[1:],
+                                 tuple((check.test, check.message) for check in field.checks), field.unique)
+                                for field in cls.FIELDS)
+
+    def __init__(self, klass=None, **kwargs):
+        """
+        Initializes the Validations instance.
+
+        :param klass: Model - The model the unique fields are checked against, None to skip these checks.
+        :param kwargs: dict - The values to validate.
+        """
         self.___klass = klass
-        self.___username = kwargs.get('username', None)
-        self.___email = kwargs.get('email', None)
-        self.___password = kwargs.get('password', None)
-        self.___image = kwargs.get('image', None)
-        self.___name = kwargs.get('name', None)
-        self.___surname = kwargs.get('surname', None)
+        self.___values = kwargs
+
+    def errors(self) -> dict[str, tuple[str, 'ModelsAttributeError.Reason']]:
+        """
+        Gets the errors of every field.
+
+        :return: dict - The error message and reason of each invalid field, by field name.
+        """
+        errors, unique_values = {}, {}
+        get = self.___values.get
+        for name, key, other_keys, checks, unique in self.___compiled:
+            # Like `values.get(key) or values.get(other_key)`: an empty value is only validated
+            # when no other key holds a value, and a missing value is skipped.
+            value = get(key)
+            if not value:
+                for other_key in other_keys:
+                    if value := get(other_key):
+                        break
+                if value is None:
+                    continue
+
+            for test, message in checks:
+                try:
+                    valid = test(value)
+                except TypeError:
+                    valid = False
+                if not valid:
+                    errors[name] = (message, PATTERN)
+                    break
+            else:
+                if unique and self.___klass:
+                    unique_values[name] = (value, unique)
+
+        if unique_values:
+            errors.update(self.___existing(unique_values))
+        return errors
+
+    def ___existing(self, unique_values: dict) -> dict[str, tuple[str, 'ModelsAttributeError.Reason']]:
+        """
+        Finds the unique values that are already used, with a single query matching any of them.
+        The unique fields are indexed, and each of them matches one row at most.
+
+        :param unique_values: dict - The value and the error message of each unique field, by field name.
+        :return: dict - The error message and reason of each field whose value is already used.
+        """
+        lookup = Q()
+        for name, (value, _) in unique_values.items():
+            lookup |= Q(**{name: value})
+
+        used = set()
+        for row in self.___klass.objects.filter(lookup).values_list(*unique_values)[:len(unique_values)]:
+            used.update(name for name, found in zip(unique_values, row) if found == unique_values[name][0])
+        return {name: (message, EXISTENCE) for name, (_, message) in unique_values.items() if name in used}
+
+    def result(self):
+        """
+        Validates the values.
+
+        :return: Validations - The instance itself, when every value is valid.
+        :raises ModelsAttributeError: If any value is invalid. The reason is EXISTENCE only when every error is about
+                                      an existing value.
+        """
+        errors = self.errors()
+        if not errors:
+            return self
+        reason = EXISTENCE if all(reason == EXISTENCE for _, reason in errors.values()) else PATTERN
+        raise ModelsAttributeError("\n".join(message for message, _ in errors.values()), reason,
+                                   {name: message for name, (message, _) in errors.items()})
+
+
+class UserValidations(Validations):
+    FIELDS = (
+        Field("name", Pattern(r"[a-zA-Z]{1,32}", "Name must contain only letters.\n"
+                                                 "Name must not exceed 32 characters.")),
+        Field("surname", Pattern(r"[a-zA-Z ]{1,32}", "Surname must contain only letters.\n"
+                                                     "Surname must not exceed 32 characters.")),
+        Field("username", Pattern(r"[a-zA-Z0-9_]{1,32}", "Username must contain only letters, numbers and underscores.\n"
+                                                         "Username must not exceed 32 characters."),
+              unique="Username already exists"),
+        Field("email", Pattern(r"[a-zA-Z0-9_.]+@[a-zA-Z0-9.]+\.[a-zA-Z0-9]+",
+                               "Email must be in the format: youremail@example.com"),
+              unique="Email already exists"),
+        Field("password", Pattern(r"[a-zA-Z0-9_%$&@!?]{8,32}",
+                                  "Password must contain only letters, numbers and/or special characters: "
+                                  "'_', '!', '@', '$', '%', '&', '?'.\n"
+                                  "Password must be at least 8 characters long and must not exceed 32 characters.")),
+        Field("image", *IMAGE),
+    )
 
     def generate_uuid(self) -> str:
         """
@@ -54,172 +273,27 @@ class UserValidations:
         import uuid
         return uuid.uuid4().hex
 
-    def result(self) -> 'UserValidations':
-        self.___validate_name()
-        self.___validate_surname()
-        self.___validate_username()
-        self.___validate_email()
-        self.___validate_password()
-        self.___validate_image()
-        return self
-
-    def ___validate_username(self):
-        if self.___username is None:
-            return
-        if re.match(r'^[a-zA-Z0-9_]{1,32}$', self.___username) is None:
-            raise ModelsAttributeError("Username must contain only letters, numbers and underscores.\n"
-                                       "Username must not exceed 32 characters.")
-        if self.___klass and self.___klass.objects.filter(username=self.___username).exists():
-            raise ModelsAttributeError("Username already exists", EXISTENCE)
-
-    def ___validate_email(self):
-        if self.___email is None:
-            return
-        if re.match(r'^[a-zA-Z0-9_.]+@[a-zA-Z0-9.]+\.[a-zA-Z0-9]+$', self.___email) is None:
-            raise ModelsAttributeError("Email must be in the format: youremail@example.com")
-        if self.___klass and self.___klass.objects.filter(email=self.___email).exists():
-            raise ModelsAttributeError("Email already exists", EXISTENCE)
-
-    def ___validate_password(self):
-        if self.___password is None:
-            return
-        if re.match(r'^[a-zA-Z0-9_%$&@!?]{8,32}$', self.___password) is None:
-            raise ModelsAttributeError("Password must contain only letters, numbers and/or special characters: '_', '!', '@', '$', '%', '&', '?'.\n"
-                                       "Password must be at least 8 characters long and must not exceed 32 characters.")
-
-    def ___validate_image(self):
-        if self.___image is None:
-            return
-        if not re.match(r'^image/(jpeg|png|jpg)$', self.___image.content_type):
-            raise ModelsAttributeError("Image must be in the format: jpeg, png or jpg")
-        if self.___image.size > 3*1024*1024:
-            raise ModelsAttributeError("Image size must be less than 3MB")
-
-    def ___validate_name(self):
-        if self.___name is None:
-            return
-        if re.match(r'^[a-zA-Z]{1,32}$', self.___name) is None:
-            raise ModelsAttributeError("Name must contain only letters.\n"
-                                       "Name must not exceed 32 characters.")
-
-    def ___validate_surname(self):
-        if self.___surname is None:
-            return
-        if re.match(r'^[a-zA-Z ]{1,32}$', self.___surname) is None:
-            raise ModelsAttributeError("Surname must contain only letters.\n"
-                                       "Surname must not exceed 32 characters.")
-
-
-class BoardValidations:
-    def __init__(self, **kwargs):
-        self.___title = kwargs.get('board_title', None)
-        self.___description = kwargs.get('board_description', None)
-        self.___image = kwargs.get('image', None)
 
-    def result(self):
-        self.___validate_title()
-        self.___validate_description()
-        self.___validate_image()
-
-    def ___validate_title(self):
-        if self.___title is None:
-            return
-        if not re.match(r'^[a-zA-Z0-9 ]{1,20}$', self.___title):
-            raise ModelsAttributeError(
-                "Title must be 16 characters or less and must contain only letters, numbers, and the special "
-                "character: '_'.")
-
-    def ___validate_description(self):
-        if self.___description is None:
-            return
-        if re.match(r"""^[a-zA-Z0-9 '".,;:!?-_()\n]{0,256}$""", self.___description) is None:
-            raise ModelsAttributeError(
-                "Description contains invalid characters or exceeds 256 characters. Accepted characters are "
-                "letters, numbers, spaces, newlines, and the following special characters: '.', ',', ';', ':', '!', "
-                "'?', '-', '', '(', ')'.")
-
-    def ___validate_image(self):
-        if self.___image is None:
-            return
-        if self.___image.size > 3 * 1024 * 1024:
-            raise ModelsAttributeError("Image size must be less than 3MB.")
-        if not re.match(r'^image/(jpeg|png|jpg)$', self.___image.content_type):
-            raise ModelsAttributeError("Image must be in the format: jpeg, png or jpg.")
-
-
-class ColumnValidations:
-    def __init__(self, **kwargs):
-        self.___title = kwargs.get('column_title', None) or kwargs.get('title', None)
-        self.___description = kwargs.get('column_description', None) or kwargs.get('description', None)
-        self.___color = kwargs.get('color', None)
+class BoardValidations(Validations):
+    FIELDS = (
+        Field("title", TITLE, keys=("board_title", "title")),
+        Field("description", DESCRIPTION, keys=("board_description", "description")),
+        Field("image", *IMAGE),
+    )
 
-    def result(self):
-        self.___validate_title()
-        self.___validate_description()
-        self.___validate_color()
-
-    def ___validate_title(self):
-        if self.___title is None:
-            return
-        if not re.match(r'^[a-zA-Z0-9 ]{1,20}$', self.___title):
-            raise ModelsAttributeError(
-                "Title must be 20 characters or less and must contain only letters, numbers, and the special "
-                "character: ''.")
-
-    def ___validate_description(self):
-        if self.___description is None:
-            return
-        if re.match(r"""^[a-zA-Z0-9 '".,;:!?-_()\n]{0,256}$""", self.___description) is None:
-            raise ModelsAttributeError(
-                "Description contains invalid characters or exceeds 256 characters. Accepted characters are "
-                "letters, numbers, spaces, newlines, and the following special characters: '.', ',', ';', ':', '!', "
-                "'?', '-', '', '(', ')'.")
-
-    def ___validate_color(self):
-        if self.___color is None:
-            return
-        if not re.match(r'^#[0-9A-Fa-f]{6}$', self.___color):
-            raise ModelsAttributeError("Color must be in the format #RRGGBB (hexadecimal).")
-
-
-class CardValidations:
-    def __init__(self, **kwargs):
-        self.___title = kwargs.get('card_title', None) or kwargs.get('title', None)
-        self.___description = kwargs.get('card_description', None) or kwargs.get('description', None)
-        self.___story_points = kwargs.get('story_points', None)
-        self.___color = kwargs.get('color', None)
 
-    def result(self):
-        self.___validate_title()
-        self.___validate_description()
-        self.___validate_color()
-
-    def ___validate_title(self):
-        if self.___title is None:
-            return
-        if not re.match(r'^[a-zA-Z0-9 ]{1,20}$', self.___title):
-            raise ModelsAttributeError(
-                "Title must be 20 characters or less and must contain only letters, numbers, and the special "
-                "character: ''.")
-
-    def ___validate_description(self):
-        if self.___description is None:
-            return
-        if re.match(r"""^[a-zA-Z0-9 '".,;:!?\-_()\n]{0,256}$""", self.___description) is None:
-            raise ModelsAttributeError(
-                "Description contains invalid characters or exceeds 256 characters. Accepted characters are "
-                "letters, numbers, spaces, newlines, and the following special characters: '.', ',', ';', ':', '!', "
-                "'?', '-', '', '(', ')'.")
-
-    def ___validate_color(self):
-        if self.___color is None:
-            return
-        if not re.match(r'^#[0-9A-Fa-f]{6}$', self.___color):
-            raise ModelsAttributeError("Color must be in the format #RRGGBB (hexadecimal).")
-
-    def ___validate_story_points(self):
-        if self.___story_points is None:
-            return
-        if self.___story_points < 0 or self.___story_points > 16:
-            raise ModelsAttributeError("Story points must be a number between 0 and 999.")
+class ColumnValidations(Validations):
+    FIELDS = (
+        Field("title", TITLE, keys=("column_title", "title")),
+        Field("description", DESCRIPTION, keys=("column_description", "description")),
+        Field("color", COLOR, keys=("column_color", "color")),
+    )
+
 
+class CardValidations(Validations):
+    FIELDS = (
+        Field("title", TITLE, keys=("card_title", "title")),
+        Field("description", DESCRIPTION, keys=("card_description", "description")),
+        Field("color", COLOR),
+        Field("story_points", Range(0, 16, "Story points must be a number between 0 and 16.")),
+    )
@@ -0,0 +1,136 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import Future
+from queue import Empty, SimpleQueue
+from typing import Callable, TypeVar
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+T = TypeVar("T")
+
+
+class WriteQueue:
+    """
+    This class funnels the write operations of a process through a single writer thread.
+
+    SQLite lets a single connection write at a time, so the requests writing at the same time only queue up
+    for the write lock, and time out when the queue is too long. The writer thread takes that queue in-process
+    instead: it runs the pending operations one after the other in a single transaction (group commit),
+    so a single fsync and a single lock acquisition are paid for the whole batch.
+
+    The operations are submitted with the alias of the database they write to (the shard of their board), and
+    the operations of a batch are committed in one transaction per database, opened on that database.
+    Every operation runs in its own savepoint, so an operation that raises is rolled back alone and its exception
+    is raised to its caller, while the others of the batch are committed. Callers are only resolved once their
+    transaction is committed, and the transaction.on_commit callbacks of the operations run after that commit.
+
+    Methods:
+        - submit: Runs an operation in the writer thread and waits for its result.
+        - close: Stops the writer thread once the pending operations are done.
+    """
+
+    def __init__(self, max_batch: int = 64, max_delay: float = 0.002, using: str = DEFAULT_DB_ALIAS):
+        """
+        Initializes the WriteQueue instance. The writer thread is started by the first submitted operation.
+
+        :param max_batch: int - The maximum number of operations committed together.
+        :param max_delay: float - The number of seconds the writer waits for more operations before committing.
+        :param using: str - The alias of the database written by the operations submitted without one.
+        """
+        self.___max_batch = max_batch
+        self.___max_delay = max_delay
+        self.___using = using
+        self.___queue: SimpleQueue = SimpleQueue()
+        self.___thread: threading.Thread or None = None
+        self.___lock = threading.Lock()
+        self.batches = 0
+
+    def submit(self, operation: Callable[[], T], using: str = None) -> T:
+        """
+        Runs an operation in the writer thread and waits until the batch it belongs to is committed.
+        Operations submitted from the writer thread itself, i.e. by another operation, run right away.
+        The operation runs in a copy of the context of the caller, so that it sees the route and the shard
+        of the request it was submitted by.
+
+        :param operation: Callable - The operation, called without arguments.
+        :param using: str - The alias of the database written by the operation, None for the one of the queue.
+        :return: The value returned by the operation.
+        :raises Exception: The exception raised by the operation, or by the commit of its batch.
+        """
+        if threading.current_thread() is self.___thread:
+            return operation()
+        future = Future()
+        self.___start()
+        self.___queue.put((operation, future, contextvars.copy_context(), using or self.___using))
+        return future.result()
+
+    def close(self):
+        """
+        Stops the writer thread once the pending operations are done.
+        """
+        with self.___lock:
+            thread, self.___thread = self.___thread, None
+        if thread is not None:
+            self.___queue.put(None)
+            thread.join()
+
+    def ___start(self):
+        with self.___lock:
+            if self.___thread is None:
+                self.___thread = threading.Thread(target=self.___run, name="kanboard-writer", daemon=True)
+                self.___thread.start()
+
+    def ___run(self):
+        try:
+            while (batch := self.___next_batch()) is not None:
+                self.___commit(batch)
+        finally:
+            connections.close_all()
+
+    def ___next_batch(self) -> list or None:
+        first = self.___queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.___max_delay
+        while len(batch) < self.___max_batch:
+            try:
+                item = self.___queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except Empty:
+                break
+            if item is None:
+                self.___queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def ___commit(self, batch: list):
+        databases = {}
+        for item in batch:
+            databases.setdefault(item[3], []).append(item)
+        for using, operations in databases.items():
+            self.___commit_on(using, operations)
+
+    def ___commit_on(self, using: str, batch: list):
+        results = []
+        try:
+            with transaction.atomic(using=using):
+                for operation, _, context, _ in batch:
+                    try:
+                        with transaction.atomic(using=using):
+                            results.append((context.run(operation), None))
+                    except Exception as e:
+                        results.append((None, e))
+        except Exception as e:
+            for _, future, _, _ in batch:
+                future.set_exception(e)
+            return
+        finally:
+            self.batches += 1
+
+        for (_, future, _, _), (result, error) in zip(batch, results):
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
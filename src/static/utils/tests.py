@@ -0,0 +1,1111 @@
+import asyncio
+import json
+import threading
+import tempfile
+from io import StringIO
+from pathlib import Path
+from datetime import timedelta
+from unittest.mock import patch
+from importlib import import_module
+from uuid import uuid4, UUID
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.signals import request_started
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.db.models import Count, Q
+from django.test import TestCase, TransactionTestCase, Client, AsyncClient, RequestFactory, override_settings
+from django.utils import timezone
+
+from django.contrib.sessions.models import Session
+
+from authentication.models import User
+from core.models import Board, Column, Card, Assignee, Guest, BoardShard
+from core.views import board, board_async, burndown_view, burndown_view_async, dashboard, dashboard_async, sync_board, \
+    sync_board_async
+from static.services import BoardRole, ModelsAttributeError, UserValidations, SlowQueryRecorder, RequestProfiler, JsonResponses, \
+    RequestHandler, AllocationProfiler, SessionRouter, WriteQueue, ShardDirectory, RouteMetrics
+from static.services.sessions import sweep_expired_sessions
+from static.utils.utils import get_board_snapshot, get_board_statistics, get_accessible_boards, get_board_role, \
+    get_expired_cards_of_board, insert_board, list_accessible_boards, BOARD_ACCESS, apply_board_ordering, \
+    get_next_index, move_card, bump_board_revision, BOARD_EVENTS, render_board_elements, ROUTE_METRICS, \
+    get_user_by_login, aget_board_snapshot, forget_board_roles
+
+
+def create_user(username: str) -> User:
+    return User.objects.create(
+        uuid=uuid4().hex,
+        username=username,
+        email=f"{username}@example.com",
+        password="password",
+        name="Name",
+        surname="Surname",
+        last_login=timezone.now(),
+        date_joined=timezone.now()
+    )
+
+
+def create_board(owner: User, name: str = "Board") -> Board:
+    return Board.objects.create(owner=owner, name=name, creation_date=timezone.now())
+
+
+def populate_board(board: Board, users: list, columns: int, cards_per_column: int) -> None:
+    for column_index in range(columns):
+        column = Column.objects.create(board_id=board, title=f"Column {column_index}", description="",
+                                       index=column_index)
+        for card_index in range(cards_per_column):
+            card = Card.objects.create(board_id=board, column_id=column, title=f"Card {card_index}",
+                                       description="", creation_date=timezone.now(), index=card_index)
+            for user in users:
+                Assignee.objects.create(board_id=board, card_id=card, user_id=user)
+
+
+class TestGetBoardSnapshot(TestCase):
+
+    def setUp(self):
+        self.owner = create_user("owner")
+        self.users = [self.owner, create_user("guest")]
+
+    def test_snapshot_query_count_is_constant(self):
+        for size in (1, 5, 20):
+            board = create_board(self.owner)
+            populate_board(board, self.users, columns=size, cards_per_column=size)
+            with self.assertNumQueries(3):
+                columns = get_board_snapshot(Column, Card, Assignee, board.id)
+            self.assertEqual(len(columns), size)
+            self.assertEqual(sum(column.card_count for column in columns), size * size)
+
+    def test_snapshot_view_models_are_slotted(self):
+        board = create_board(self.owner)
+        populate_board(board, self.users, columns=1, cards_per_column=1)
+        column = get_board_snapshot(Column, Card, Assignee, board.id)[0]
+        for view_model in (column, column.cards[0], column.cards[0].assignees[0]):
+            self.assertFalse(hasattr(view_model, '__dict__'))
+
+    def test_snapshot_empty_board(self):
+        board = create_board(self.owner)
+        with self.assertNumQueries(3):
+            self.assertEqual(get_board_snapshot(Column, Card, Assignee, board.id), [])
+
+    def test_snapshot_ordering_and_grouping(self):
+        board = create_board(self.owner)
+        second = Column.objects.create(board_id=board, title="Second", description="", index=1)
+        first = Column.objects.create(board_id=board, title="First", description="", index=0)
+        Card.objects.create(board_id=board, column_id=first, title="B", description="",
+                            creation_date=timezone.now(), index=1)
+        card = Card.objects.create(board_id=board, column_id=first, title="A", description="",
+                                   creation_date=timezone.now(), index=0)
+        Assignee.objects.create(board_id=board, card_id=card, user_id=self.owner)
+
+        columns = get_board_snapshot(Column, Card, Assignee, board.id)
+
+        self.assertEqual([column.id for column in columns], [first.id, second.id])
+        self.assertEqual([card.title for card in columns[0].cards], ["A", "B"])
+        self.assertEqual([assignee.username for assignee in columns[0].cards[0].assignees], ["owner"])
+        self.assertEqual(columns[1].cards, [])
+
+    def test_snapshot_ignores_other_boards(self):
+        board = create_board(self.owner)
+        other = create_board(self.owner, "Other")
+        populate_board(other, self.users, columns=2, cards_per_column=2)
+        self.assertEqual(get_board_snapshot(Column, Card, Assignee, board.id), [])
+
+    def test_snapshot_expiration(self):
+        board = create_board(self.owner)
+        column = Column.objects.create(board_id=board, title="Column", description="", index=0)
+        Card.objects.create(board_id=board, column_id=column, title="Expired", description="",
+                            creation_date=timezone.now(), index=0,
+                            expiration_date=timezone.now() - timedelta(days=1))
+        Card.objects.create(board_id=board, column_id=column, title="Completed", description="",
+                            creation_date=timezone.now(), index=1,
+                            expiration_date=timezone.now() - timedelta(days=1),
+                            completion_date=timezone.now())
+
+        cards = get_board_snapshot(Column, Card, Assignee, board.id)[0].cards
+
+        self.assertTrue(cards[0].is_expired)
+        self.assertFalse(cards[1].is_expired)
+
+
+class TestGetBoardStatistics(TestCase):
+
+    def setUp(self):
+        self.owner = create_user("owner")
+        self.board = create_board(self.owner)
+
+    def test_statistics_query_count_is_constant(self):
+        populate_board(self.board, [], columns=10, cards_per_column=5)
+        with self.assertNumQueries(1):
+            columns, totals = get_board_statistics(Column, self.board.id)
+        self.assertEqual(len(columns), 10)
+        self.assertEqual(totals['total_cards'], 50)
+
+    def test_statistics_counts(self):
+        now = timezone.now()
+        column = Column.objects.create(board_id=self.board, title="Column", description="", index=0)
+        Column.objects.create(board_id=self.board, title="Empty", description="", index=1)
+        values = {'board_id': self.board, 'column_id': column, 'description': "", 'creation_date': now, 'index': 0}
+        Card.objects.create(title="Open", story_points=3, **values)
+        Card.objects.create(title="Active", expiration_date=now + timedelta(days=1), story_points=2, **values)
+        Card.objects.create(title="Expired", expiration_date=now - timedelta(days=1), **values)
+        Card.objects.create(title="Done", expiration_date=now - timedelta(days=1), completion_date=now, **values)
+
+        columns, totals = get_board_statistics(Column, self.board.id, now)
+
+        self.assertEqual([c.name for c in columns], ["Column", "Empty"])
+        self.assertEqual((columns[0].active_cards, columns[0].expired_cards, columns[0].completed_cards,
+                          columns[0].total_cards, columns[0].story_points), (2, 1, 1, 4, 5))
+        self.assertEqual((columns[1].total_cards, columns[1].story_points), (0, 0))
+        self.assertEqual(totals, {
+            'total_active_cards': 2,
+            'total_expired_cards': 1,
+            'total_completed_cards': 1,
+            'total_cards': 4,
+            'total_story_points': 5,
+        })
+
+
+class TestGetAccessibleBoards(TestCase):
+
+    def setUp(self):
+        self.user = create_user("user")
+        self.other = create_user("other")
+        self.owned = create_board(self.user, "Owned")
+        self.guested = create_board(self.other, "Guested")
+        self.foreign = create_board(self.other, "Foreign")
+        Guest.objects.create(user_id=self.user, board_id=self.guested)
+        Guest.objects.create(user_id=self.other, board_id=self.owned)
+
+    def test_accessible_boards_single_query(self):
+        with self.assertNumQueries(1):
+            boards = list(get_accessible_boards(Board, Guest, self.user.uuid))
+        self.assertEqual(boards, [self.owned, self.guested])
+
+    def test_accessible_boards_keyset_pagination(self):
+        extra = create_board(self.user, "Extra")
+        first_page = list(get_accessible_boards(Board, Guest, self.user.uuid, limit=2))
+        second_page = list(get_accessible_boards(Board, Guest, self.user.uuid, after=first_page[-1].id, limit=2))
+        self.assertEqual(first_page, [self.owned, self.guested])
+        self.assertEqual(second_page, [extra])
+
+
+class TestGetBoardRole(TestCase):
+
+    def setUp(self):
+        BOARD_ACCESS.clear()
+        self.owner = create_user("owner")
+        self.guest = create_user("guest")
+        self.stranger = create_user("stranger")
+        self.board = create_board(self.owner)
+        Guest.objects.create(user_id=self.guest, board_id=self.board)
+
+    def test_roles(self):
+        self.assertEqual(get_board_role(Board, Guest, self.board.id, self.owner.uuid), BoardRole.OWNER)
+        self.assertEqual(get_board_role(Board, Guest, self.board.id, self.guest.uuid), BoardRole.GUEST)
+        self.assertEqual(get_board_role(Board, Guest, self.board.id, self.stranger.uuid), BoardRole.NONE)
+        self.assertEqual(get_board_role(Board, Guest, self.board.id + 1, self.owner.uuid), BoardRole.NONE)
+        self.assertEqual(get_board_role(Board, Guest, self.board.id, None), BoardRole.NONE)
+
+    def test_role_is_cached(self):
+        with self.assertNumQueries(1):
+            get_board_role(Board, Guest, self.board.id, self.guest.uuid)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_board_role(Board, Guest, self.board.id, str(UUID(self.guest.uuid))), BoardRole.GUEST)
+
+    def test_guest_signals_invalidate(self):
+        self.assertEqual(get_board_role(Board, Guest, self.board.id, self.stranger.uuid), BoardRole.NONE)
+        Guest.objects.create(user_id=self.stranger, board_id=self.board)
+        self.assertEqual(get_board_role(Board, Guest, self.board.id, self.stranger.uuid), BoardRole.GUEST)
+        Guest.objects.filter(user_id=self.stranger, board_id=self.board).delete()
+        self.assertEqual(get_board_role(Board, Guest, self.board.id, self.stranger.uuid), BoardRole.NONE)
+
+    def test_board_signals_invalidate(self):
+        self.assertEqual(get_board_role(Board, Guest, self.board.id, self.guest.uuid), BoardRole.GUEST)
+        self.board.owner = self.guest
+        self.board.save()
+        self.assertEqual(get_board_role(Board, Guest, self.board.id, self.guest.uuid), BoardRole.OWNER)
+        self.board.delete()
+        self.assertEqual(get_board_role(Board, Guest, self.board.id, self.guest.uuid), BoardRole.NONE)
+
+    def test_role_read_during_invalidation_is_not_cached(self):
+        from static.utils.utils import _board_role as resolve
+
+        def invalidated(row, uuid):
+            BOARD_ACCESS.invalidate(uuid, self.board.id)
+            return resolve(row, uuid)
+
+        with patch('static.utils.utils._board_role', invalidated):
+            get_board_role(Board, Guest, self.board.id, self.guest.uuid)
+        with self.assertNumQueries(1):
+            get_board_role(Board, Guest, self.board.id, self.guest.uuid)
+
+    def test_role_read_on_replica_is_not_cached(self):
+        with patch('static.utils.utils.ReadReplicas.current', return_value='replica'):
+            get_board_role(Board, Guest, self.board.id, self.guest.uuid)
+        with self.assertNumQueries(1):
+            get_board_role(Board, Guest, self.board.id, self.guest.uuid)
+
+    def test_roles_are_listened_to_from_the_first_request(self):
+        from core.signals import listen_board_roles
+
+        request_started.connect(listen_board_roles)
+        with patch('core.signals.BOARD_EVENTS') as events:
+            request_started.send(sender=None)
+            request_started.send(sender=None)
+        events.listen.assert_called_once_with(forget_board_roles)
+
+    def test_invalidation_is_shared_on_commit(self):
+        with patch('static.utils.utils.BOARD_EVENTS') as events:
+            with self.captureOnCommitCallbacks(execute=True):
+                Guest.objects.filter(user_id=self.guest, board_id=self.board).delete()
+                events.notify.assert_not_called()
+        events.notify.assert_called_once_with(self.board.id, {'access': UUID(self.guest.uuid).hex})
+
+
+class TestApplyBoardOrdering(TestCase):
+
+    def setUp(self):
+        self.owner = create_user("owner")
+        self.board = create_board(self.owner)
+        populate_board(self.board, [], columns=3, cards_per_column=3)
+
+    def payload(self) -> list:
+        return [{'id': column.id, 'index': column_index,
+                 'cards': [{'id': card.id, 'index': card_index}
+                           for card_index, card in enumerate(column.card_set.order_by('index', 'id'))]}
+                for column_index, column in enumerate(Column.objects.filter(board_id=self.board).order_by('index', 'id'))]
+
+    def test_unchanged_payload_writes_nothing(self):
+        payload = self.payload()
+        with self.assertNumQueries(2 + 2):  # Two reads plus the savepoint of the atomic block.
+            self.assertEqual(apply_board_ordering(Column, Card, self.board.id, payload), 0)
+
+    def test_moved_card_writes_only_changed_rows(self):
+        payload = self.payload()
+        moved = payload[0]['cards'].pop(0)
+        payload[1]['cards'].insert(0, moved)
+        for column in payload[:2]:
+            for index, card in enumerate(column['cards']):
+                card['index'] = index
+
+        with self.assertNumQueries(2 + 1 + 3 + 2):  # Two reads, one bulk update, the revision bump and the savepoint.
+            changed = apply_board_ordering(Column, Card, self.board.id, payload)
+
+        self.assertEqual(changed, 1)
+        self.assertEqual(self.payload(), payload)
+
+    def test_swapped_columns(self):
+        payload = self.payload()
+        payload[0]['index'], payload[1]['index'] = 1, 0
+        self.assertEqual(apply_board_ordering(Column, Card, self.board.id, payload), 1)
+        self.assertEqual([column['id'] for column in self.payload()],
+                         [payload[1]['id'], payload[0]['id'], payload[2]['id']])
+
+    def test_reversed_cards_without_room_are_rebalanced(self):
+        payload = self.payload()
+        payload[0]['cards'].reverse()
+        for index, card in enumerate(payload[0]['cards']):
+            card['index'] = index
+        apply_board_ordering(Column, Card, self.board.id, payload)
+        self.assertEqual([card['id'] for card in self.payload()[0]['cards']],
+                         [card['id'] for card in payload[0]['cards']])
+
+    def test_foreign_elements_are_rejected(self):
+        other = create_board(self.owner, "Other")
+        populate_board(other, [], columns=1, cards_per_column=1)
+        foreign_card = Card.objects.get(board_id=other)
+        payload = self.payload()
+        payload[0]['index'] = 5
+        payload[0]['cards'].append({'id': foreign_card.id, 'index': 3})
+
+        self.assertRaises(ModelsAttributeError, apply_board_ordering, Column, Card, self.board.id, payload)
+        self.assertEqual(Column.objects.get(id=payload[0]['id']).index, 0)
+
+    def test_malformed_payload(self):
+        self.assertRaises(ModelsAttributeError, apply_board_ordering, Column, Card, self.board.id, [{'id': 1}])
+        self.assertRaises(ModelsAttributeError, apply_board_ordering, Column, Card, self.board.id, {'id': 1})
+
+
+class TestMoveCard(TestCase):
+
+    def setUp(self):
+        self.owner = create_user("owner")
+        self.board = create_board(self.owner)
+        self.first = Column.objects.create(board_id=self.board, title="First", description="",
+                                           index=get_next_index(Column, board_id=self.board))
+        self.second = Column.objects.create(board_id=self.board, title="Second", description="",
+                                            index=get_next_index(Column, board_id=self.board))
+        self.cards = [self.create_card(self.first, title) for title in ("A", "B", "C")]
+
+    def create_card(self, column: Column, title: str) -> Card:
+        return Card.objects.create(board_id=self.board, column_id=column, title=title, description="",
+                                   creation_date=timezone.now(),
+                                   index=get_next_index(Card, board_id=self.board, column_id=column))
+
+    def titles(self, column: Column) -> list:
+        return list(Card.objects.filter(column_id=column).order_by('index', 'id').values_list('title', flat=True))
+
+    def test_inserts_read_the_last_key_when_they_run(self):
+        client = Client()
+        session = client.session
+        session['uuid'] = self.owner.uuid
+        session.save()
+        operations = []
+
+        # Both cards are submitted before either is written, as when they wait in the same write queue batch.
+        with patch('core.views.submit_write', operations.append):
+            for title in ("D", "E"):
+                client.post(f"/board/{self.board.id}/new/card/", {
+                    "card_title": title, "card_description": "Description", "color": "#FFFFFF",
+                    "column": self.first.id, "story_points": 1})
+            client.post(f"/board/{self.board.id}/new/column/", {
+                "column_title": "Third", "column_description": "Description", "color": "#FFFFFF"})
+            client.post(f"/board/{self.board.id}/new/column/", {
+                "column_title": "Fourth", "column_description": "Description", "color": "#FFFFFF"})
+        self.assertEqual(len(operations), 4)
+        with transaction.atomic():
+            for operation in operations:
+                operation()
+
+        self.assertEqual(self.titles(self.first), ["A", "B", "C", "D", "E"])
+        self.assertEqual(len(set(Card.objects.filter(column_id=self.first).values_list('index', flat=True))), 5)
+        self.assertEqual(len(set(Column.objects.filter(board_id=self.board).values_list('index', flat=True))), 4)
+
+    def test_queued_edit_keeps_an_earlier_move(self):
+        client = Client()
+        session = client.session
+        session['uuid'] = self.owner.uuid
+        session.save()
+        operations = []
+
+        # The edit is queued with the card as it was before the move that runs first in its batch.
+        with patch('core.views.submit_write', operations.append):
+            client.post(f"/board/{self.board.id}/card/{self.cards[0].id}/update/", {"card_title": "Edited"})
+        move_card(Card, self.board.id, self.cards[0].id, self.second.id)
+        moved = Card.objects.get(id=self.cards[0].id)
+        operations[0]()
+
+        card = Card.objects.get(id=self.cards[0].id)
+        self.assertEqual(card.title, "Edited")
+        self.assertEqual((card.column_id_id, card.index), (self.second.id, moved.index))
+        self.assertEqual(self.titles(self.second), ["Edited"])
+
+    def test_next_index_is_sparse(self):
+        self.assertEqual([card.index for card in self.cards], [1024, 2048, 3072])
+        self.assertEqual(self.second.index - self.first.index, 1024)
+
+    def test_move_before_writes_one_row(self):
+        with self.assertNumQueries(3 + 1 + 3 + 2):  # Three reads, one update, the revision bump and the savepoint.
+            move_card(Card, self.board.id, self.cards[2].id, self.first.id, self.cards[0].id)
+        self.assertEqual(self.titles(self.first), ["C", "A", "B"])
+
+    def test_move_to_other_column(self):
+        move_card(Card, self.board.id, self.cards[0].id, self.second.id)
+        move_card(Card, self.board.id, self.cards[1].id, self.second.id, self.cards[0].id)
+        self.assertEqual(self.titles(self.first), ["C"])
+        self.assertEqual(self.titles(self.second), ["B", "A"])
+
+    def test_move_rebalances_when_gaps_run_out(self):
+        for _ in range(12):
+            move_card(Card, self.board.id, self.cards[2].id, self.first.id, self.cards[1].id)
+            move_card(Card, self.board.id, self.cards[1].id, self.first.id, self.cards[2].id)
+        self.assertEqual(self.titles(self.first), ["A", "B", "C"])
+
+    def test_move_before_card_of_other_column(self):
+        self.assertRaises(ModelsAttributeError, move_card, Card, self.board.id, self.cards[0].id,
+                          self.second.id, self.cards[1].id)
+
+    def test_remove_does_not_renumber(self):
+        self.cards[1].delete()
+        self.assertEqual(list(Card.objects.filter(column_id=self.first).values_list('index', flat=True)),
+                         [1024, 3072])
+
+
+class TestBoardRevision(TestCase):
+
+    def setUp(self):
+        BOARD_ACCESS.clear()
+        caches['fragments'].clear()
+        self.owner = create_user("owner")
+        self.board = create_board(self.owner)
+        populate_board(self.board, [self.owner], columns=3, cards_per_column=2)
+        self.columns = list(Column.objects.filter(board_id=self.board).order_by('index'))
+        self.client = Client()
+        session = self.client.session
+        session['uuid'] = self.owner.uuid
+        session.save()
+        self.path = f"/board/{self.board.id}/update/sync/"
+
+    def test_bump_stamps_columns(self):
+        revision = bump_board_revision(Board, Column, self.board.id, [self.columns[1].id])
+        self.assertEqual(revision, 1)
+        self.assertEqual([column.revision for column in Column.objects.filter(board_id=self.board).order_by('index')],
+                         [0, 1, 0])
+
+    def test_bump_publishes_event_on_commit(self):
+        loop = asyncio.new_event_loop()
+        subscription = BOARD_EVENTS.subscribe(self.board.id, keepalive=0.01)
+        try:
+            loop.run_until_complete(anext(subscription))  # Registers the subscriber.
+            with self.captureOnCommitCallbacks(execute=True):
+                bump_board_revision(Board, Column, self.board.id, [self.columns[0].id])
+            event = loop.run_until_complete(anext(subscription))
+            loop.run_until_complete(subscription.aclose())
+        finally:
+            loop.close()
+
+        self.assertEqual(event, {'board': self.board.id, 'revision': 1, 'columns': [self.columns[0].id]})
+
+    def test_snapshot_since(self):
+        bump_board_revision(Board, Column, self.board.id, [self.columns[2].id])
+        columns = get_board_snapshot(Column, Card, Assignee, self.board.id, since=0)
+        self.assertEqual([column.id for column in columns], [self.columns[2].id])
+        self.assertEqual(columns[0].card_count, 2)
+        self.assertEqual(columns[0].cards[0].assignees[0].username, "owner")
+        self.assertEqual(get_board_snapshot(Column, Card, Assignee, self.board.id, since=1), [])
+
+    def test_sync_not_modified(self):
+        response = self.client.get(self.path)
+        self.assertEqual(response.json()['revision'], 0)
+        response = self.client.get(self.path, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    def test_sync_delta(self):
+        etag = self.client.get(self.path)['ETag']
+        card = Card.objects.filter(column_id=self.columns[0]).first()
+        move_card(Card, self.board.id, card.id, self.columns[1].id)
+        self.columns[2].delete()
+        bump_board_revision(Board, Column, self.board.id)
+
+        response = self.client.get(f"{self.path}?since=0", headers={'If-None-Match': etag})
+        data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(data['revision'], 2)
+        self.assertEqual(sorted(data['columns']), sorted([str(self.columns[0].id), str(self.columns[1].id)]))
+        self.assertEqual(data['order'], [self.columns[0].id, self.columns[1].id])
+
+    def test_events_are_only_pushed_under_asgi(self):
+        response = self.client.get(f"/board/{self.board.id}/events/")
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(response.streaming)
+        self.assertNotContains(self.client.get(f"/board/{self.board.id}/"), "listenBoardEvents(")
+
+        client = AsyncClient()
+        client.cookies = self.client.cookies
+        response = async_to_sync(client.get)(f"/board/{self.board.id}/")
+        self.assertContains(response, "listenBoardEvents(")
+
+
+class TestBoardRevisionTransaction(TransactionTestCase):
+
+    def setUp(self):
+        BOARD_ACCESS.clear()
+        caches['fragments'].clear()
+        self.owner = create_user("owner")
+        self.board = create_board(self.owner)
+        populate_board(self.board, [self.owner], columns=2, cards_per_column=1)
+        self.column = Column.objects.filter(board_id=self.board).first()
+        self.client = Client()
+        session = self.client.session
+        session['uuid'] = self.owner.uuid
+        session.save()
+
+    def test_sync_between_bump_and_stamp(self):
+        stamps = []
+
+        # Another connection syncing between the two updates sees what is committed at that point:
+        # stopping the bump right there shows it.
+        def interrupt(execute, sql, params, many, context):
+            if sql.startswith('UPDATE "core_column" SET "revision"'):
+                stamps.append(connection.in_atomic_block)
+                raise RuntimeError("Interrupted")
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(interrupt), self.assertRaises(RuntimeError):
+            bump_board_revision(Board, Column, self.board.id, [self.column.id])
+        self.assertEqual(stamps, [True])
+
+        data = self.client.get(f"/board/{self.board.id}/update/sync/?since=0").json()
+        self.assertEqual((data['revision'], data['columns']), (0, {}))
+
+        bump_board_revision(Board, Column, self.board.id, [self.column.id])
+        data = self.client.get(f"/board/{self.board.id}/update/sync/?since=0").json()
+        self.assertEqual((data['revision'], list(data['columns'])), (1, [str(self.column.id)]))
+
+
+class TestRenderBoardElements(TestCase):
+
+    def setUp(self):
+        caches['fragments'].clear()
+        self.owner = create_user("owner")
+        self.board = create_board(self.owner)
+        populate_board(self.board, [self.owner], columns=2, cards_per_column=2)
+        self.request = RequestFactory().get("/")
+
+    def test_render_is_cached_per_revision(self):
+        html = render_board_elements(self.request, self.board)
+        with self.assertNumQueries(0):
+            self.assertEqual(render_board_elements(self.request, self.board), html)
+
+        Column.objects.filter(board_id=self.board).update(title="Renamed")
+        self.board.revision = bump_board_revision(Board, Column, self.board.id)
+
+        with self.assertNumQueries(3):
+            self.assertIn("Renamed", render_board_elements(self.request, self.board))
+
+    def test_profile_image_change_renders_again(self):
+        other = create_board(create_user("other"), "Other")
+        populate_board(other, [], columns=1, cards_per_column=1)
+        Guest.objects.create(user_id=self.owner, board_id=other)
+        self.assertNotIn(f"{self.owner.uuid}.png", render_board_elements(self.request, self.board))
+
+        client = Client()
+        session = client.session
+        session['uuid'] = self.owner.uuid
+        session.save()
+        with tempfile.TemporaryDirectory() as directory, override_settings(MEDIA_ROOT=directory):
+            client.post("/account/changes/", {
+                "image": SimpleUploadedFile("avatar.png", b"image", content_type="image/png")})
+
+        self.board.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.board.revision, other.revision), (1, 1))
+        self.assertEqual(set(Column.objects.filter(board_id=self.board).values_list('revision', flat=True)), {1})
+        self.assertEqual(set(Column.objects.filter(board_id=other).values_list('revision', flat=True)), {0})
+        self.assertIn(f"{self.owner.uuid}.png", render_board_elements(self.request, self.board))
+
+    def test_render_expires_with_first_pending_card(self):
+        Card.objects.filter(board_id=self.board).update(expiration_date=timezone.now() + timedelta(seconds=30))
+        cache = caches['fragments']
+        with patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            render_board_elements(self.request, self.board)
+        timeout = cache_set.call_args.args[2]
+        self.assertTrue(0 < timeout <= 31)
+
+
+class TestRouteMetricsEndpoint(TestCase):
+
+    def setUp(self):
+        ROUTE_METRICS.reset()
+        self.owner = create_user("owner")
+        self.board = create_board(self.owner)
+        self.client = Client()
+        session = self.client.session
+        session['uuid'] = self.owner.uuid
+        session.save()
+
+    def test_records_routes(self):
+        self.client.get(f"/board/{self.board.id}/")
+        self.client.post(f"/board/{self.board.id}/")
+        board = ROUTE_METRICS.snapshot()["routes"]["board"]
+        self.assertEqual(board["statuses"], {"200": 1, "405": 1})
+        self.assertGreater(board["queries"], 0)
+        self.assertGreater(board["size"], 0)
+
+    def test_export(self):
+        self.client.get(f"/board/{self.board.id}/")
+        response = self.client.get("/metrics/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('kanboard_requests_total{route="board",status="200"} 1', response.content.decode())
+
+    def test_export_forbidden_address(self):
+        response = self.client.get("/metrics/", REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(response.status_code, 404)
+
+    def test_counts_the_queries_of_every_database(self):
+        # A second connection stands for a replica or a shard.
+        other = connections.create_connection(DEFAULT_DB_ALIAS)
+        other.inc_thread_sharing()
+        metrics = RouteMetrics()
+
+        def query():
+            with other.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return JsonResponses.response(JsonResponses.SUCCESS, "OK")
+
+        async def aquery(request):
+            return await asyncio.to_thread(query)
+
+        try:
+            with patch('static.services.requests.connections') as databases:
+                databases.all.return_value = [connection, other]
+                handler = RequestHandler(metrics)
+                handler.bind("sync", "sync/")(lambda request: query())
+                handler.urls()[0].callback(RequestFactory().get("/"))
+                handler = RequestHandler(metrics)
+                handler.bind("async", "async/")(aquery)
+                async_to_sync(handler.urls()[0].callback)(RequestFactory().get("/"))
+        finally:
+            other.close()
+            other.dec_thread_sharing()
+
+        routes = metrics.snapshot()["routes"]
+        self.assertEqual((routes["sync"]["queries"], routes["async"]["queries"]), (1, 1))
+
+
+class TestServerTiming(TestCase):
+
+    def setUp(self):
+        caches['fragments'].clear()
+        self.owner = create_user("owner")
+        self.board = create_board(self.owner)
+        populate_board(self.board, [self.owner], columns=2, cards_per_column=2)
+        self.client = Client()
+        session = self.client.session
+        session['uuid'] = self.owner.uuid
+        session.save()
+
+    @override_settings(SERVER_TIMING_ENABLED=True)
+    def test_header(self):
+        response = self.client.get(f"/board/{self.board.id}/")
+        timings = dict(entry.split(";", 1) for entry in response['Server-Timing'].split(", "))
+        self.assertEqual(set(timings), {"db", "tpl", "view"})
+        self.assertNotIn('desc="0 queries"', timings["db"])
+
+    def test_disabled(self):
+        response = self.client.get(f"/board/{self.board.id}/")
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+class TestSlowQueryLog(TestCase):
+
+    def setUp(self):
+        caches['fragments'].clear()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / "slow.jsonl"
+        self.recorder = SlowQueryRecorder(self.path, threshold=0)
+        self.owner = create_user("owner")
+        self.board = create_board(self.owner)
+        self.client = Client()
+        session = self.client.session
+        session['uuid'] = self.owner.uuid
+        session.save()
+
+    def tearDown(self):
+        self.recorder.close()
+        self.directory.cleanup()
+
+    def test_records_route_and_call_site(self):
+        self.recorder.install(connection)
+        try:
+            self.client.get(f"/board/{self.board.id}/")
+        finally:
+            connection.execute_wrappers.remove(self.recorder)
+        self.recorder.close()
+
+        output = StringIO()
+        call_command("slow_queries", path=str(self.path), route="board", stdout=output)
+        self.assertIn("routes: board", output.getvalue())
+        self.assertIn("static/utils/utils.py:", output.getvalue())
+        self.assertIn("in get_board_snapshot", output.getvalue())
+
+
+class TestProfilesCommand(TestCase):
+
+    def setUp(self):
+        caches['fragments'].clear()
+        self.directory = tempfile.TemporaryDirectory()
+        self.profiler = RequestProfiler(self.directory.name)
+        self.owner = create_user("owner")
+        self.board = create_board(self.owner)
+        populate_board(self.board, [self.owner], columns=2, cards_per_column=2)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def capture(self) -> str:
+        request = RequestFactory().get(f"/board/{self.board.id}/")
+        request.session = {'uuid': self.owner.uuid}
+        response = self.profiler.profile(request, "board", lambda: render_board_elements(request, self.board) and
+                                         JsonResponses.response(JsonResponses.SUCCESS, "OK"))
+        return response["X-Kanboard-Profile"]
+
+    def test_list_and_diff(self):
+        before, after = self.capture(), self.capture()
+        output = StringIO()
+        call_command("profiles", "--directory", self.directory.name, "list", stdout=output)
+        self.assertIn(before, output.getvalue())
+        self.assertIn(after, output.getvalue())
+
+        output = StringIO()
+        call_command("profiles", "--directory", self.directory.name, "diff", before, after, "--top", "5", stdout=output)
+        self.assertEqual(len(output.getvalue().splitlines()), 6)
+
+    def test_token(self):
+        output = StringIO()
+        call_command("profiles", "--directory", self.directory.name, "token", stdout=output)
+        request = RequestFactory().get("/", HTTP_X_KANBOARD_PROFILE=output.getvalue().strip())
+        self.assertTrue(self.profiler.requested(request))
+
+
+class TestAllocationProfiler(TestCase):
+
+    def setUp(self):
+        caches['fragments'].clear()
+        self.directory = tempfile.TemporaryDirectory()
+        self.allocations = AllocationProfiler(self.directory.name, routes=("board",))
+        self.handler = RequestHandler(allocations=self.allocations)
+        self.handler.bind("board", "board/<int:board_id>/", request="GET", session=True)(
+            lambda request, board_id: JsonResponses.response(
+                JsonResponses.SUCCESS, render_board_elements(request, Board.objects.get(id=board_id))))
+        self.handler.bind("dashboard", "dashboard/", request="GET", session=True)(
+            lambda request: JsonResponses.response(JsonResponses.SUCCESS, "OK"))
+        self.owner = create_user("owner")
+        self.board = create_board(self.owner)
+        populate_board(self.board, [self.owner], columns=2, cards_per_column=3)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def dispatch(self, route: int, path: str, **kwargs):
+        request = RequestFactory().get(path)
+        request.session = {'uuid': self.owner.uuid}
+        return self.handler.urls()[route].callback(request, **kwargs)
+
+    def test_traces_selected_routes(self):
+        self.dispatch(0, f"/board/{self.board.id}/", board_id=self.board.id)
+        self.dispatch(1, "/dashboard/")
+        report = self.allocations.report()
+        self.assertEqual(list(report), ["board"])
+        self.assertEqual(report["board"]["requests"], 1)
+        self.assertGreaterEqual(report["board"]["peak_max"], report["board"]["retained_max"])
+        self.assertTrue(report["board"]["lines"])
+
+    def test_memory_report(self):
+        self.dispatch(0, f"/board/{self.board.id}/", board_id=self.board.id)
+        output = StringIO()
+        call_command("memory_report", directory=self.directory.name, stdout=output)
+        self.assertTrue(output.getvalue().startswith("board: 1 requests"))
+
+
+class TestUserLookups(TestCase):
+
+    def setUp(self):
+        self.user = create_user("owner")
+
+    def test_uniqueness_in_one_query(self):
+        with self.assertNumQueries(1):
+            with self.assertRaises(ModelsAttributeError) as context:
+                UserValidations(User, username="owner", email="owner@example.com", name="Name").result()
+        self.assertTrue(context.exception.is_existence())
+        self.assertEqual(set(context.exception.errors), {"username", "email"})
+
+        with self.assertNumQueries(1):
+            with self.assertRaises(ModelsAttributeError) as context:
+                UserValidations(User, username="newcomer", email="owner@example.com").result()
+        self.assertEqual(set(context.exception.errors), {"email"})
+
+        with self.assertNumQueries(1):
+            UserValidations(User, username="newcomer", email="newcomer@example.com").result()
+
+    def test_uniqueness_skipped_for_invalid_values(self):
+        with self.assertNumQueries(0):
+            with self.assertRaises(ModelsAttributeError) as context:
+                UserValidations(User, username="in valid", email="invalid").result()
+        self.assertTrue(context.exception.is_pattern())
+
+    def test_login_in_one_query(self):
+        for key in ("owner", "owner@example.com"):
+            with self.assertNumQueries(1):
+                self.assertEqual(get_user_by_login(User, key, "password").username, "owner")
+        with self.assertNumQueries(1):
+            self.assertIsNone(get_user_by_login(User, "owner", "wrong password"))
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_user_by_login(User, None, "password"))
+
+    def test_login_view(self):
+        client = Client()
+        response = client.post("/login/submit/", {"key": "owner@example.com", "password": "password"})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(client.session['uuid'], UUID(str(self.user.uuid)).hex)
+
+
+class TestSessions(TestCase):
+
+    def setUp(self):
+        now = timezone.now()
+        for index in range(5):
+            Session.objects.create(session_key=f"expired{index}", session_data="", expire_date=now - timedelta(hours=1))
+        Session.objects.create(session_key="alive", session_data="", expire_date=now + timedelta(hours=1))
+
+    def test_sweep_in_batches(self):
+        # One select and one delete per batch, and a last select finding nothing.
+        with self.assertNumQueries(7):
+            self.assertEqual(sweep_expired_sessions(batch_size=2), 5)
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ["alive"])
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_sweep_without_database_store(self):
+        self.assertIsNone(sweep_expired_sessions())
+        self.assertEqual(Session.objects.count(), 6)
+
+    def test_sweep_command(self):
+        output = StringIO()
+        call_command("sweep_sessions", "--pause", "0", stdout=output)
+        self.assertIn("Deleted 5 expired sessions.", output.getvalue())
+
+    def test_router(self):
+        router = SessionRouter()
+        self.assertIsNone(router.db_for_write(Session))
+        with self.settings(SESSION_DATABASE='sessions'):
+            self.assertEqual(router.db_for_read(Session), 'sessions')
+            self.assertEqual(router.db_for_write(Session), 'sessions')
+            self.assertIsNone(router.db_for_write(Board))
+            self.assertTrue(router.allow_migrate('sessions', 'sessions'))
+            self.assertFalse(router.allow_migrate('default', 'sessions'))
+            self.assertFalse(router.allow_migrate('sessions', 'core'))
+
+    def test_cached_session(self):
+        user = create_user("owner")
+        client = Client()
+        client.post("/login/submit/", {"key": "owner", "password": "password"})
+        # The session is read from the cache, never from the database.
+        with patch.object(Session.objects, 'get', side_effect=AssertionError("session read from the database")):
+            response = client.get("/account/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(client.session['uuid'], UUID(str(user.uuid)).hex)
+
+
+class TestQueryPlans(TestCase):
+    """
+    Runs EXPLAIN QUERY PLAN on the queries of the hot paths, so that a change to the models or to the queries
+    cannot silently make them scan a whole table, or sort rows that an index already returns in order.
+    """
+
+    def ___plan(self, queryset) -> list[str]:
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def ___assert_searched(self, queryset, ordered: bool = False):
+        plan = self.___plan(queryset)
+        scans = [step for step in plan if step.startswith("SCAN ")]
+        self.assertEqual(scans, [], f"Full scan in {plan}")
+        if ordered:
+            self.assertFalse(any("TEMP B-TREE" in step for step in plan), f"Sort in {plan}")
+
+    def test_cards(self):
+        self.___assert_searched(Card.objects.filter(board_id=1, column_id=1).order_by('index', 'id'), ordered=True)
+        self.___assert_searched(Card.objects.filter(board_id=1).order_by('column_id', 'index', 'id'), ordered=True)
+        self.___assert_searched(Card.objects.filter(board_id=1, column_id=1).exclude(id=1)
+                                .filter(Q(index__lt=1) | Q(index=1, id__lt=1)).order_by('-index', '-id'), ordered=True)
+        self.___assert_searched(Card.objects.filter(id=1, board_id=1))
+
+    def test_expired_cards(self):
+        plan = self.___plan(get_expired_cards_of_board(Card, 1))
+        self.assertIn("card_board_due", " ".join(plan))
+
+    def test_columns(self):
+        self.___assert_searched(Column.objects.filter(board_id=1).order_by('index', 'id'), ordered=True)
+        self.___assert_searched(Column.objects.filter(id=1, board_id=1))
+
+    def test_assignees(self):
+        self.___assert_searched(Assignee.objects.filter(card_id=1, board_id=1))
+        self.___assert_searched(Assignee.objects.filter(board_id=1).order_by('id'))
+        self.___assert_searched(Assignee.objects.filter(user_id=uuid4().hex, card_id=1, board_id=1))
+
+    def test_guests(self):
+        self.___assert_searched(Guest.objects.filter(user_id=uuid4().hex, board_id=1))
+        self.___assert_searched(Guest.objects.filter(board_id=1))
+
+    def test_boards(self):
+        self.___assert_searched(get_accessible_boards(Board, Guest, uuid4().hex))
+        self.___assert_searched(Column.objects.filter(board_id=1).order_by('index', 'id')
+                                .annotate(total_cards=Count('card')))
+
+
+class TestWriteQueue(TransactionTestCase):
+
+    def setUp(self):
+        self.board = create_board(create_user("owner"))
+        self.queue = WriteQueue(max_delay=0.05)
+
+    def tearDown(self):
+        self.queue.close()
+
+    def ___submit_together(self, operations: list) -> list:
+        results = [None] * len(operations)
+        barrier = threading.Barrier(len(operations))
+
+        def submit(position, operation):
+            barrier.wait()
+            try:
+                results[position] = self.queue.submit(operation)
+            except Exception as e:
+                results[position] = e
+
+        threads = [threading.Thread(target=submit, args=item) for item in enumerate(operations)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def ___create_column(self, index: int):
+        return lambda: Column.objects.create(board_id=self.board, title=f"Column {index}", description="",
+                                             index=index).index
+
+    def test_group_commit(self):
+        results = self.___submit_together([self.___create_column(index) for index in range(8)])
+        self.assertEqual(results, list(range(8)))
+        self.assertEqual(Column.objects.filter(board_id=self.board).count(), 8)
+        self.assertLess(self.queue.batches, 8)
+
+    def test_failure_is_isolated(self):
+        def fail():
+            Column.objects.create(board_id=self.board, title="Rolled back", description="", index=99)
+            raise ModelsAttributeError("Invalid column.")
+
+        results = self.___submit_together([self.___create_column(0), fail, self.___create_column(1)])
+        self.assertEqual(results[0], 0)
+        self.assertIsInstance(results[1], ModelsAttributeError)
+        self.assertEqual(results[2], 1)
+        self.assertEqual(sorted(Column.objects.filter(board_id=self.board).values_list('index', flat=True)), [0, 1])
+
+    def test_nested_submit(self):
+        self.assertEqual(self.queue.submit(lambda: self.queue.submit(self.___create_column(3))), 3)
+
+    def test_transactions_are_opened_on_the_database_of_the_operations(self):
+        # The operations still run on the default database, only the aliases of the transactions are recorded.
+        with patch("static.services.writes.transaction") as transaction:
+            thread = threading.Thread(target=self.queue.submit, args=(self.___create_column(0), "shard1"))
+            thread.start()
+            self.queue.submit(self.___create_column(1))
+            thread.join()
+        usings = [call.kwargs["using"] for call in transaction.atomic.call_args_list]
+        self.assertEqual(sorted(set(usings)), ["default", "shard1"])
+        self.assertEqual(usings.count("shard1"), 2)
+
+
+class TestShardDirectory(TestCase):
+
+    def setUp(self):
+        self.owner = create_user("owner")
+        self.shards = ShardDirectory(BoardShard, aliases=("default",), cache_ttl=60)
+
+    def test_directory(self):
+        board_id, alias = self.shards.allocate()
+        self.assertEqual(alias, "default")
+        self.assertEqual(self.shards.counts(), {"default": 1})
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.shards.alias(board_id), "default")
+            self.assertEqual(self.shards.alias(board_id), "default")
+
+        with self.assertRaises(ValueError):
+            self.shards.move(board_id, "shard1")
+        self.shards.forget(board_id)
+        self.assertEqual(self.shards.counts(), {"default": 0})
+        self.assertEqual(self.shards.allocate()[0], board_id + 1)
+
+    def test_routes_are_served_on_the_shard_of_their_board(self):
+        handler = RequestHandler(shards=self.shards)
+        shards = []
+        handler.bind("board", "board/<int:board_id>/", request="GET")(
+            lambda request, board_id: shards.append(ShardDirectory.current()) or JsonResponses.response(
+                JsonResponses.SUCCESS, "OK"))
+        handler.bind("dashboard", "dashboard/", request="GET")(
+            lambda request: shards.append(ShardDirectory.current()) or JsonResponses.response(
+                JsonResponses.SUCCESS, "OK"))
+        board, dashboard = (pattern.callback for pattern in handler.urls())
+
+        request = RequestFactory().get("/")
+        request.session = {}
+        board(request, board_id=self.shards.allocate()[0])
+        dashboard(request)
+        self.assertEqual(shards, ["default", None])
+
+    def test_insert_and_list_boards(self):
+        with patch("static.utils.utils.SHARDS", self.shards):
+            boards = [insert_board(Board, owner=self.owner, name=f"Board {index}", creation_date=timezone.now())
+                      for index in range(3)]
+            self.assertEqual([board.id for board in boards], list(BoardShard.objects.values_list('board_id', flat=True)))
+            rows = list_accessible_boards(Board, Guest, self.owner.uuid, ("id", "name"), after=boards[0].id, limit=1)
+        self.assertEqual(rows, [(boards[1].id, "Board 1")])
+
+    def test_transactions_are_opened_on_the_shard(self):
+        board = create_board(self.owner)
+        populate_board(board, [self.owner], columns=2, cards_per_column=1)
+        card, column = Card.objects.filter(board_id=board).first(), Column.objects.filter(board_id=board).last()
+
+        # The queries still run on the default database, only the aliases of the transactions are recorded.
+        with patch("static.utils.utils.router") as router, patch("static.utils.utils.transaction") as transaction:
+            router.db_for_write.return_value = "shard1"
+            move_card(Card, board.id, card.id, column.id)
+            apply_board_ordering(Column, Card, board.id, [])
+        self.assertEqual({call.kwargs["using"] for call in transaction.atomic.call_args_list}, {"shard1"})
+        self.assertEqual(transaction.on_commit.call_args.kwargs["using"], "shard1")
+
+
+class TestAsyncViews(TestCase):
+
+    def setUp(self):
+        caches['fragments'].clear()
+        self.owner = create_user("owner")
+        self.board = create_board(self.owner)
+        populate_board(self.board, [self.owner], columns=2, cards_per_column=2)
+
+        routes = (("dashboard", "dashboard/", dashboard, dashboard_async),
+                  ("board", "board/<int:board_id>/", board, board_async),
+                  ("burndown", "burndown/<int:board_id>/", burndown_view, burndown_view_async),
+                  ("board_update_sync", "board/<int:board_id>/update/sync/", sync_board, sync_board_async))
+        self.metrics = RouteMetrics()
+        self.views = {}
+        for asynchronous in (False, True):
+            handler = RequestHandler(self.metrics, asynchronous=asynchronous)
+            for name, path, view, variant in routes:
+                handler.bind(name, path, request="GET", session=True)(view)
+                handler.variant(name)(variant)
+            self.views[asynchronous] = {pattern.name: pattern.callback for pattern in handler.urls()}
+
+    def serve(self, asynchronous: bool, name: str, uuid: str, data: dict = None, **kwargs):
+        request = RequestFactory().get("/", data or {})
+        request.session = import_module(settings.SESSION_ENGINE).SessionStore()
+        request.session['uuid'] = uuid
+        view = self.views[asynchronous][name]
+        return async_to_sync(view)(request, **kwargs) if asynchronous else view(request, **kwargs)
+
+    def test_variants_render_like_the_views(self):
+        for name, kwargs, text in (("dashboard", {}, "Board"), ("board", {"board_id": self.board.id}, "Card 1"),
+                                   ("burndown", {"board_id": self.board.id}, "Column 1")):
+            responses = [self.serve(asynchronous, name, self.owner.uuid, **kwargs) for asynchronous in (False, True)]
+            for response in responses:
+                self.assertContains(response, text)
+
+        for data in ({}, {"since": 0}):
+            responses = [self.serve(asynchronous, "board_update_sync", self.owner.uuid, data, board_id=self.board.id)
+                         for asynchronous in (False, True)]
+            self.assertEqual(json.loads(responses[0].content), json.loads(responses[1].content))
+            self.assertEqual(responses[0]["ETag"], responses[1]["ETag"])
+
+    def test_variants_check_the_access(self):
+        stranger = create_user("stranger")
+        for name in ("board", "burndown", "board_update_sync"):
+            response = self.serve(True, name, stranger.uuid, board_id=self.board.id)
+            self.assertEqual(json.loads(response.content)["message"], "You do not have access to this board.")
+            response = self.serve(True, name, self.owner.uuid, board_id=self.board.id + 1)
+            self.assertEqual(json.loads(response.content)["status"], JsonResponses.ERROR)
+
+    def test_burndown_checks_the_access_first(self):
+        stranger = create_user("stranger")
+        with patch('core.views.aget_board_statistics') as statistics:
+            self.serve(True, "burndown", stranger.uuid, board_id=self.board.id)
+            self.serve(True, "burndown", self.owner.uuid, board_id=self.board.id + 1)
+        statistics.assert_not_called()
+
+    def test_variants_record_their_queries(self):
+        self.serve(True, "board", self.owner.uuid, board_id=self.board.id)
+        self.assertGreater(self.metrics.snapshot()["routes"]["board"]["queries"], 0)
+
+    def test_async_snapshot(self):
+        with self.assertNumQueries(3):
+            columns = async_to_sync(aget_board_snapshot)(Column, Card, Assignee, self.board.id)
+        self.assertEqual([[card.id for card in column.cards] for column in columns],
+                         [[card.id for card in column.cards]
+                          for column in get_board_snapshot(Column, Card, Assignee, self.board.id)])
@@ -1,17 +1,197 @@
+from collections import defaultdict
+from contextlib import nullcontext
 from datetime import datetime
-
-from django.db.models import QuerySet
+from uuid import UUID
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.handlers.asgi import ASGIRequest
+from django.db import DEFAULT_DB_ALIAS, router, transaction
+from django.db.models import QuerySet, Count, Q, Sum, Value, Exists, OuterRef, Max, F
+from django.db.models.functions import Coalesce
 from django.http import HttpRequest
+from django.template.loader import render_to_string
 from django.utils import timezone
+from django.utils.module_loading import import_string
 
 from authentication.models import User
-from core.models import Board, Card, Guest
-from static.services import JsonResponses
+from core.models import Board, Card, Column, Guest, Assignee, BoardShard
+from static.services import JsonResponses, BoardAccessCache, BoardRole, ModelsAttributeError, BoardEventBroadcaster, \
+    RouteMetrics, SlowQueryRecorder, RequestProfiler, AllocationProfiler, WriteQueue, ReadReplicas, ShardDirectory
+from static.services.ordering import key_after, key_between, plan_ordering, spread
+from static.utils.viewmodels import TemplateAssignee, TemplateCard, TemplateColumn, ColumnStatistics
+
+response = lambda status, message, **extra: JsonResponses.response(status, message, **extra)
+response_error = lambda message, **extra: JsonResponses.response(JsonResponses.ERROR, message, **extra)
+response_warn = lambda message, **extra: JsonResponses.response(JsonResponses.WARNING, message, **extra)
+response_success = lambda message, **extra: JsonResponses.response(JsonResponses.SUCCESS, message, **extra)
+
+BOARD_ACCESS = BoardAccessCache(getattr(settings, 'BOARD_ACCESS_CACHE_SIZE', 4096),
+                                getattr(settings, 'BOARD_ACCESS_CACHE_TTL', 10))
+BOARD_EVENTS = BoardEventBroadcaster(
+    import_string(getattr(settings, 'BOARD_EVENTS_BACKEND', 'static.services.LocalEventBackend'))(
+        **getattr(settings, 'BOARD_EVENTS_OPTIONS', {})))
+ROUTE_METRICS = RouteMetrics(**getattr(settings, 'ROUTE_METRICS_OPTIONS', {})) \
+    if getattr(settings, 'ROUTE_METRICS_ENABLED', True) else None
+SLOW_QUERIES = SlowQueryRecorder(**getattr(settings, 'SLOW_QUERY_LOG_OPTIONS', {})) \
+    if getattr(settings, 'SLOW_QUERY_LOG_ENABLED', False) else None
+REQUEST_PROFILER = RequestProfiler(**getattr(settings, 'REQUEST_PROFILING_OPTIONS', {})) \
+    if getattr(settings, 'REQUEST_PROFILING_ENABLED', False) else None
+ALLOCATION_PROFILER = AllocationProfiler(**getattr(settings, 'ALLOCATION_PROFILING_OPTIONS', {})) \
+    if getattr(settings, 'ALLOCATION_PROFILING_ENABLED', False) else None
+WRITE_QUEUE = WriteQueue(**getattr(settings, 'WRITE_QUEUE_OPTIONS', {})) \
+    if getattr(settings, 'WRITE_QUEUE_ENABLED', False) else None
+READ_REPLICAS = ReadReplicas(**getattr(settings, 'READ_REPLICAS_OPTIONS', {})) \
+    if getattr(settings, 'READ_REPLICAS_ENABLED', False) else None
+SHARDS = ShardDirectory(BoardShard, **getattr(settings, 'SHARDING_OPTIONS', {})) \
+    if getattr(settings, 'SHARDING_ENABLED', False) else None
+
+
+def invalidate_board_roles(board_id: int, uuid: str = None, using: str = DEFAULT_DB_ALIAS):
+    """
+    Drops the cached roles on a board, or only the role of a user, from the BOARD_ACCESS cache of this process
+    right away, and from the cache of every process once the change is committed, through BOARD_EVENTS.
+    The local role is dropped again after the commit, so that a role read in the meantime is not kept.
+
+    :param board_id: The board's ID.
+    :param uuid: The user's UUID, None to drop the roles of every user.
+    :param using: The alias of the database the change is written to.
+    """
+    message = {'access': uuid}
+    forget_board_roles(board_id, message)
+    transaction.on_commit(lambda: BOARD_EVENTS.notify(board_id, message), using=using)
+
+
+def forget_board_roles(board_id: int, message: dict):
+    """
+    Drops the cached roles named by a message of invalidate_board_roles.
+    It listens to the messages of BOARD_EVENTS in the processes serving requests (see core/signals.py).
+
+    :param board_id: The board's ID.
+    :param message: The message.
+    """
+    if 'access' not in message:
+        return
+    if message['access'] is None:
+        BOARD_ACCESS.invalidate_board(board_id)
+    else:
+        BOARD_ACCESS.invalidate(message['access'], board_id)
+
+
+def submit_write(operation):
+    """
+    Runs a write operation of a view through the write queue of the process when it is enabled,
+    or right away in the calling thread, in a board_transaction, otherwise.
+
+    :param operation: The operation, called without arguments.
+    :return: The value returned by the operation.
+    :raises Exception: The exception raised by the operation.
+    """
+    if WRITE_QUEUE is None:
+        with board_transaction():
+            return operation()
+    return WRITE_QUEUE.submit(operation, router.db_for_write(Board))
+
+
+def board_transaction():
+    """
+    Opens the transaction of the writes of a board view, so that its changes and the revision bump announcing them
+    are committed together, and no client ever sees the new revision before the changed columns carry it.
+    The transaction is opened on the database the board models are written to, i.e. on the shard of the board.
+
+    :return: The atomic block.
+    """
+    return transaction.atomic(using=router.db_for_write(Board))
 
-response = lambda status, message: JsonResponses.response(status, message)
-response_error = lambda message: JsonResponses.response(JsonResponses.ERROR, message)
-response_warn = lambda message: JsonResponses.response(JsonResponses.WARNING, message)
-response_success = lambda message: JsonResponses.response(JsonResponses.SUCCESS, message)
+
+def insert_board(board, **values) -> Board:
+    """
+    Creates a board, on the shard with the fewest boards when the boards are sharded.
+
+    :param board: The board model.
+    :param values: The fields of the board.
+    :return: The board.
+    """
+    if SHARDS is None:
+        return board.objects.create(**values)
+    board_id, alias = SHARDS.allocate()
+    return board.objects.using(alias).create(id=board_id, **values)
+
+
+def replicate_users(user, users: list, aliases) -> None:
+    """
+    Copies users of the default database to other databases, inserting or updating them in one statement each.
+    The copies are new instances, so the given ones keep belonging to the default database.
+
+    :param user: The user model.
+    :param users: The users to copy.
+    :param aliases: The aliases of the databases to copy the users to.
+    """
+    fields = [field.attname for field in user._meta.concrete_fields]
+    updated = [field for field in fields if field != user._meta.pk.attname]
+    for alias in aliases:
+        if alias == DEFAULT_DB_ALIAS or not users:
+            continue
+        copies = [user(**{field: getattr(instance, field) for field in fields}) for instance in users]
+        user.objects.using(alias).bulk_create(copies, update_conflicts=True, unique_fields=[user._meta.pk.name],
+                                              update_fields=updated)
+
+
+def move_board(board_clazz, column_clazz, card_clazz, assignee_clazz, guest_clazz, user_clazz, board_id: int,
+               target: str) -> str:
+    """
+    Moves a board, with its columns, cards, assignees and guests, to another shard.
+    The rows are copied to the target in one transaction, then the directory is switched, then the rows are deleted
+    from the source. The board keeps its ID, and so do its other rows unless the target already uses their IDs,
+    in which case the target gives them new ones.
+
+    :param board_clazz: The board model.
+    :param column_clazz: The column model.
+    :param card_clazz: The card model.
+    :param assignee_clazz: The assignee model.
+    :param guest_clazz: The guest model.
+    :param user_clazz: The user model.
+    :param board_id: The board's ID.
+    :param target: The alias of the target shard.
+    :return: The alias of the source shard.
+    """
+    source = SHARDS.alias(board_id)
+    if source == target:
+        return source
+
+    board = board_clazz.objects.using(source).get(id=board_id)
+    columns = list(column_clazz.objects.using(source).filter(board_id=board_id).order_by('id'))
+    cards = list(card_clazz.objects.using(source).filter(board_id=board_id).order_by('id'))
+    assignees = list(assignee_clazz.objects.using(source).filter(board_id=board_id).order_by('id'))
+    guests = list(guest_clazz.objects.using(source).filter(board_id=board_id).order_by('id'))
+
+    members = {board.owner_id} | {row.user_id_id for row in assignees} | {row.user_id_id for row in guests}
+    replicate_users(user_clazz, list(user_clazz.objects.using(DEFAULT_DB_ALIAS).filter(uuid__in=members)), [target])
+
+    with transaction.atomic(using=target):
+        board.save(using=target, force_insert=True)
+        column_ids = _copy_rows(column_clazz, columns, target)
+        for card in cards:
+            card.column_id_id = column_ids[card.column_id_id]
+        card_ids = _copy_rows(card_clazz, cards, target)
+        for assignee in assignees:
+            assignee.card_id_id = card_ids[assignee.card_id_id]
+        _copy_rows(assignee_clazz, assignees, target)
+        _copy_rows(guest_clazz, guests, target)
+
+    SHARDS.move(board_id, target)
+    with ShardDirectory.scope(source):
+        board_clazz.objects.using(source).filter(id=board_id).delete()
+    return source
+
+
+def _copy_rows(model, rows: list, alias: str) -> dict[int, int]:
+    ids = [row.pk for row in rows]
+    if model.objects.using(alias).filter(pk__in=ids).exists():
+        for row in rows:
+            row.pk = None
+    model.objects.using(alias).bulk_create(rows)
+    return dict(zip(ids, (row.pk for row in rows)))
 
 
 def get_user_from(request: HttpRequest) -> str:
@@ -24,6 +204,27 @@ def get_user_from(request: HttpRequest) -> str:
     return request.session.get('uuid', None)
 
 
+def supports_push(request: HttpRequest) -> bool:
+    """
+    Checks if the request is served by the ASGI application, the only one that can stream the board events
+    (see the board_events view): WSGI servers would hold a worker thread for every open board page.
+
+    :param request: The request object.
+    :return: True if the board events can be pushed to the client, False otherwise.
+    """
+    return isinstance(request, ASGIRequest)
+
+
+async def aget_user_from(request: HttpRequest) -> str:
+    """
+    Gets the user from the request session, with the async API of the session.
+
+    :param request: The request object.
+    :returns: The user's UUID.
+    """
+    return await request.session.aget('uuid', None)
+
+
 def check_user_invalid(uuid: str) -> bool:
     """
     Checks if the user is invalid.
@@ -53,12 +254,28 @@ def get_board(board, board_id: int, owner: str = None) -> Board or None:
     :param owner: The board's owner.
     :return: The board object, None otherwise.
     """
+    return _board_query(board, board_id, owner).first()
+
+
+async def aget_board(board, board_id: int, owner: str = None) -> Board or None:
+    """
+    Gets the Board by the board_id from the model, with the async ORM (see get_board).
+
+    :param board: The board model.
+    :param board_id: The board's ID.
+    :param owner: The board's owner.
+    :return: The board object, None otherwise.
+    """
+    return await _board_query(board, board_id, owner).afirst()
+
+
+def _board_query(board, board_id: int, owner: str = None) -> QuerySet[Board]:
     keywords = {'id': board_id}
 
     if owner:
         keywords['owner'] = owner
 
-    return board.objects.filter(**keywords).first()
+    return board.objects.filter(**keywords)
 
 
 def get_cards_of_board(card, board_id: int) -> QuerySet[Card]:
@@ -92,6 +309,22 @@ def get_user(user, uuid: str = None, username: str = None) -> User or None:
     :param username: The user's username.
     :return: The user object.
     """
+    return _user_query(user, uuid, username).first()
+
+
+async def aget_user(user, uuid: str = None, username: str = None) -> User or None:
+    """
+    Gets the User by the user_id OR by the username from the model, with the async ORM (see get_user).
+
+    :param user: The user model.
+    :param uuid: The user's UUID.
+    :param username: The user's username.
+    :return: The user object.
+    """
+    return await _user_query(user, uuid, username).afirst()
+
+
+def _user_query(user, uuid: str = None, username: str = None) -> QuerySet[User]:
     keywords = {}
 
     if uuid:
@@ -100,7 +333,25 @@ def get_user(user, uuid: str = None, username: str = None) -> User or None:
     if username:
         keywords = { 'username': username }
 
-    return user.objects.filter(**keywords).first()
+    return user.objects.filter(**keywords)
+
+
+def get_user_by_login(user, key: str, password: str) -> User or None:
+    """
+    Gets the User identified by its email or username and its password, in a single query.
+    Emails always contain an '@' and usernames never do, so the key is only compared with the one indexed column
+    it can match.
+
+    :param user: The user model.
+    :param key: The user's email or username.
+    :param password: The user's password.
+    :return: The user object, None if the credentials are incorrect.
+    """
+    if not key or not password:
+        return None
+
+    field = 'email' if '@' in key else 'username'
+    return user.objects.filter(**{field: key, 'password': password}).first()
 
 
 def get_guest(guest, board_id: int, uuid: str) -> Guest or None:
@@ -115,6 +366,75 @@ def get_guest(guest, board_id: int, uuid: str) -> Guest or None:
     return guest.objects.filter(user_id=uuid, board_id=board_id).first()
 
 
+def get_board_role(board, guest, board_id: int, uuid: str) -> str:
+    """
+    Gets the role of the user on the board (owner, guest or none).
+    The role is resolved with a single query and kept in the process-wide BOARD_ACCESS cache,
+    which is invalidated by the Board and Guest signals in core/signals.py (see invalidate_board_roles).
+    A role is not cached when the cache was invalidated while it was being read, nor when it was read
+    on a replica, which may still hold a guest that was removed from the primary.
+
+    :param board: The board model.
+    :param guest: The guest model.
+    :param board_id: The board's ID.
+    :param uuid: The user's UUID.
+    :return: The role of the user on the board.
+    """
+    try:
+        uuid = UUID(str(uuid)).hex
+    except ValueError:
+        return BoardRole.NONE
+
+    if role := BOARD_ACCESS.get(uuid, board_id):
+        return role
+
+    generation = BOARD_ACCESS.generation()
+    role = _board_role(_board_role_query(board, guest, board_id, uuid).first(), uuid)
+    if ReadReplicas.current() is None:
+        BOARD_ACCESS.put(uuid, board_id, role, generation)
+    return role
+
+
+async def aget_board_role(board, guest, board_id: int, uuid: str) -> str:
+    """
+    Gets the role of the user on the board (owner, guest or none), with the async ORM (see get_board_role).
+
+    :param board: The board model.
+    :param guest: The guest model.
+    :param board_id: The board's ID.
+    :param uuid: The user's UUID.
+    :return: The role of the user on the board.
+    """
+    try:
+        uuid = UUID(str(uuid)).hex
+    except ValueError:
+        return BoardRole.NONE
+
+    if role := BOARD_ACCESS.get(uuid, board_id):
+        return role
+
+    generation = BOARD_ACCESS.generation()
+    role = _board_role(await _board_role_query(board, guest, board_id, uuid).afirst(), uuid)
+    if ReadReplicas.current() is None:
+        BOARD_ACCESS.put(uuid, board_id, role, generation)
+    return role
+
+
+def _board_role_query(board, guest, board_id: int, uuid: str) -> QuerySet:
+    is_guest = Exists(guest.objects.filter(board_id=OuterRef('id'), user_id=uuid))
+    return board.objects.filter(id=board_id).annotate(is_guest=is_guest).values_list('owner', 'is_guest')
+
+
+def _board_role(row: tuple or None, uuid: str) -> str:
+    if row is None:
+        return BoardRole.NONE
+    if row[0].hex == uuid:
+        return BoardRole.OWNER
+    if row[1]:
+        return BoardRole.GUEST
+    return BoardRole.NONE
+
+
 def check_user_not_owner(board, board_id: int, uuid: str) -> bool:
     """
     Checks if the user is not the owner of the board.
@@ -124,7 +444,7 @@ def check_user_not_owner(board, board_id: int, uuid: str) -> bool:
     :param uuid: The user's UUID.
     :return: True if the user is not the owner, False otherwise.
     """
-    return get_board(board, board_id, uuid) is None
+    return get_board_role(board, Guest, board_id, uuid) != BoardRole.OWNER
 
 
 def check_user_not_guest(guest, board_id: int, uuid: str) -> bool:
@@ -136,7 +456,7 @@ def check_user_not_guest(guest, board_id: int, uuid: str) -> bool:
     :param board_id: The board's ID.
     :return: True if the user is not a guest, False otherwise.
     """
-    return get_guest(guest, board_id, uuid) is None
+    return get_board_role(Board, guest, board_id, uuid) != BoardRole.GUEST
 
 
 def check_user_not_owner_or_guest(board, guest, board_id: int, uuid: str) -> bool:
@@ -149,7 +469,20 @@ def check_user_not_owner_or_guest(board, guest, board_id: int, uuid: str) -> boo
     :param board_id: The board's ID.
     :return: True if the user is not the owner or a guest, False otherwise.
     """
-    return check_user_not_owner(board, board_id, uuid) and check_user_not_guest(guest, board_id, uuid)
+    return get_board_role(board, guest, board_id, uuid) == BoardRole.NONE
+
+
+async def acheck_user_not_owner_or_guest(board, guest, board_id: int, uuid: str) -> bool:
+    """
+    Checks if the user is not the owner or a guest of the board, with the async ORM.
+
+    :param board: The board model.
+    :param guest: The guest model.
+    :param uuid: The user's UUID.
+    :param board_id: The board's ID.
+    :return: True if the user is not the owner or a guest, False otherwise.
+    """
+    return await aget_board_role(board, guest, board_id, uuid) == BoardRole.NONE
 
 
 def get_columns(column, board_id: int) -> QuerySet[Card]:
@@ -174,6 +507,56 @@ def get_cards(card, column_id: int) -> QuerySet[Card]:
     return card.objects.filter(column_id=column_id).all()
 
 
+def list_accessible_boards(board, guest, uuid: str, fields: tuple, after: int = None, limit: int = None) -> list:
+    """
+    Lists the boards the user can access (see get_accessible_boards), on every shard when the boards are sharded,
+    merging the pages of the shards by ID.
+
+    :param board: The board model.
+    :param guest: The guest model.
+    :param uuid: The user's UUID.
+    :param fields: The fields of the rows, starting with the ID of the board.
+    :param after: The ID of the last board of the previous page, if any.
+    :param limit: The maximum number of boards to return, if any.
+    :return: The rows of the boards accessible by the user.
+    """
+    if SHARDS is None:
+        return list(get_accessible_boards(board, guest, uuid, after, limit).values_list(*fields))
+    return SHARDS.fan_out(
+        lambda alias: get_accessible_boards(board, guest, uuid, after, limit).using(alias).values_list(*fields), limit)
+
+
+async def alist_accessible_boards(board, guest, uuid: str, fields: tuple, after: int = None,
+                                  limit: int = None) -> list:
+    """
+    Lists the boards the user can access with the async ORM (see list_accessible_boards),
+    querying the shards at the same time when the boards are sharded.
+
+    :param board: The board model.
+    :param guest: The guest model.
+    :param uuid: The user's UUID.
+    :param fields: The fields of the rows, starting with the ID of the board.
+    :param after: The ID of the last board of the previous page, if any.
+    :param limit: The maximum number of boards to return, if any.
+    :return: The rows of the boards accessible by the user.
+    """
+    if SHARDS is None:
+        return await alist(get_accessible_boards(board, guest, uuid, after, limit).values_list(*fields))
+    return await SHARDS.afan_out(
+        lambda alias: alist(get_accessible_boards(board, guest, uuid, after, limit).using(alias).values_list(*fields)),
+        limit)
+
+
+async def alist(queryset: QuerySet) -> list:
+    """
+    Evaluates a queryset with the async ORM.
+
+    :param queryset: The queryset.
+    :return: The rows of the queryset.
+    """
+    return [row async for row in queryset]
+
+
 def get_boards_owned(board, uuid: str) -> QuerySet[Board]:
     """
     Gets the boards owned by the user.
@@ -185,6 +568,31 @@ def get_boards_owned(board, uuid: str) -> QuerySet[Board]:
     return board.objects.filter(owner=uuid).all()
 
 
+def get_accessible_boards(board, guest, uuid: str, after: int = None, limit: int = None) -> QuerySet[Board]:
+    """
+    Gets the boards the user can access, that is the boards owned by the user and the boards where the user
+    is a guest, resolved in one query that only touches the user's own rows through the owner and guest indexes.
+    The boards are ordered by ID, so that the last ID of a page can be used as the cursor of the next one.
+
+    :param board: The board model.
+    :param guest: The guest model.
+    :param uuid: The user's UUID.
+    :param after: The ID of the last board of the previous page, if any.
+    :param limit: The maximum number of boards to return, if any.
+    :return: The boards accessible by the user.
+    """
+    guested = guest.objects.filter(user_id=uuid).values('board_id')
+    boards = board.objects.filter(Q(owner=uuid) | Q(id__in=guested)).order_by('id')
+
+    if after is not None:
+        boards = boards.filter(id__gt=after)
+
+    if limit is not None:
+        boards = boards[:limit]
+
+    return boards
+
+
 def no_timezone(dt: datetime) -> datetime:
     """
     Removes the timezone from the datetime object.
@@ -194,42 +602,372 @@ def no_timezone(dt: datetime) -> datetime:
     """
     return dt.replace(tzinfo=None)
 
-def get_board_elements(column_clazz, card_clazz, assignee_clazz, user_clazz, board_id: int) -> list:
-    columns = column_clazz.objects.filter(board_id=board_id).order_by("index").all()
-
-    class TemplateAssignee:
-        def __init__(self, _assignee):
-            self.username = _assignee.username
-            self.image = _assignee.image
-
-    class TemplateCard:
-        def __init__(self, _card):
-            self.id = _card.id
-            self.title = _card.title
-            self.description = _card.description
-            self.color = _card.color
-            self.creation_date = _card.creation_date
-            self.expiration_date = _card.expiration_date if _card.expiration_date else None
-            self.completion_date = _card.completion_date
-            self.story_points = _card.story_points
-            if _card.expiration_date:
-                self.is_expired = not _card.completion_date and _card.expiration_date and no_timezone(_card.expiration_date) < no_timezone(datetime.now())
+def get_board_statistics(column_clazz, board_id: int, now: datetime = None) -> tuple[list, dict]:
+    """
+    Computes the card statistics of every column of a board.
+    Every count is evaluated in a single conditional-aggregation query grouped by column,
+    against the same point in time. The board totals are derived from the column rows.
+
+    :param column_clazz: The column model.
+    :param board_id: The board's ID.
+    :param now: The point in time used to tell active cards from expired ones, defaults to now.
+    :return: The statistics of each column, ordered by index, and the totals of the board.
+    """
+    return _board_statistics(list(_board_statistics_query(column_clazz, board_id, now)))
+
+
+async def aget_board_statistics(column_clazz, board_id: int, now: datetime = None) -> tuple[list, dict]:
+    """
+    Computes the card statistics of every column of a board, with the async ORM (see get_board_statistics).
+
+    :param column_clazz: The column model.
+    :param board_id: The board's ID.
+    :param now: The point in time used to tell active cards from expired ones, defaults to now.
+    :return: The statistics of each column, ordered by index, and the totals of the board.
+    """
+    return _board_statistics(await alist(_board_statistics_query(column_clazz, board_id, now)))
+
+
+def _board_statistics_query(column_clazz, board_id: int, now: datetime = None) -> QuerySet:
+    now = now or no_timezone(datetime.now())
+    not_completed = Q(card__completion_date__isnull=True)
+
+    return column_clazz.objects.filter(board_id=board_id).order_by('index', 'id').annotate(
+        active_cards=Count('card', filter=(Q(card__expiration_date__gt=now) & not_completed)
+                                          | Q(card__expiration_date__isnull=True)),
+        expired_cards=Count('card', filter=Q(card__expiration_date__lt=now) & not_completed),
+        completed_cards=Count('card', filter=Q(card__completion_date__isnull=False)),
+        total_cards=Count('card'),
+        story_points=Coalesce(Sum('card__story_points'), Value(0))
+    ).values_list('title', 'active_cards', 'expired_cards', 'completed_cards', 'total_cards', 'story_points')
+
+
+def _board_statistics(rows) -> tuple[list, dict]:
+    columns = [ColumnStatistics(*row) for row in rows]
+    totals = {
+        'total_active_cards': sum(column.active_cards for column in columns),
+        'total_expired_cards': sum(column.expired_cards for column in columns),
+        'total_completed_cards': sum(column.completed_cards for column in columns),
+        'total_cards': sum(column.total_cards for column in columns),
+        'total_story_points': sum(column.story_points for column in columns),
+    }
+    return columns, totals
+
+
+def bump_board_revision(board, column, board_id: int, column_ids=()) -> int:
+    """
+    Bumps the revision of the board and stamps the given columns with the new revision.
+    Every view that mutates the elements of a board calls this, so that clients can ask
+    for the columns that changed since the revision they last saw. A concurrent bump may make the columns
+    carry a later revision than the one this call produced, which only makes them look newer to clients.
+    The bump and the stamp run in a single transaction, so that a concurrent sync_board never gets the new revision
+    while the changed columns still carry an older one, which would hide them from its next 'since' request.
+    Once the change is committed, a compact event is pushed to the clients listening to the board.
+
+    :param board: The board model.
+    :param column: The column model.
+    :param board_id: The board's ID.
+    :param column_ids: The IDs of the columns whose content changed.
+    :return: The new revision of the board.
+    """
+    using = router.db_for_write(board)
+    with transaction.atomic(using=using, savepoint=False):
+        board.objects.filter(id=board_id).update(revision=F('revision') + 1)
+        revision = board.objects.filter(id=board_id).values_list('revision', flat=True).first()
+        if column_ids:
+            column.objects.filter(board_id=board_id, id__in=set(column_ids)).update(revision=revision)
+
+        event = {'board': board_id, 'revision': revision, 'columns': sorted(set(column_ids))}
+        transaction.on_commit(lambda: BOARD_EVENTS.publish(board_id, event), using=using)
+    return revision
+
+
+def bump_user_boards(board, guest, assignee, column, uuid: str) -> int:
+    """
+    Bumps the revision of every board the user owns, is a guest of or is assigned to a card of, on every shard
+    when the boards are sharded. The cached board fragments show the username and image of the assignees,
+    so this is called when they change. The columns holding the cards assigned to the user are stamped,
+    so that the clients syncing with a 'since' revision render them again.
+
+    :param board: The board model.
+    :param guest: The guest model.
+    :param assignee: The assignee model.
+    :param column: The column model.
+    :param uuid: The user's UUID.
+    :return: The number of boards bumped.
+    """
+    bumped = 0
+    for alias in SHARDS.aliases if SHARDS is not None else (None,):
+        with ShardDirectory.scope(alias) if alias is not None else nullcontext():
+            columns = defaultdict(set)
+            for board_id in board.objects.filter(owner=uuid).values_list('id', flat=True):
+                columns[board_id]
+            for board_id in guest.objects.filter(user_id=uuid).values_list('board_id', flat=True):
+                columns[board_id]
+            for board_id, column_id in assignee.objects.filter(user_id=uuid).values_list('board_id',
+                                                                                        'card_id__column_id'):
+                columns[board_id].add(column_id)
+
+            for board_id, column_ids in columns.items():
+                with board_transaction():
+                    bump_board_revision(board, column, board_id, column_ids)
+            bumped += len(columns)
+    return bumped
+
+
+def get_next_index(model, **filters) -> int:
+    """
+    Gets the ordering key of an element appended after its last sibling.
+    Ordering keys are sparse (see static/services/ordering.py), so that elements can be inserted,
+    moved or removed without renumbering their siblings.
+
+    :param model: The column or card model.
+    :param filters: The filters selecting the siblings of the new element.
+    :return: The ordering key of the new element.
+    """
+    return key_after(model.objects.filter(**filters).aggregate(last=Max('index'))['last'])
+
+
+def rebalance_indexes(model, **filters) -> int:
+    """
+    Spreads the ordering keys of a list of siblings evenly, restoring the gaps between them.
+    The current order of the siblings is preserved.
+
+    :param model: The column or card model.
+    :param filters: The filters selecting the siblings to rebalance.
+    :return: The number of rows changed.
+    """
+    siblings = list(model.objects.filter(**filters).order_by('index', 'id').only('id', 'index'))
+    changed = []
+    for sibling, key in zip(siblings, spread(len(siblings))):
+        if sibling.index != key:
+            sibling.index = key
+            changed.append(sibling)
+    if changed:
+        model.objects.bulk_update(changed, ['index'])
+    return len(changed)
+
+
+def move_card(card_clazz, board_id: int, card_id: int, column_id: int, before_id: int = None) -> int:
+    """
+    Moves a card to a column, before another card of that column or at its end.
+    Only the moved card is written, unless there is no room left between its new neighbours,
+    in which case the destination column is rebalanced first.
+
+    :param card_clazz: The card model.
+    :param board_id: The board's ID.
+    :param card_id: The ID of the card to move.
+    :param column_id: The ID of the destination column.
+    :param before_id: The ID of the card that will follow the moved card, None to move it at the end of the column.
+    :return: The new ordering key of the card.
+    :raises ModelsAttributeError: If the following card is not in the destination column.
+    """
+    siblings = card_clazz.objects.filter(board_id=board_id, column_id=column_id).exclude(id=card_id)
+
+    with transaction.atomic(using=router.db_for_write(card_clazz)):
+        for _ in range(2):
+            if before_id is None:
+                key = key_after(siblings.aggregate(last=Max('index'))['last'])
             else:
-                self.is_expired = False
-
-            assignees = assignee_clazz.objects.filter(card_id=_card.id, board_id=board_id).all()
-            self.assignees = []
-            for assignee in assignees:
-                user = user_clazz.objects.filter(uuid=assignee.user_id.uuid).first()
-                self.assignees.append(TemplateAssignee(user))
-
-    class TemplateColumn:
-        def __init__(self, _column):
-            nonlocal board_id
-            self.id = _column.id
-            self.title = _column.title
-            self.color = _column.color
-            self.cards = [TemplateCard(card) for card in card_clazz.objects.filter(board_id=board_id, column_id=_column.id).order_by("index").all()]
-            self.card_count = len(self.cards)
-
-    return [TemplateColumn(column) for column in columns]
+                upper = siblings.filter(id=before_id).values_list('index', flat=True).first()
+                if upper is None:
+                    raise ModelsAttributeError(f"Card {before_id} is not in column {column_id}.")
+                lower = siblings.filter(Q(index__lt=upper) | Q(index=upper, id__lt=before_id)) \
+                    .order_by('-index', '-id').values_list('index', flat=True).first()
+                key = key_between(lower, upper)
+            if key is not None:
+                break
+            rebalance_indexes(card_clazz, board_id=board_id, column_id=column_id)
+
+        source_id = card_clazz.objects.filter(id=card_id, board_id=board_id).values_list('column_id', flat=True).first()
+        card_clazz.objects.filter(id=card_id, board_id=board_id).update(column_id=column_id, index=key)
+        bump_board_revision(Board, Column, board_id, [column_id, source_id])
+
+    return key
+
+
+def apply_board_ordering(column_clazz, card_clazz, board_id: int, payload: list) -> int:
+    """
+    Applies a drag-and-drop ordering payload to the board.
+    The current ordering of the board is loaded once and diffed against the payload. The elements that kept their
+    relative order keep their sparse ordering key, and only the elements that actually moved are written,
+    with one bulk update per model inside a single transaction.
+
+    The payload is a list of columns in the form {id, index, cards: [{id, index}, ...]}, where the indexes
+    only give the relative order of the elements.
+
+    :param column_clazz: The column model.
+    :param card_clazz: The card model.
+    :param board_id: The board's ID.
+    :param payload: The ordering sent by the client.
+    :return: The number of rows changed.
+    :raises ModelsAttributeError: If the payload is malformed or references elements of other boards.
+    """
+    try:
+        columns = sorted((int(column["index"]), int(column["id"]),
+                          [card_id for _, card_id in sorted((int(card["index"]), int(card["id"]))
+                                                            for card in column.get("cards", []))])
+                         for column in payload)
+    except (TypeError, KeyError, ValueError, AttributeError):
+        raise ModelsAttributeError("The ordering payload is malformed.")
+
+    with transaction.atomic(using=router.db_for_write(card_clazz)):
+        column_indexes = dict(column_clazz.objects.filter(board_id=board_id).values_list('id', 'index'))
+        card_positions = {card_id: (column_id, index) for card_id, column_id, index in
+                          card_clazz.objects.filter(board_id=board_id).values_list('id', 'column_id', 'index')}
+
+        for _, column_id, cards in columns:
+            if column_id not in column_indexes:
+                raise ModelsAttributeError(f"Column {column_id} does not belong to this board.")
+            for card_id in cards:
+                if card_id not in card_positions:
+                    raise ModelsAttributeError(f"Card {card_id} does not belong to this board.")
+
+        column_ids = [column_id for _, column_id, _ in columns]
+        changed_columns = [
+            column_clazz(id=column_id, index=key)
+            for column_id, key in zip(column_ids, plan_ordering([column_indexes[i] for i in column_ids]))
+            if column_indexes[column_id] != key
+        ]
+
+        changed_cards = []
+        for _, column_id, cards in columns:
+            keys = [card_positions[i][1] if card_positions[i][0] == column_id else None for i in cards]
+            changed_cards += [
+                card_clazz(id=card_id, column_id_id=column_id, index=key)
+                for card_id, key in zip(cards, plan_ordering(keys))
+                if card_positions[card_id] != (column_id, key)
+            ]
+
+        if changed_columns:
+            column_clazz.objects.bulk_update(changed_columns, ['index'])
+        if changed_cards:
+            card_clazz.objects.bulk_update(changed_cards, ['column_id', 'index'])
+        if changed_columns or changed_cards:
+            touched = {card.column_id_id for card in changed_cards} \
+                      | {card_positions[card.id][0] for card in changed_cards}
+            bump_board_revision(Board, column_clazz, board_id, touched)
+
+    return len(changed_columns) + len(changed_cards)
+
+
+def get_board_snapshot(column_clazz, card_clazz, assignee_clazz, board_id: int, since: int = None) -> list:
+    """
+    Loads the whole column -> card -> assignee tree of a board.
+    The tree is built with exactly three queries (columns, cards, assignees joined with their users)
+    and grouped in memory, so the cost does not grow with the number of columns, cards or assignees.
+    Only the fields read by the templates are loaded, straight into the view models.
+
+    :param column_clazz: The column model.
+    :param card_clazz: The card model.
+    :param assignee_clazz: The assignee model.
+    :param board_id: The board's ID.
+    :param since: If given, only the columns changed after this board revision are loaded.
+    :return: The columns of the board, ordered by index, each one holding its cards and their assignees.
+    """
+    columns, cards, assignees = _board_snapshot_queries(column_clazz, card_clazz, assignee_clazz, board_id, since)
+    return _board_snapshot(list(columns), list(cards), list(assignees))
+
+
+async def aget_board_snapshot(column_clazz, card_clazz, assignee_clazz, board_id: int, since: int = None) -> list:
+    """
+    Loads the whole column -> card -> assignee tree of a board with the async ORM (see get_board_snapshot).
+    The three queries are awaited one after another: the async ORM runs every query of a request
+    on the same thread, so they could not overlap anyway.
+
+    :param column_clazz: The column model.
+    :param card_clazz: The card model.
+    :param assignee_clazz: The assignee model.
+    :param board_id: The board's ID.
+    :param since: If given, only the columns changed after this board revision are loaded.
+    :return: The columns of the board, ordered by index, each one holding its cards and their assignees.
+    """
+    queries = _board_snapshot_queries(column_clazz, card_clazz, assignee_clazz, board_id, since)
+    return _board_snapshot(*[await alist(query) for query in queries])
+
+
+def _board_snapshot_queries(column_clazz, card_clazz, assignee_clazz, board_id: int, since: int = None) -> tuple:
+    columns = column_clazz.objects.filter(board_id=board_id)
+    cards = card_clazz.objects.filter(board_id=board_id)
+    assignees = assignee_clazz.objects.filter(board_id=board_id)
+
+    if since is not None:
+        columns = columns.filter(revision__gt=since)
+        cards = cards.filter(column_id__in=columns.values('id'))
+        assignees = assignees.filter(card_id__in=cards.values('id'))
+
+    # The cards are walked in the order of the (board_id, column_id, index) index,
+    # which keeps the order of the cards of each column.
+    return (columns.order_by('index', 'id').values_list(*TemplateColumn.FIELDS),
+            cards.order_by('column_id', 'index', 'id').values_list('column_id', *TemplateCard.FIELDS),
+            assignees.order_by('id').values_list('card_id', *TemplateAssignee.FIELDS))
+
+
+def _board_snapshot(columns, cards, assignees) -> list:
+    now = no_timezone(datetime.now())
+
+    assignees_of = defaultdict(list)
+    for card_id, *row in assignees:
+        assignees_of[card_id].append(TemplateAssignee.from_row(row))
+
+    cards_of = defaultdict(list)
+    for column_id, *row in cards:
+        cards_of[column_id].append(TemplateCard.from_row(row, assignees_of.get(row[0], []), now))
+
+    return [TemplateColumn.from_row(row, cards_of.get(row[0], [])) for row in columns]
+
+
+def render_board_elements(request: HttpRequest, board: Board) -> str:
+    """
+    Renders the columns of the board (modals/board_elements.html).
+    The rendered HTML is the same for every member of the board, so it is kept in the fragment cache
+    under the board revision, and rendered again only after a mutating view bumped the revision.
+    The entry also expires when the first pending card of the board expires, since the expiration
+    of a card changes its rendering without changing the revision.
+
+    :param request: The request object.
+    :param board: The board object.
+    :return: The rendered HTML.
+    """
+    cache = caches[getattr(settings, 'BOARD_FRAGMENT_CACHE', 'default')]
+    key = f"board-elements:{board.id}:{board.revision}"
+
+    if (html := cache.get(key)) is not None:
+        return html
+
+    columns = get_board_snapshot(Column, Card, Assignee, board.id)
+    html = render_to_string("modals/board_elements.html", {"columns": columns, "board": board}, request)
+    cache.set(key, html, _board_elements_timeout(cache, columns))
+    return html
+
+
+async def arender_board_elements(request: HttpRequest, board: Board) -> str:
+    """
+    Renders the columns of the board (modals/board_elements.html) the way render_board_elements does,
+    with the async API of the fragment cache and the async ORM.
+
+    :param request: The request object.
+    :param board: The board object.
+    :return: The rendered HTML.
+    """
+    cache = caches[getattr(settings, 'BOARD_FRAGMENT_CACHE', 'default')]
+    key = f"board-elements:{board.id}:{board.revision}"
+
+    if (html := await cache.aget(key)) is not None:
+        return html
+
+    columns = await aget_board_snapshot(Column, Card, Assignee, board.id)
+    html = render_to_string("modals/board_elements.html", {"columns": columns, "board": board}, request)
+    await cache.aset(key, html, _board_elements_timeout(cache, columns))
+    return html
+
+
+def _board_elements_timeout(cache, columns: list) -> int or None:
+    now = no_timezone(datetime.now())
+    expirations = [no_timezone(card.expiration_date) for column in columns for card in column.cards
+                   if card.expiration_date and not card.completion_date and not card.is_expired]
+    timeout = cache.default_timeout
+    if expirations:
+        until_expiration = max(int((min(expirations) - now).total_seconds()) + 1, 1)
+        timeout = until_expiration if timeout is None else min(timeout, until_expiration)
+    return timeout
@@ -0,0 +1,121 @@
+"""
+View models of the templates.
+
+The views render plenty of cards, columns, boards and users, so these classes hold only what the templates read,
+in __slots__ instead of a per-instance __dict__, and are built from the raw rows of values_list() queries
+instead of full model instances. Every class lists the fields of its row in FIELDS, in the order expected by from_row.
+"""
+from datetime import datetime
+
+
+def _no_timezone(dt: datetime) -> datetime:
+    return dt.replace(tzinfo=None)
+
+
+class TemplateAssignee:
+    __slots__ = ("username", "image")
+
+    FIELDS = ("user_id__username", "user_id__image")
+
+    def __init__(self, username: str, image: str):
+        self.username = username
+        self.image = image
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "TemplateAssignee":
+        return cls(*row)
+
+
+class TemplateCard:
+    __slots__ = ("id", "title", "description", "color", "expiration_date", "completion_date", "story_points",
+                 "is_expired", "assignees")
+
+    FIELDS = ("id", "title", "description", "color", "expiration_date", "completion_date", "story_points")
+
+    def __init__(self, id: int, title: str, description: str, color: str, expiration_date: datetime or None,
+                 completion_date: datetime or None, story_points: int, is_expired: bool, assignees: list):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.color = color
+        self.expiration_date = expiration_date
+        self.completion_date = completion_date
+        self.story_points = story_points
+        self.is_expired = is_expired
+        self.assignees = assignees
+
+    @classmethod
+    def from_row(cls, row: tuple, assignees: list, now: datetime) -> "TemplateCard":
+        """
+        Builds a card from a row of TemplateCard.FIELDS.
+
+        :param row: The row.
+        :param assignees: The assignees of the card.
+        :param now: The point in time used to tell whether the card is expired.
+        :return: The card.
+        """
+        expiration_date, completion_date = row[4], row[5]
+        is_expired = bool(expiration_date) and not completion_date and _no_timezone(expiration_date) < now
+        return cls(*row, is_expired, assignees)
+
+
+class TemplateColumn:
+    __slots__ = ("id", "title", "color", "cards", "card_count")
+
+    FIELDS = ("id", "title", "color")
+
+    def __init__(self, id: int, title: str, color: str, cards: list):
+        self.id = id
+        self.title = title
+        self.color = color
+        self.cards = cards
+        self.card_count = len(cards)
+
+    @classmethod
+    def from_row(cls, row: tuple, cards: list) -> "TemplateColumn":
+        return cls(*row, cards)
+
+
+class TemplateBoard:
+    __slots__ = ("id", "name", "description", "image", "is_guest")
+
+    FIELDS = ("id", "name", "description", "image", "owner")
+
+    def __init__(self, id: int, name: str, description: str, image: str, is_guest: bool):
+        self.id = id
+        self.name = name
+        self.description = description
+        self.image = image
+        self.is_guest = is_guest
+
+    @classmethod
+    def from_row(cls, row: tuple, uuid: str) -> "TemplateBoard":
+        """
+        Builds a board from a row of TemplateBoard.FIELDS.
+
+        :param row: The row.
+        :param uuid: The UUID of the user the board is shown to.
+        :return: The board.
+        """
+        return cls(*row[:4], row[4].hex != uuid)
+
+
+class TemplateUser:
+    __slots__ = ("username", "is_assigned")
+
+    def __init__(self, username: str, is_assigned: bool):
+        self.username = username
+        self.is_assigned = is_assigned
+
+
+class ColumnStatistics:
+    __slots__ = ("name", "active_cards", "expired_cards", "completed_cards", "total_cards", "story_points")
+
+    def __init__(self, name: str, active_cards: int, expired_cards: int, completed_cards: int, total_cards: int,
+                 story_points: int):
+        self.name = name
+        self.active_cards = active_cards
+        self.expired_cards = expired_cards
+        self.completed_cards = completed_cards
+        self.total_cards = total_cards
+        self.story_points = story_points